@@ -30,6 +30,8 @@ from vendor.models import Vendor
 from accounts.models import User, UserProfile
 from .tokens import account_activation_token
 from .utils import send_verification_code_sms, send_verification_code_email
+from notifications.outbox import queue_email
+from cart.guest import GUEST_CART_HEADER, merge_guest_cart
 
 
 @swagger_auto_schema(
@@ -94,6 +96,11 @@ def login(request):
     user = authenticate(request, email=email, password=password)
 
     if user is not None:
+        # Panier constitué avant connexion : fusionné dans le panier du compte
+        guest_token = request.data.get('guest_cart') or request.headers.get(GUEST_CART_HEADER)
+        if guest_token:
+            merge_guest_cart(user, guest_token)
+
         refresh = RefreshToken.for_user(user)
         return Response({
             'refresh': str(refresh),
@@ -200,9 +207,7 @@ def forgot_password(request):
             'user': user,
             'reset_url': reset_url,
         })
-        email = EmailMessage(mail_subject, message, to=[user.email])
-        email.content_subtype = "html"
-        email.send()
+        queue_email(mail_subject, user.email, html=message)
         return Response({'message': 'Un email de réinitialisation a été envoyé.'})
     except User.DoesNotExist:
         return Response({'error': 'Utilisateur non trouvé.'}, status=status.HTTP_404_NOT_FOUND)
@@ -0,0 +1,117 @@
+import zlib
+
+from django.conf import settings
+from django.core import signing
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+
+from category.models import Product
+from .models import Cart, CartItem
+from .serializers import CartBatchSerializer, CartLineSerializer, CartSerializer
+from .utils import apply_cart_operations, plan_cart_operations
+
+# Le panier invité voyage dans cet en-tête (requête et réponse) et dans `guest_token`
+GUEST_CART_HEADER = 'X-Guest-Cart'
+GUEST_CART_SALT = 'cart.guest'
+MAX_GUEST_LINES = 100
+
+
+def load_guest_quantities(token):
+    """Quantités `{(produit, taille): quantité}` d'un jeton ; jeton absent, invalide ou expiré : panier vide."""
+    if not token:
+        return {}
+    try:
+        lines = signing.loads(token, salt=GUEST_CART_SALT, max_age=settings.GUEST_CART_MAX_AGE)
+        lines = [
+            {'product': product_id, 'size': size, 'quantity': quantity}
+            for product_id, size, quantity in lines[:MAX_GUEST_LINES]
+        ]
+    except (signing.BadSignature, zlib.error, ValueError, TypeError, KeyError):
+        # Signature, compression ou JSON invalides, ancien format de jeton
+        return {}
+    serializer = CartLineSerializer(data=lines, many=True)
+    if not serializer.is_valid():
+        return {}
+    return {(line['product'], line['size']): line['quantity'] for line in serializer.validated_data}
+
+
+def dump_guest_quantities(quantities):
+    # Jeton signé et compressé : [[produit, taille, quantité], ...]
+    lines = sorted([product_id, size, quantity] for (product_id, size), quantity in quantities.items() if quantity > 0)
+    if len(lines) > MAX_GUEST_LINES:
+        raise ValidationError(f"Le panier invité est limité à {MAX_GUEST_LINES} lignes.")
+    return signing.dumps(lines, salt=GUEST_CART_SALT, compress=True)
+
+
+def get_guest_token(request):
+    return request.headers.get(GUEST_CART_HEADER)
+
+
+class GuestItems(list):
+    # Même interface que `cart.items` pour CartSerializer et summarize_cart
+    def all(self):
+        return self
+
+
+class GuestCart:
+    """
+    Panier sans ligne en base, pour CartSerializer : panier invité, ou panier
+    d'un utilisateur qui n'a encore rien ajouté.
+    """
+    id = None
+    created_at = None
+
+    def __init__(self, quantities, user=None):
+        self.user = user
+        products = (
+            Product.objects
+            .select_related('vendor')
+            .filter(is_available=True)
+            .in_bulk({product_id for product_id, _ in quantities})
+        ) if quantities else {}
+        self.items = GuestItems(
+            CartItem(product=products[product_id], size=size, quantity=quantity)
+            for (product_id, size), quantity in sorted(quantities.items())
+            if quantity > 0 and product_id in products
+        )
+
+
+def guest_cart_response(request, quantities, status=200):
+    token = dump_guest_quantities(quantities)
+    data = CartSerializer(GuestCart(quantities), context={'request': request}).data
+    data['guest_token'] = token
+    response = Response(data, status=status)
+    response[GUEST_CART_HEADER] = token
+    return response
+
+
+def apply_guest_operations(request, operations, status=200):
+    """Applique des opérations au panier invité de la requête et renvoie le panier avec son nouveau jeton."""
+    serializer = CartBatchSerializer(data={'operations': operations})
+    serializer.is_valid(raise_exception=True)
+    quantities = plan_cart_operations(
+        load_guest_quantities(get_guest_token(request)),
+        serializer.validated_data['operations'],
+    )
+    return guest_cart_response(request, quantities, status)
+
+
+def merge_guest_cart(user, token):
+    """
+    Ajoute les lignes du panier invité au panier de l'utilisateur (à la
+    connexion). Les lignes devenues invalides (produit retiré, stock) sont
+    ignorées plutôt que de bloquer la connexion.
+    """
+    quantities = load_guest_quantities(token)
+    if not quantities:
+        return 0
+    cart, _ = Cart.objects.get_or_create(user=user)
+    apply_cart_operations(
+        cart,
+        [
+            {'op': 'add', 'product': product_id, 'size': size, 'quantity': quantity}
+            for (product_id, size), quantity in quantities.items()
+        ],
+        strict=False,
+    )
+    return len(quantities)
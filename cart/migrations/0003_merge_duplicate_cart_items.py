@@ -0,0 +1,33 @@
+# Generated by Django 4.2.4 on 2026-10-18 14:10
+
+from django.db import migrations
+from django.db.models import Count, Min, Sum
+
+
+def merge_duplicate_items(apps, schema_editor):
+    # Les ajouts concurrents ont pu créer plusieurs lignes : on garde la
+    # première, avec la somme des quantités
+    CartItem = apps.get_model('cart', 'CartItem')
+    duplicates = (
+        CartItem.objects
+        .values('cart_id', 'product_id', 'size')
+        .annotate(lines=Count('id'), first_id=Min('id'), total=Sum('quantity'))
+        .filter(lines__gt=1)
+    )
+    for duplicate in duplicates.iterator():
+        lines = CartItem.objects.filter(
+            cart_id=duplicate['cart_id'], product_id=duplicate['product_id'], size=duplicate['size'],
+        )
+        lines.filter(id=duplicate['first_id']).update(quantity=duplicate['total'])
+        lines.exclude(id=duplicate['first_id']).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cart', '0002_cartitem_size'),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicate_items, migrations.RunPython.noop),
+    ]
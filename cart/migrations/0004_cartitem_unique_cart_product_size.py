@@ -0,0 +1,19 @@
+# Generated by Django 4.2.4 on 2026-10-18 14:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cart', '0003_merge_duplicate_cart_items'),
+    ]
+
+    operations = [
+        # Migration séparée : PostgreSQL refuse de modifier une table dans la
+        # transaction qui vient d'y supprimer des lignes (triggers en attente)
+        migrations.AddConstraint(
+            model_name='cartitem',
+            constraint=models.UniqueConstraint(fields=('cart', 'product', 'size'), name='unique_cart_product_size'),
+        ),
+    ]
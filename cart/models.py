@@ -18,5 +18,12 @@ class CartItem(models.Model):
     product = models.ForeignKey(Product, on_delete=models.CASCADE)
     quantity = models.PositiveIntegerField(default=1)
     size = models.CharField(max_length=5, choices=SIZE_CHOICES, default='M')
+
+    class Meta:
+        constraints = [
+            # Une seule ligne par produit et par taille : les ajouts l'incrémentent
+            models.UniqueConstraint(fields=['cart', 'product', 'size'], name='unique_cart_product_size'),
+        ]
+
     def __str__(self):
         return f"{self.quantity} × {self.product.product_name} (Taille: {self.size})"
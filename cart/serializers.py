@@ -1,9 +1,10 @@
 from rest_framework import serializers
 from .models import CartItem, Cart
 from category.models import Product
-from decimal import Decimal
+from leMaillotApi.serializers import SparseFieldsetMixin
+from .utils import summarize_cart
 
-class CartItemSerializer(serializers.ModelSerializer):
+class CartItemSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     product_name = serializers.CharField(source='product.product_name', read_only=True)
     product_image = serializers.SerializerMethodField()
     product_price = serializers.DecimalField(source='product.price', max_digits=10, decimal_places=2, read_only=True)
@@ -19,10 +20,11 @@ class CartItemSerializer(serializers.ModelSerializer):
             return request.build_absolute_uri(obj.product.image.url)
         return None
 
-class CartSerializer(serializers.ModelSerializer):
+class CartSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     items = CartItemSerializer(many=True, read_only=True)
     total_products = serializers.SerializerMethodField()
     delivery_estimate = serializers.SerializerMethodField()
+    delivery_eta_hours = serializers.SerializerMethodField()
     estimated_total = serializers.SerializerMethodField()
     total_items = serializers.SerializerMethodField()  # 👈 AJOUT ICI
 
@@ -30,29 +32,47 @@ class CartSerializer(serializers.ModelSerializer):
         model = Cart
         fields = [
             'id', 'user', 'items', 'created_at',
-            'total_products', 'delivery_estimate', 'estimated_total',
+            'total_products', 'delivery_estimate', 'delivery_eta_hours', 'estimated_total',
             'total_items'  # 👈 AJOUT ICI
         ]
         read_only_fields = ['user', 'created_at']
 
     def get_total_products(self, obj):
-        return sum(item.product.price * item.quantity for item in obj.items.all())
+        return summarize_cart(obj)['total_products']
 
     def get_delivery_estimate(self, obj):
-        vendor_ids = {item.product.vendor.id for item in obj.items.all()}
-
-        from vendor.models import Vendor
-        total_delivery = Decimal("0.0")
-        for vid in vendor_ids:
-            try:
-                vendor = Vendor.objects.get(id=vid)
-                total_delivery += vendor.delivery_fee or Decimal("0.0")
-            except Vendor.DoesNotExist:
-                continue
-        return total_delivery
+        return summarize_cart(obj)['delivery_estimate']
+
+    def get_delivery_eta_hours(self, obj):
+        return summarize_cart(obj)['delivery_eta_hours']
 
     def get_estimated_total(self, obj):
-        return self.get_total_products(obj) + Decimal(self.get_delivery_estimate(obj))
+        return summarize_cart(obj)['estimated_total']
 
     def get_total_items(self, obj):  # 👈 AJOUT ICI
-        return sum(item.quantity for item in obj.items.all())
+        return summarize_cart(obj)['total_items']
+
+
+class CartQuantitySerializer(serializers.Serializer):
+    # Mise à jour : 0 ou moins retire la ligne
+    quantity = serializers.IntegerField()
+
+
+class CartAddQuantitySerializer(CartQuantitySerializer):
+    quantity = serializers.IntegerField(min_value=1)
+
+
+class CartLineSerializer(serializers.Serializer):
+    product = serializers.IntegerField()
+    size = serializers.ChoiceField(choices=CartItem.SIZE_CHOICES)
+    quantity = serializers.IntegerField(min_value=0, default=1)
+
+
+class CartOperationSerializer(CartLineSerializer):
+    OPERATIONS = ['add', 'update', 'remove']
+
+    op = serializers.ChoiceField(choices=OPERATIONS)
+
+
+class CartBatchSerializer(serializers.Serializer):
+    operations = CartOperationSerializer(many=True, allow_empty=False, max_length=100)
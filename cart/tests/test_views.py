@@ -0,0 +1,344 @@
+import threading
+from unittest import mock
+from decimal import Decimal
+
+from django.core import signing
+from django.db import IntegrityError, connection, connections
+from django.test import TransactionTestCase, skipUnlessDBFeature
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.exceptions import ValidationError
+from rest_framework.test import APIClient, APITestCase
+
+from accounts.models import User
+from cart.guest import GUEST_CART_SALT
+from cart.models import Cart, CartItem
+from cart.utils import add_to_cart
+from category.models import Product, ProductSize
+from vendor.models import Vendor
+
+
+def create_user(username):
+    return User.objects.create_user(
+        first_name="Test",
+        last_name="User",
+        phone_number="22990000000",
+        username=username,
+        email=f"{username}@example.com",
+        password="securepass123",
+    )
+
+
+class CartSummaryTests(APITestCase):
+
+    def setUp(self):
+        self.user = create_user("client")
+        self.client.force_authenticate(self.user)
+        self.cart = Cart.objects.create(user=self.user)
+        self.vendors = [
+            Vendor.objects.create(vendor_name=f"Boutique {i}", is_approved=True, delivery_fee="500.00")
+            for i in range(3)
+        ]
+
+    def add_items(self, count):
+        for i in range(count):
+            product = Product.objects.create(
+                vendor=self.vendors[i % 3],
+                product_name=f"Maillot {i}",
+                price="10000.00",
+                stock=10,
+                image="products/maillot.jpg",
+            )
+            CartItem.objects.create(cart=self.cart, product=product, quantity=2, size='M')
+
+    def count_queries(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response, len(queries)
+
+    def test_cart_detail_totals(self):
+        self.add_items(4)
+        response, _ = self.count_queries(reverse('cart-detail'))
+
+        self.assertEqual(len(response.data['items']), 4)
+        self.assertEqual(response.data['total_items'], 8)
+        self.assertEqual(response.data['total_products'], Decimal('80000.00'))
+        self.assertEqual(response.data['delivery_estimate'], Decimal('1500.00'))
+        self.assertEqual(response.data['estimated_total'], Decimal('81500.00'))
+
+    def test_cart_queries_do_not_grow_with_items(self):
+        self.add_items(1)
+        _, detail_single = self.count_queries(reverse('cart-detail'))
+        _, total_single = self.count_queries(reverse('cart-total'))
+
+        self.add_items(12)
+        response, detail_many = self.count_queries(reverse('cart-detail'))
+        self.assertEqual(len(response.data['items']), 13)
+        self.assertEqual(detail_single, detail_many)
+
+        response, total_many = self.count_queries(reverse('cart-total'))
+        self.assertEqual(response.data['total'], 260000.0)
+        self.assertEqual(total_single, total_many)
+
+    def test_cart_detail_fields(self):
+        self.add_items(2)
+        response, _ = self.count_queries(reverse('cart-detail') + '?fields=id,total_items,estimated_total')
+        self.assertEqual(set(response.data), {'id', 'total_items', 'estimated_total'})
+        self.assertEqual(response.data['total_items'], 4)
+
+
+class CartBatchTests(APITestCase):
+
+    def setUp(self):
+        self.user = create_user("client")
+        self.client.force_authenticate(self.user)
+        self.vendor = Vendor.objects.create(vendor_name="Boutique", is_approved=True)
+        self.products = [
+            Product.objects.create(
+                vendor=self.vendor,
+                product_name=f"Maillot {i}",
+                price="10000.00",
+                stock=50,
+                image="products/maillot.jpg",
+            )
+            for i in range(20)
+        ]
+        ProductSize.objects.create(product=self.products[0], size='M', stock=3)
+        self.url = reverse('cart-batch')
+
+    def post(self, operations):
+        return self.client.post(self.url, {'operations': operations}, format='json')
+
+    def test_batch_applies_all_operations(self):
+        cart = Cart.objects.create(user=self.user)
+        CartItem.objects.create(cart=cart, product=self.products[1], size='L', quantity=1)
+        CartItem.objects.create(cart=cart, product=self.products[2], size='S', quantity=4)
+
+        response = self.post([
+            {'op': 'add', 'product': self.products[0].pk, 'size': 'M', 'quantity': 2},
+            {'op': 'add', 'product': self.products[1].pk, 'size': 'L', 'quantity': 2},
+            {'op': 'remove', 'product': self.products[2].pk, 'size': 'S'},
+            {'op': 'update', 'product': self.products[3].pk, 'size': 'XL', 'quantity': 5},
+        ])
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        lines = sorted((item['product'], item['size'], item['quantity']) for item in response.data['items'])
+        self.assertEqual(lines, [
+            (self.products[0].pk, 'M', 2),
+            (self.products[1].pk, 'L', 3),
+            (self.products[3].pk, 'XL', 5),
+        ])
+        self.assertEqual(response.data['total_items'], 10)
+
+    def test_invalid_operation_changes_nothing(self):
+        response = self.post([
+            {'op': 'add', 'product': self.products[1].pk, 'size': 'L', 'quantity': 1},
+            {'op': 'add', 'product': self.products[0].pk, 'size': 'M', 'quantity': 4},
+            {'op': 'add', 'product': 999999, 'size': 'M', 'quantity': 1},
+        ])
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(set(response.data['operations']), {1, 2})
+        self.assertFalse(CartItem.objects.exists())
+
+    def test_batch_queries_do_not_grow_with_operations(self):
+        def sync(products):
+            with CaptureQueriesContext(connection) as queries:
+                response = self.post([
+                    {'op': 'add', 'product': product.pk, 'size': 'L', 'quantity': 1} for product in products
+                ])
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            return len(queries)
+
+        cart = Cart.objects.create(user=self.user)
+        CartItem.objects.create(cart=cart, product=self.products[1], size='L', quantity=1)
+
+        # Une ligne mise à jour et une créée, puis 2 mises à jour et 17 créations
+        first = sync(self.products[1:3])
+        self.assertEqual(sync(self.products[1:]), first)
+        self.assertEqual(CartItem.objects.count(), 19)
+
+
+class GuestCartTests(APITestCase):
+
+    def setUp(self):
+        self.vendor = Vendor.objects.create(vendor_name="Boutique", is_approved=True, delivery_fee="500.00")
+        self.products = [
+            Product.objects.create(
+                vendor=self.vendor,
+                product_name=f"Maillot {i}",
+                price="10000.00",
+                stock=50,
+                image="products/maillot.jpg",
+            )
+            for i in range(3)
+        ]
+        ProductSize.objects.create(product=self.products[0], size='M', stock=3)
+
+    def add(self, product, size, quantity, token=None):
+        headers = {'HTTP_X_GUEST_CART': token} if token else {}
+        return self.client.post(
+            reverse('cart-add'), {'product': product.pk, 'size': size, 'quantity': quantity}, format='json', **headers
+        )
+
+    def test_guest_cart_lives_in_token(self):
+        response = self.add(self.products[0], 'M', 2)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        token = response['X-Guest-Cart']
+        self.assertEqual(response.data['guest_token'], token)
+
+        response = self.add(self.products[1], 'L', 1, token)
+        token = response['X-Guest-Cart']
+        response = self.client.get(reverse('cart-detail'), HTTP_X_GUEST_CART=token)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['total_items'], 3)
+        self.assertEqual(response.data['total_products'], Decimal('30000.00'))
+        self.assertFalse(Cart.objects.exists())
+
+    def test_guest_cart_checks_stock_and_rejects_forged_tokens(self):
+        response = self.add(self.products[0], 'M', 5)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        response = self.client.get(reverse('cart-detail'), HTTP_X_GUEST_CART='faux-jeton')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['items'], [])
+
+    def test_guest_cart_ignores_malformed_tokens(self):
+        tokens = [
+            signing.dumps({'produit': 1}, salt=GUEST_CART_SALT, compress=True),
+            signing.dumps([[self.products[0].pk, 'M']], salt=GUEST_CART_SALT),
+            signing.dumps([['x', 'M', 'beaucoup']], salt=GUEST_CART_SALT),
+            signing.dumps([[self.products[0].pk, 'XXL', 1]], salt=GUEST_CART_SALT),
+        ]
+        for token in tokens:
+            response = self.client.get(reverse('cart-detail'), HTTP_X_GUEST_CART=token)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(response.data['items'], [])
+
+    def test_non_integer_quantity_is_rejected(self):
+        self.assertEqual(self.add(self.products[1], 'L', 'abc').status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.put(
+            reverse('cart-update-item'), {'product': self.products[1].pk, 'size': 'L', 'quantity': 'abc'}, format='json',
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        user = create_user("client")
+        cart = Cart.objects.create(user=user)
+        CartItem.objects.create(cart=cart, product=self.products[1], size='L', quantity=1)
+        self.client.force_authenticate(user)
+        response = self.client.put(
+            reverse('cart-update-item'), {'product': self.products[1].pk, 'size': 'L', 'quantity': 'abc'}, format='json',
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(cart.items.get().quantity, 1)
+
+    def test_guest_cart_merged_on_login(self):
+        user = create_user("client")
+        user.is_active = True
+        user.save()
+        cart = Cart.objects.create(user=user)
+        CartItem.objects.create(cart=cart, product=self.products[1], size='L', quantity=1)
+
+        token = self.add(self.products[0], 'M', 2)['X-Guest-Cart']
+        token = self.add(self.products[1], 'L', 2, token)['X-Guest-Cart']
+        response = self.client.post(
+            reverse('login'),
+            {'email': user.email, 'password': 'securepass123', 'guest_cart': token},
+            format='json',
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        lines = sorted(cart.items.values_list('product_id', 'size', 'quantity'))
+        self.assertEqual(lines, [(self.products[0].pk, 'M', 2), (self.products[1].pk, 'L', 3)])
+
+
+class AddToCartTests(APITestCase):
+
+    def setUp(self):
+        self.user = create_user("client")
+        self.client.force_authenticate(self.user)
+        vendor = Vendor.objects.create(vendor_name="Boutique", is_approved=True)
+        self.product = Product.objects.create(
+            vendor=vendor, product_name="Maillot", price="10000.00", stock=50, image="products/maillot.jpg",
+        )
+
+    def test_repeated_adds_increment_a_single_line(self):
+        for quantity in (2, 3):
+            response = self.client.post(
+                reverse('cart-add'), {'product': self.product.pk, 'size': 'M', 'quantity': quantity}, format='json',
+            )
+            self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        self.assertEqual(response.data['quantity'], 5)
+        self.assertEqual(list(CartItem.objects.values_list('quantity', flat=True)), [5])
+
+    def test_add_requires_a_positive_quantity(self):
+        for quantity in (0, -2):
+            response = self.client.post(
+                reverse('cart-add'), {'product': self.product.pk, 'size': 'M', 'quantity': quantity}, format='json',
+            )
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, quantity)
+        self.assertFalse(CartItem.objects.exists())
+
+    def test_add_to_cart_validates_quantity_before_insert(self):
+        cart = Cart.objects.create(user=self.user)
+        for quantity in (0, -2):
+            with self.assertRaises(ValidationError):
+                add_to_cart(cart, self.product, 'M', quantity)
+        self.assertFalse(CartItem.objects.exists())
+
+        # Erreur d'intégrité sans ligne concurrente : remontée telle quelle
+        with mock.patch.object(CartItem.objects, 'create', side_effect=IntegrityError("check")):
+            with self.assertRaises(IntegrityError):
+                add_to_cart(cart, self.product, 'M', 1)
+
+    def test_duplicate_lines_are_rejected(self):
+        cart = Cart.objects.create(user=self.user)
+        CartItem.objects.create(cart=cart, product=self.product, size='M')
+        with self.assertRaises(IntegrityError):
+            CartItem.objects.create(cart=cart, product=self.product, size='M')
+
+
+# Les écritures concurrentes demandent de vrais verrous de ligne (PostgreSQL)
+@skipUnlessDBFeature('has_select_for_update')
+class ConcurrentAddToCartTests(TransactionTestCase):
+    THREADS = 8
+    ADDS_PER_THREAD = 3
+
+    def test_parallel_adds_never_duplicate_or_lose_quantity(self):
+        user = create_user("client")
+        vendor = Vendor.objects.create(vendor_name="Boutique", is_approved=True)
+        product = Product.objects.create(
+            vendor=vendor, product_name="Maillot", price="10000.00", stock=50, image="products/maillot.jpg",
+        )
+        Cart.objects.create(user=user)
+        statuses = []
+        start = threading.Barrier(self.THREADS)
+
+        def add():
+            client = APIClient()
+            client.force_authenticate(user)
+            start.wait()
+            try:
+                for _ in range(self.ADDS_PER_THREAD):
+                    response = client.post(
+                        reverse('cart-add'), {'product': product.pk, 'size': 'M', 'quantity': 1}, format='json',
+                    )
+                    statuses.append(response.status_code)
+            finally:
+                connections.close_all()
+
+        threads = [threading.Thread(target=add) for _ in range(self.THREADS)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(set(statuses), {status.HTTP_201_CREATED})
+        self.assertEqual(
+            list(CartItem.objects.values_list('quantity', flat=True)),
+            [self.THREADS * self.ADDS_PER_THREAD],
+        )
@@ -1,5 +1,5 @@
 from django.urls import path
-from .views import CartDetailAPIView, AddToCartAPIView, RemoveFromCartAPIView, UpdateCartItemQuantityAPIView, CartTotalAPIView, ClearCartAPIView
+from .views import CartDetailAPIView, AddToCartAPIView, RemoveFromCartAPIView, UpdateCartItemQuantityAPIView, CartTotalAPIView, ClearCartAPIView, CartBatchAPIView
 
 urlpatterns = [
     path('', CartDetailAPIView.as_view(), name='cart-detail'),
@@ -8,4 +8,5 @@ urlpatterns = [
     path('update/', UpdateCartItemQuantityAPIView.as_view(), name='cart-update-item'),
     path('total/', CartTotalAPIView.as_view(), name='cart-total'),
     path('clear/', ClearCartAPIView.as_view(), name='cart-clear'),
+    path('batch/', CartBatchAPIView.as_view(), name='cart-batch'),
 ]
\ No newline at end of file
@@ -0,0 +1,177 @@
+from decimal import Decimal
+
+from django.db import IntegrityError, transaction
+from django.db.models import F, Prefetch
+from rest_framework.exceptions import ValidationError
+
+from category.models import Product, ProductSize
+from vendor.delivery import delivery_eta, delivery_total, quote_delivery
+from .models import Cart, CartItem
+
+
+def cart_queryset():
+    """Panier avec profil (coordonnées) et lignes, produits et vendeurs : trois requêtes au total."""
+    return Cart.objects.select_related('user__userprofile').prefetch_related(
+        Prefetch('items', queryset=CartItem.objects.select_related('product__vendor').order_by('id'))
+    )
+
+
+def get_cart(user, create=False):
+    cart = cart_queryset().filter(user=user).first()
+    if cart is None and create:
+        cart, _ = Cart.objects.get_or_create(user=user)
+        cart = cart_queryset().get(pk=cart.pk)
+    return cart
+
+
+def summarize_cart(cart):
+    """
+    Totaux du panier calculés en un seul passage sur ses lignes, puis gardés
+    sur l'instance : le sérialiseur et les vues les relisent sans requête.
+    """
+    if getattr(cart, '_summary', None) is None:
+        total_products = Decimal('0.00')
+        total_items = 0
+        vendors = {}
+        for item in cart.items.all():
+            total_products += item.product.price * item.quantity
+            total_items += item.quantity
+            vendors[item.product.vendor_id] = item.product.vendor
+
+        profile = getattr(cart.user, 'userprofile', None)
+        quotes = quote_delivery(
+            vendors.values(),
+            getattr(profile, 'latitude', None),
+            getattr(profile, 'longitude', None),
+        )
+        delivery = delivery_total(quotes)
+        cart._summary = {
+            'total_products': total_products,
+            'total_items': total_items,
+            'delivery_estimate': delivery,
+            'delivery_eta_hours': delivery_eta(quotes),
+            'estimated_total': total_products + delivery,
+        }
+    return cart._summary
+
+
+def plan_cart_operations(quantities, operations, strict=True):
+    """
+    Applique une liste d'opérations `{op, product, size, quantity}` à des
+    quantités `{(produit, taille): quantité}` et renvoie les nouvelles :
+    - add : ajoute `quantity` à la ligne (créée si besoin) ;
+    - update : fixe la quantité (0 supprime la ligne) ;
+    - remove : supprime la ligne.
+
+    Produits et stocks par taille sont lus en deux requêtes. Une opération
+    invalide lève une ValidationError indiquant sa position (`strict`), ou
+    est simplement ignorée.
+    """
+    quantities = dict(quantities)
+    product_ids = {operation['product'] for operation in operations}
+    products = Product.objects.filter(is_available=True).in_bulk(product_ids)
+    sizes = {}
+    size_stocks = ProductSize.objects.filter(product_id__in=products).values_list('product_id', 'size', 'stock')
+    for product_id, size, stock in size_stocks:
+        sizes.setdefault(product_id, {})[size] = stock
+
+    errors = {}
+    for index, operation in enumerate(operations):
+        key = (operation['product'], operation['size'])
+        previous = quantities.get(key, 0)
+        if operation['op'] == 'add':
+            quantities[key] = previous + operation['quantity']
+        elif operation['op'] == 'update':
+            quantities[key] = operation['quantity']
+        else:
+            quantities[key] = 0
+        if not quantities[key]:
+            # Retirer une ligne reste possible même si le produit n'est plus en vente
+            continue
+
+        product = products.get(operation['product'])
+        if product is None:
+            errors[index] = "Produit introuvable ou indisponible"
+        else:
+            # Stock de la taille si le produit en déclare, sinon stock global
+            product_sizes = sizes.get(product.pk)
+            stock = product_sizes.get(operation['size'], 0) if product_sizes else product.stock
+            if quantities[key] > stock:
+                errors[index] = (
+                    f"Stock insuffisant pour '{product.product_name}' "
+                    f"en taille {operation['size']} (stock actuel : {stock})"
+                )
+        if index in errors:
+            quantities[key] = previous
+
+    if errors and strict:
+        raise ValidationError({'operations': errors})
+    return quantities
+
+
+def apply_cart_operations(cart, operations, strict=True):
+    """
+    Applique des opérations (voir `plan_cart_operations`) aux lignes du
+    panier en base : une lecture des lignes concernées, puis au plus un
+    DELETE, un UPDATE groupé et un INSERT groupé dans une transaction.
+
+    Si une ligne a été créée entre-temps par une autre requête (contrainte
+    unique), les opérations sont rejouées une fois sur les lignes relues.
+    """
+    try:
+        _apply_cart_operations(cart, operations, strict)
+    except IntegrityError:
+        _apply_cart_operations(cart, operations, strict)
+
+
+def _apply_cart_operations(cart, operations, strict):
+    lines = {
+        (item.product_id, item.size): item
+        for item in CartItem.objects.filter(cart=cart, product_id__in={op['product'] for op in operations})
+    }
+    quantities = plan_cart_operations(
+        {key: item.quantity for key, item in lines.items()}, operations, strict,
+    )
+
+    to_create, to_update, to_delete = [], [], []
+    for (product_id, size), quantity in quantities.items():
+        item = lines.get((product_id, size))
+        if item is None:
+            if quantity > 0:
+                to_create.append(CartItem(cart=cart, product_id=product_id, size=size, quantity=quantity))
+        elif quantity <= 0:
+            to_delete.append(item.pk)
+        elif quantity != item.quantity:
+            item.quantity = quantity
+            to_update.append(item)
+
+    with transaction.atomic():
+        if to_delete:
+            CartItem.objects.filter(pk__in=to_delete).delete()
+        if to_update:
+            CartItem.objects.bulk_update(to_update, ['quantity'])
+        if to_create:
+            CartItem.objects.bulk_create(to_create)
+
+
+def add_to_cart(cart, product, size, quantity):
+    """
+    Ajoute `quantity` à la ligne (produit, taille) sans lecture préalable :
+    UPDATE ... SET quantity = quantity + n, ou INSERT si la ligne n'existe
+    pas. Deux ajouts simultanés ne créent jamais deux lignes et aucun
+    incrément n'est perdu.
+    """
+    if quantity < 1:
+        raise ValidationError({'quantity': "La quantité doit être au moins 1."})
+    lines = CartItem.objects.filter(cart=cart, product=product, size=size)
+    with transaction.atomic():
+        if not lines.update(quantity=F('quantity') + quantity):
+            try:
+                with transaction.atomic():
+                    return CartItem.objects.create(cart=cart, product=product, size=size, quantity=quantity)
+            except IntegrityError:
+                # Ligne créée au même moment par une autre requête (unique_cart_product_size) :
+                # sans ligne à incrémenter, l'erreur vient d'une autre contrainte
+                if not lines.update(quantity=F('quantity') + quantity):
+                    raise
+        return lines.get()
@@ -1,20 +1,35 @@
 from rest_framework import generics, status
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
 from .models import Cart, CartItem
 from category.models import Product
-from .serializers import CartSerializer, CartItemSerializer
+from .serializers import (
+    CartSerializer, CartItemSerializer, CartBatchSerializer, CartAddQuantitySerializer, CartQuantitySerializer,
+)
+from .utils import add_to_cart, apply_cart_operations, get_cart, summarize_cart
+from .guest import GuestCart, apply_guest_operations, get_guest_token, guest_cart_response, load_guest_quantities
+
+
+def parse_quantity(value, serializer_class=CartQuantitySerializer):
+    # Quantité non entière (ou hors bornes) : 400 plutôt qu'une erreur serveur
+    serializer = serializer_class(data={'quantity': value})
+    serializer.is_valid(raise_exception=True)
+    return serializer.validated_data['quantity']
 
 
 class CartDetailAPIView(generics.RetrieveAPIView):
     serializer_class = CartSerializer
-    permission_classes = [IsAuthenticated]
+    # Visiteurs : panier invité porté par l'en-tête X-Guest-Cart
+    permission_classes = [AllowAny]
 
     def get_object(self):
-        cart, _ = Cart.objects.get_or_create(user=self.request.user)
-        return cart
+        user = self.request.user
+        if not user.is_authenticated:
+            return GuestCart(load_guest_quantities(get_guest_token(self.request)))
+        # Lecture seule : le panier n'est créé qu'au premier ajout
+        return get_cart(user) or GuestCart({}, user=user)
 
     def get_serializer_context(self):
         return {'request': self.request}
@@ -22,46 +37,51 @@ class CartDetailAPIView(generics.RetrieveAPIView):
 
 class AddToCartAPIView(generics.CreateAPIView):
     serializer_class = CartItemSerializer
-    permission_classes = [IsAuthenticated]
+    permission_classes = [AllowAny]
 
     def create(self, request, *args, **kwargs):
-        cart, _ = Cart.objects.get_or_create(user=request.user)
         product_id = request.data.get('product')
-        quantity = int(request.data.get('quantity', 1))
+        quantity = parse_quantity(request.data.get('quantity', 1), CartAddQuantitySerializer)
         size = request.data.get('size')
 
         if not size:
             return Response({'error': 'La taille du produit est requise.'}, status=400)
 
+        if not request.user.is_authenticated:
+            return apply_guest_operations(
+                request,
+                [{'op': 'add', 'product': product_id, 'size': size, 'quantity': quantity}],
+                status=201,
+            )
+
+        cart, _ = Cart.objects.get_or_create(user=request.user)
+
         try:
             product = Product.objects.get(id=product_id, is_available=True)
         except Product.DoesNotExist:
             return Response({'error': 'Produit introuvable ou indisponible'}, status=404)
 
-        cart_item, created = CartItem.objects.get_or_create(cart=cart, product=product, size=size)
-
-        if not created:
-            cart_item.quantity += quantity
-        else:
-            cart_item.quantity = quantity
-
-        cart_item.save()
+        cart_item = add_to_cart(cart, product, size, quantity)
 
         return Response(CartItemSerializer(cart_item, context={'request': request}).data, status=201)
 
 
 class RemoveFromCartAPIView(generics.DestroyAPIView):
     serializer_class = CartItemSerializer
-    permission_classes = [IsAuthenticated]
+    permission_classes = [AllowAny]
 
     def delete(self, request, *args, **kwargs):
-        cart = Cart.objects.filter(user=request.user).first()
         product_id = request.data.get('product')
         size = request.data.get('size')
 
         if not product_id or not size:
             return Response({'error': 'Product ID et taille requis.'}, status=400)
 
+        if not request.user.is_authenticated:
+            return apply_guest_operations(request, [{'op': 'remove', 'product': product_id, 'size': size}])
+
+        cart = Cart.objects.filter(user=request.user).first()
+
         if not cart:
             return Response({'error': 'Aucun panier trouvé'}, status=404)
 
@@ -74,7 +94,7 @@ class RemoveFromCartAPIView(generics.DestroyAPIView):
 
 
 class UpdateCartItemQuantityAPIView(APIView):
-    permission_classes = [IsAuthenticated]
+    permission_classes = [AllowAny]
 
     def put(self, request):
         user = request.user
@@ -84,6 +104,14 @@ class UpdateCartItemQuantityAPIView(APIView):
 
         if not product_id or not size or quantity is None:
             return Response({"error": "Product ID, taille et quantity sont requis."}, status=400)
+        quantity = parse_quantity(quantity)
+
+        if not user.is_authenticated:
+            # Quantité < 1 : la ligne est retirée, comme pour un utilisateur connecté
+            return apply_guest_operations(
+                request,
+                [{'op': 'update', 'product': product_id, 'size': size, 'quantity': max(quantity, 0)}],
+            )
 
         try:
             product = Product.objects.get(id=product_id)
@@ -99,7 +127,6 @@ class UpdateCartItemQuantityAPIView(APIView):
         except CartItem.DoesNotExist:
             return Response({"error": "Produit non présent dans le panier pour cette taille."}, status=404)
 
-        quantity = int(quantity)
         if quantity < 1:
             cart_item.delete()
             return Response({"message": "Produit supprimé du panier."}, status=200)
@@ -110,25 +137,48 @@ class UpdateCartItemQuantityAPIView(APIView):
 
 
 class CartTotalAPIView(APIView):
-    permission_classes = [IsAuthenticated]
+    permission_classes = [AllowAny]
 
     def get(self, request):
-        user = request.user
-        cart = Cart.objects.filter(user=user).first()
+        if request.user.is_authenticated:
+            cart = get_cart(request.user)
+        else:
+            cart = GuestCart(load_guest_quantities(get_guest_token(request)))
         if not cart:
             return Response({"total": 0.0}, status=200)
 
-        total = sum(item.product.price * item.quantity for item in cart.items.all())
+        total = summarize_cart(cart)['total_products']
         return Response({"total": float(total)}, status=200)
 
 
 class ClearCartAPIView(APIView):
-    permission_classes = [IsAuthenticated]
+    permission_classes = [AllowAny]
 
     def delete(self, request):
+        if not request.user.is_authenticated:
+            return guest_cart_response(request, {})
+
         cart = Cart.objects.filter(user=request.user).first()
         if not cart:
             return Response({"message": "Aucun panier à vider."}, status=200)
 
         cart.items.all().delete()
         return Response({"message": "Panier vidé avec succès."}, status=200)
+
+
+class CartBatchAPIView(APIView):
+    """Synchronise le panier en une requête : liste d'opérations add/update/remove appliquées en bloc."""
+    permission_classes = [AllowAny]
+
+    def post(self, request):
+        if not request.user.is_authenticated:
+            return apply_guest_operations(request, request.data.get('operations'))
+
+        serializer = CartBatchSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        cart = get_cart(request.user, create=True)
+        apply_cart_operations(cart, serializer.validated_data['operations'])
+
+        cart = get_cart(request.user)
+        return Response(CartSerializer(cart, context={'request': request}).data, status=200)
@@ -0,0 +1,164 @@
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.response import Response
+
+from .search import normalize_text
+
+CACHE_PREFIX = 'catalogue'
+STATS_KEYS = {'hits': f'{CACHE_PREFIX}:stats:hits', 'misses': f'{CACHE_PREFIX}:stats:misses'}
+
+# Portées invalidées par les signaux (voir category/signals.py)
+CATEGORIES_SCOPE = 'categories'
+PRODUCTS_SCOPE = 'products'
+# Zones de livraison des vendeurs (voir vendor/coverage.py)
+COVERAGE_SCOPE = 'coverage'
+
+
+def product_scope(product_id):
+    return f'product:{product_id}'
+
+
+def vendor_scope(vendor_id):
+    return f'vendor:{vendor_id}'
+
+
+def _version_key(scope):
+    return f'{CACHE_PREFIX}:version:{scope}'
+
+
+def get_versions(scopes):
+    """
+    Numéro de version courant de chaque portée. Une portée inconnue (jamais
+    vue ou évincée du cache) reçoit un horodatage en millisecondes, plus grand
+    que toute version déjà utilisée : une ancienne entrée ne peut pas revenir.
+    """
+    keys = {_version_key(scope): scope for scope in scopes}
+    versions = cache.get_many(keys.keys())
+    for key in keys:
+        if key not in versions:
+            cache.add(key, int(time.time() * 1000), timeout=None)
+            versions[key] = cache.get(key)
+    return [versions[key] for key in keys]
+
+
+def bump_versions(*scopes):
+    for scope in set(scopes):
+        try:
+            cache.incr(_version_key(scope))
+        except ValueError:
+            cache.add(_version_key(scope), int(time.time() * 1000), timeout=None)
+
+
+def invalidate_products(product_ids, vendor_ids=None):
+    """Invalide le cache des produits donnés, de la liste publique et des listes de leurs vendeurs."""
+    from .models import Product
+
+    product_ids = set(product_ids)
+    if not product_ids:
+        return
+    if vendor_ids is None:
+        vendor_ids = Product.objects.filter(pk__in=product_ids).values_list('vendor_id', flat=True)
+    bump_versions(
+        PRODUCTS_SCOPE,
+        *(product_scope(pk) for pk in product_ids),
+        *(vendor_scope(pk) for pk in set(vendor_ids)),
+    )
+
+
+def _count(stat):
+    try:
+        cache.incr(STATS_KEYS[stat])
+    except ValueError:
+        cache.add(STATS_KEYS[stat], 0, timeout=None)
+        cache.incr(STATS_KEYS[stat])
+
+
+def get_cache_stats():
+    stats = cache.get_many(STATS_KEYS.values())
+    hits = stats.get(STATS_KEYS['hits'], 0)
+    misses = stats.get(STATS_KEYS['misses'], 0)
+    total = hits + misses
+    return {
+        'hits': hits,
+        'misses': misses,
+        'hit_ratio': round(hits / total, 4) if total else 0.0,
+    }
+
+
+def _normalize_param(name, value):
+    value = value.strip()
+    if name == 'category':
+        return ','.join(sorted(slug.strip() for slug in value.split(',') if slug.strip()))
+    if name == 'search':
+        return normalize_text(value)
+    return value
+
+
+def build_cache_key(request, name, scopes, params=(), extra=()):
+    """
+    Clé = nom de la vue + versions des portées + paramètres GET retenus
+    (normalisés et triés) + hôte, car les réponses contiennent des URL absolues.
+    """
+    query = sorted(
+        (param, _normalize_param(param, request.query_params[param]))
+        for param in params
+        if request.query_params.get(param, '').strip()
+    )
+    versions = get_versions(scopes)
+    raw = repr((request.scheme, request.get_host(), tuple(extra), query))
+    digest = hashlib.md5(raw.encode()).hexdigest()
+    return f"{CACHE_PREFIX}:{name}:{'-'.join(str(v) for v in versions)}:{digest}"
+
+
+def cached_response(request, name, scopes, compute, params=(), extra=()):
+    """
+    Sert `name` depuis le cache si possible, sinon appelle `compute()` et
+    met en cache les données d'une réponse 200. Les versions sont lues avant
+    le calcul : une modification concurrente invalide bien le résultat.
+    """
+    key = build_cache_key(request, name, scopes, params, extra)
+    data = cache.get(key)
+    if data is not None:
+        _count('hits')
+        response = Response(data)
+        response['X-Cache'] = 'HIT'
+        return response
+
+    _count('misses')
+    response = compute()
+    if response.status_code == 200:
+        cache.set(key, response.data, timeout=settings.CATALOGUE_CACHE_TIMEOUT)
+    response['X-Cache'] = 'MISS'
+    return response
+
+
+class CatalogueCacheMixin:
+    """
+    Cache des vues publiques en lecture (GET). Les sous-classes indiquent les
+    paramètres GET qui changent la réponse (`cache_params`) et les portées
+    dont elle dépend (`get_cache_scopes`).
+    """
+    cache_params = ()
+
+    def get_cache_scopes(self):
+        raise NotImplementedError
+
+    def get_cache_extra(self):
+        return sorted(self.kwargs.items())
+
+    def get_fingerprint(self):
+        # Pour ConditionalGetMixin : les versions changent dès que la réponse change
+        return None, get_versions(self.get_cache_scopes())
+
+    def get(self, request, *args, **kwargs):
+        return cached_response(
+            request,
+            name=type(self).__name__,
+            scopes=self.get_cache_scopes(),
+            compute=lambda: super(CatalogueCacheMixin, self).get(request, *args, **kwargs),
+            params=self.cache_params,
+            extra=self.get_cache_extra(),
+        )
@@ -0,0 +1,198 @@
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+from PIL import Image, ImageOps
+
+logger = logging.getLogger(__name__)
+
+# Déclinaisons servies aux clients : plus grand côté en pixels, du plus grand au plus petit
+RENDITIONS = (('full', 1280), ('card', 480), ('thumbnail', 160))
+FORMATS = (
+    ('webp', 'WEBP', {'quality': 80, 'method': 4}),
+    ('jpeg', 'JPEG', {'quality': 85, 'optimize': True, 'progressive': True}),
+)
+
+
+def render_renditions(data):
+    """
+    Exécutée dans un processus du pool : aucune dépendance à Django. Reçoit
+    les octets de l'original et renvoie `{déclinaison: {format: octets}}`.
+    Chaque déclinaison est réduite depuis la précédente (plus rapide que
+    depuis l'original) et n'est jamais agrandie.
+    """
+    with Image.open(BytesIO(data)) as original:
+        # Photos de téléphone : appliquer l'orientation EXIF avant de redimensionner
+        image = ImageOps.exif_transpose(original)
+        image = image.convert('RGBA' if 'A' in image.getbands() else 'RGB')
+
+    rendered = {}
+    for name, size in RENDITIONS:
+        image.thumbnail((size, size), Image.LANCZOS)
+        rendered[name] = {}
+        for extension, image_format, options in FORMATS:
+            output = BytesIO()
+            # Pas de transparence en JPEG
+            (image.convert('RGB') if image_format == 'JPEG' else image).save(output, image_format, **options)
+            rendered[name][extension] = output.getvalue()
+    return rendered
+
+
+def rendition_path(original_name, name, extension):
+    # Nom proposé au stockage (le stockage par contenu n'en garde que l'extension)
+    return f"{os.path.splitext(original_name)[0]}.{name}.{extension}"
+
+
+def rendition_paths(renditions):
+    return [path for name, formats in renditions.items() if name != 'source' for path in formats.values()]
+
+
+def delete_renditions(renditions, storage=None):
+    storage = storage or default_storage
+    for path in rendition_paths(renditions or {}):
+        storage.delete(path)
+
+
+def map_renditions(renditions, url):
+    """`{déclinaison: {format: url(chemin)}}`, sans l'entrée `source`."""
+    return {
+        name: {extension: url(path) for extension, path in formats.items()}
+        for name, formats in (renditions or {}).items()
+        if name != 'source'
+    }
+
+
+def rendition_urls(instance, request=None):
+    """URLs `{déclinaison: {format: url}}` pour les sérialiseurs (vide tant qu'elles ne sont pas générées)."""
+    storage = instance.image.storage
+    if request is None:
+        return map_renditions(instance.renditions, storage.url)
+    return map_renditions(instance.renditions, lambda path: request.build_absolute_uri(storage.url(path)))
+
+
+def store_renditions(original_name, rendered, storage=None):
+    storage = storage or default_storage
+    renditions = {'source': original_name}
+    for name, formats in rendered.items():
+        renditions[name] = {}
+        for extension, data in formats.items():
+            path = rendition_path(original_name, name, extension)
+            renditions[name][extension] = storage.save(path, ContentFile(data))
+    return renditions
+
+
+def generate_renditions(model, pk, executor=None, force=True):
+    """
+    Génère et enregistre les déclinaisons de l'image d'un Product ou d'un
+    ProductImage. Le redimensionnement part dans `executor` (pool de
+    processus) s'il est fourni, sinon il a lieu dans le processus courant.
+    Sans `force`, une image dont les déclinaisons sont déjà à jour en base
+    n'est pas retraitée.
+    """
+    from .cache import invalidate_products
+
+    instance = model.objects.filter(pk=pk).only('pk', 'image', 'renditions').first()
+    if instance is None or not instance.image:
+        return None
+    if not force and (instance.renditions or {}).get('source') == instance.image.name:
+        return None
+    # Déclinaisons dans le même stockage que l'original
+    storage = instance.image.storage
+    original_name = instance.image.name
+    with instance.image.open('rb') as original:
+        data = original.read()
+
+    if executor is None:
+        rendered = render_renditions(data)
+    else:
+        rendered = executor.submit(render_renditions, data).result()
+
+    renditions = store_renditions(original_name, rendered, storage)
+    # Ne rien écraser si l'image a été remplacée pendant le traitement
+    updated = model.objects.filter(pk=pk, image=original_name).update(
+        renditions=renditions, updated_at=timezone.now(),
+    )
+    if not updated:
+        delete_renditions(renditions, storage)
+        return None
+    # Chaque enregistrement compte une référence : les anciennes sont rendues
+    delete_renditions(instance.renditions, storage)
+
+    invalidate_products([pk if model._meta.model_name == 'product' else instance.product_id])
+    return renditions
+
+
+_process_pool = None
+_coordinators = None
+_pools_lock = threading.Lock()
+
+
+def get_pools():
+    """
+    Pool de processus (Pillow, hors GIL) et threads qui l'alimentent : un
+    envoi de plusieurs images est traité en parallèle, hors du thread de la
+    requête.
+    """
+    global _process_pool, _coordinators
+    with _pools_lock:
+        if _process_pool is None:
+            # spawn : pas de fork d'un processus web multi-threadé
+            _process_pool = ProcessPoolExecutor(
+                max_workers=settings.IMAGE_WORKERS,
+                mp_context=multiprocessing.get_context('spawn'),
+            )
+            _coordinators = ThreadPoolExecutor(
+                max_workers=settings.IMAGE_WORKERS,
+                thread_name_prefix='renditions',
+            )
+        return _process_pool, _coordinators
+
+
+def _generate(model, pk, executor=None):
+    # Image illisible ou absente : erreur journalisée, `renditions` reste vide
+    try:
+        generate_renditions(model, pk, executor=executor, force=False)
+    except Exception:
+        logger.exception("Échec de la génération des déclinaisons de %s %s", model.__name__, pk)
+
+
+def _run(model, pk):
+    close_old_connections()
+    try:
+        _generate(model, pk, executor=get_pools()[0])
+    finally:
+        close_old_connections()
+
+
+def schedule_renditions(*instances):
+    """
+    Après le commit, génère les déclinaisons des images qui ont changé
+    depuis la dernière génération, en un seul envoi pour tout le lot. Une
+    instance chargée avant la génération n'a pas les déclinaisons à jour :
+    la base est relue avant le traitement.
+    """
+    jobs = [
+        (type(instance), instance.pk) for instance in instances
+        if instance.image and (instance.renditions or {}).get('source') != instance.image.name
+    ]
+    if not jobs:
+        return
+
+    def dispatch():
+        if not settings.IMAGE_RENDITIONS_ASYNC:
+            for job in jobs:
+                _generate(*job)
+            return
+        coordinators = get_pools()[1]
+        for job in jobs:
+            coordinators.submit(_run, *job)
+
+    transaction.on_commit(dispatch)
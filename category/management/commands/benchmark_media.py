@@ -0,0 +1,63 @@
+import os
+import shutil
+import tempfile
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.test import RequestFactory, override_settings
+from django.views.static import serve
+
+from leMaillotApi.media import serve_media
+
+BENCHMARK_NAME = 'content/be/benchmark.jpg'
+
+
+class Command(BaseCommand):
+    help = "Mesure le temps de worker par image : ancien `static.serve`, puis serve_media (Python, 304, plage, X-Accel-Redirect)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--size', type=int, default=500, help="Taille de l'image en Ko.")
+        parser.add_argument('--repeat', type=int, default=500)
+
+    def handle(self, *args, **options):
+        media_root = tempfile.mkdtemp()
+        try:
+            path = os.path.join(media_root, BENCHMARK_NAME)
+            os.makedirs(os.path.dirname(path))
+            with open(path, 'wb') as file:
+                file.write(os.urandom(options['size'] * 1024))
+
+            with override_settings(MEDIA_ROOT=media_root, DEBUG=True):
+                self.run_all(options)
+        finally:
+            shutil.rmtree(media_root, ignore_errors=True)
+
+    def run_all(self, options):
+        factory = RequestFactory()
+        etag = serve_media(factory.get('/'), BENCHMARK_NAME)['ETag']
+        cases = [
+            ("static.serve (avant)", lambda: serve(factory.get('/'), BENCHMARK_NAME, document_root=settings.MEDIA_ROOT)),
+            ("serve_media", lambda: serve_media(factory.get('/'), BENCHMARK_NAME)),
+            ("serve_media 304", lambda: serve_media(factory.get('/', HTTP_IF_NONE_MATCH=etag), BENCHMARK_NAME)),
+            ("serve_media plage 64 Ko", lambda: serve_media(factory.get('/', HTTP_RANGE='bytes=0-65535'), BENCHMARK_NAME)),
+        ]
+        for label, view in cases:
+            self.measure(label, view, options['repeat'])
+        with override_settings(MEDIA_ACCEL_REDIRECT='/protected-media/'):
+            self.measure("X-Accel-Redirect", lambda: serve_media(factory.get('/'), BENCHMARK_NAME), options['repeat'])
+
+    def measure(self, label, view, repeat):
+        sent = 0
+        start = time.perf_counter()
+        for _ in range(repeat):
+            response = view()
+            # Le worker est occupé jusqu'au dernier octet envoyé
+            content = b''.join(response.streaming_content) if response.streaming else response.content
+            sent += len(content)
+            response.close()
+        elapsed = time.perf_counter() - start
+        self.stdout.write(
+            f"{label:<26} {elapsed / repeat * 1e6:8.0f} µs/image, "
+            f"{sent / repeat / 1024:6.0f} Ko envoyés par le worker"
+        )
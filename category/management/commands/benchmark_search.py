@@ -0,0 +1,71 @@
+import random
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from accounts.models import User
+from category.models import Product
+from category.search import build_search_document, search_products
+from vendor.models import Vendor
+
+TEAMS = ["Bénin", "Côte d'Ivoire", "Sénégal", "Cameroun", "Maroc", "Nigéria", "Ghana", "Togo", "Mali", "Algérie"]
+KINDS = ["Maillot", "Short", "Survêtement", "Veste", "Chaussettes"]
+EDITIONS = ["domicile", "extérieur", "third", "gardien", "rétro"]
+QUERIES = ["maillot", "cote ivoire", "senegal exterieur", "retro 1998", "gardien maroc", "zzz"]
+
+
+class Command(BaseCommand):
+    help = "Mesure la recherche produit (?search=) sur un catalogue synthétique, puis annule tout."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--products', type=int, default=100000)
+        parser.add_argument('--repeat', type=int, default=20)
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            self.populate(options['products'])
+            self.stdout.write(f"Moteur : {connection.vendor}, {options['products']} produits")
+            for query in QUERIES:
+                self.measure(query, options['repeat'])
+            transaction.set_rollback(True)
+
+    def populate(self, count):
+        user = User.objects.create_user(
+            first_name="Bench", last_name="Search", phone_number="0",
+            username="benchmark-search", email="benchmark-search@example.com",
+        )
+        vendor = Vendor.objects.create(user=user, vendor_name="Benchmark Sports")
+        rng = random.Random(42)
+        products = []
+        for i in range(count):
+            name = f"{rng.choice(KINDS)} {rng.choice(TEAMS)} {rng.choice(EDITIONS)} {rng.randint(1980, 2025)}"
+            products.append(Product(
+                vendor=vendor,
+                product_name=name,
+                slug=f"benchmark-search-{i}",
+                price=15000,
+                image="products/benchmark.jpg",
+                search_document=build_search_document(name, "", [], vendor.vendor_name),
+            ))
+        Product.objects.bulk_create(products, batch_size=2000)
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute("ANALYZE category_product")
+
+    def measure(self, query, repeat):
+        durations = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            results = list(
+                search_products(Product.objects.all(), query)
+                .order_by('-search_rank', '-created_at', '-id')
+                .values_list('id', flat=True)[:20]
+            )
+            durations.append(time.perf_counter() - start)
+        durations.sort()
+        self.stdout.write(
+            f"{query!r:24} {len(results):3} résultats  "
+            f"médiane {durations[len(durations) // 2] * 1000:8.2f} ms  "
+            f"max {durations[-1] * 1000:8.2f} ms"
+        )
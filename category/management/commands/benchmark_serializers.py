@@ -0,0 +1,125 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import RequestFactory
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+
+from accounts.models import User
+from category.models import Category, Product, ProductImage, ProductSize
+from category.serializers import ProductSerializer
+from leMaillotApi.rows import RowReader
+from notifications.models import Notification
+from notifications.serializers import NotificationSerializer
+from order.models import Order, OrderItem, OrderStatusHistory
+from order.serializers import OrderDetailSerializer
+from vendor.models import Vendor
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare les sérialiseurs DRF et la lecture rapide (.values(), leMaillotApi/rows.py) "
+        "sur des produits, commandes et notifications synthétiques, puis annule tout."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', default='1000,10000', help="Nombres de lignes, séparés par des virgules.")
+        parser.add_argument('--repeat', type=int, default=5)
+
+    def handle(self, *args, **options):
+        try:
+            sizes = [int(size) for size in options['rows'].split(',')]
+        except ValueError:
+            raise CommandError("--rows attend des entiers séparés par des virgules.")
+
+        request = Request(RequestFactory().get('/'))
+        cases = [
+            ("produits", Product, ProductSerializer),
+            ("commandes", Order, OrderDetailSerializer),
+            ("notifications", Notification, NotificationSerializer),
+        ]
+        with transaction.atomic():
+            self.populate(max(sizes))
+            self.stdout.write(f"Moteur : {connection.vendor}")
+            for label, model, serializer_class in cases:
+                for size in sizes:
+                    queryset = model.objects.order_by('-created_at', '-id')[:size]
+                    self.measure(f"{label} x{size}", queryset, serializer_class, request, options['repeat'])
+            transaction.set_rollback(True)
+
+    def populate(self, count):
+        user = User.objects.create_user(
+            first_name="Bench", last_name="Rows", phone_number="0",
+            username="benchmark-rows", email="benchmark-rows@example.com",
+        )
+        vendor = Vendor.objects.create(user=user, vendor_name="Benchmark Sports")
+        categories = [Category.objects.create(category_name=f"Benchmark {i}") for i in range(3)]
+
+        products = Product.objects.bulk_create([
+            Product(
+                vendor=vendor, product_name=f"Maillot {i}", slug=f"benchmark-rows-{i}",
+                price="15000.00", discount_price="12500.00", image=f"content/be/{i:064x}.jpg",
+                renditions={'card': {'webp': f"content/ca/{i:064x}.webp"}},
+            )
+            for i in range(count)
+        ], batch_size=2000)
+        Product.categories.through.objects.bulk_create([
+            Product.categories.through(product=product, category=category)
+            for product in products for category in categories[:2]
+        ], batch_size=2000)
+        ProductSize.objects.bulk_create([
+            ProductSize(product=product, size=size, stock=5) for product in products for size in ('M', 'L')
+        ], batch_size=2000)
+        ProductImage.objects.bulk_create([
+            ProductImage(product=product, image=f"content/ga/{product.pk:064x}.jpg") for product in products
+        ], batch_size=2000)
+
+        orders = Order.objects.bulk_create([
+            Order(
+                customer=user, order_number=f"BENCH-{i}", total_price="30000.00", delivery_cost="1000.00",
+                delivery_method='pickup', delivery_address="Rue 1", delivery_city="Cotonou",
+                delivery_postal_code="0000", delivery_country="Bénin",
+            )
+            for i in range(count)
+        ], batch_size=2000)
+        OrderItem.objects.bulk_create([
+            OrderItem(order=order, product=products[index], quantity=2, price="15000.00")
+            for index, order in enumerate(orders)
+        ], batch_size=2000)
+        OrderStatusHistory.objects.bulk_create([
+            OrderStatusHistory(order=order, previous_status='pending', new_status='paid', changed_by=user)
+            for order in orders
+        ], batch_size=2000)
+
+        Notification.objects.bulk_create([
+            Notification(user=user, title=f"Commande {i}", message="Votre commande est prête.", type='ORDER')
+            for i in range(count)
+        ], batch_size=2000)
+
+    def measure(self, label, queryset, serializer_class, request, repeat):
+        context = {'request': request}
+        renderer = JSONRenderer()
+
+        def drf():
+            instances = serializer_class.optimize_queryset(queryset) if hasattr(serializer_class, 'optimize_queryset') else queryset
+            return renderer.render(serializer_class(instances, many=True, context=context).data)
+
+        def rows():
+            reader = RowReader(serializer_class(context=context))
+            return renderer.render(reader.read(reader.values(queryset)))
+
+        durations = {}
+        for name, run in (('drf', drf), ('rows', rows)):
+            timings = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                content = run()
+                timings.append(time.perf_counter() - start)
+            durations[name] = (sorted(timings)[len(timings) // 2], content)
+
+        (drf_time, drf_content), (rows_time, rows_content) = durations['drf'], durations['rows']
+        self.stdout.write(
+            f"{label:22} DRF {drf_time * 1000:9.1f} ms  .values() {rows_time * 1000:9.1f} ms  "
+            f"x{drf_time / rows_time:5.1f}  {'identique' if drf_content == rows_content else 'DIFFÉRENT'}"
+        )
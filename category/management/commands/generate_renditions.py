@@ -0,0 +1,35 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from category.images import generate_renditions, get_pools
+from category.models import Product, ProductImage
+
+
+class Command(BaseCommand):
+    help = "Génère les déclinaisons (thumbnail, card, full) des images produit qui n'en ont pas encore."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--all', action='store_true', help="Régénérer aussi les images déjà traitées.")
+
+    def handle(self, *args, **options):
+        process_pool, _ = get_pools()
+        jobs = []
+        for model in (Product, ProductImage):
+            queryset = model.objects.exclude(image='')
+            if not options['all']:
+                queryset = queryset.filter(renditions={})
+            jobs += [(model, pk) for pk in queryset.values_list('pk', flat=True).iterator()]
+
+        # Les threads n'attendent que le pool de processus : autant de threads que de processus
+        with ThreadPoolExecutor(max_workers=settings.IMAGE_WORKERS) as threads:
+            results = list(threads.map(lambda job: self.generate(*job, process_pool), jobs))
+        self.stdout.write(f"{sum(results)} image(s) traitée(s) sur {len(jobs)}")
+
+    def generate(self, model, pk, process_pool):
+        try:
+            return generate_renditions(model, pk, executor=process_pool) is not None
+        except Exception as exc:
+            self.stderr.write(f"{model.__name__} {pk} : {exc}")
+            return False
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from category.cache import bump_versions, PRODUCTS_SCOPE
+from category.models import Product
+from category.ratings import rebuild_ratings
+
+
+class Command(BaseCommand):
+    help = "Recalcule la note moyenne, le nombre d'avis et l'histogramme des notes de tous les produits."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        updated = rebuild_ratings(Product.objects.all(), batch_size=options['batch_size'])
+        # bulk_update n'envoie pas de signaux : invalider les listes en cache
+        bump_versions(PRODUCTS_SCOPE)
+        self.stdout.write(f"{updated} produit(s) recalculé(s)")
@@ -0,0 +1,75 @@
+# Generated by Django 4.2.4 on 2026-10-18 09:22
+
+import re
+import unicodedata
+
+from django.db import migrations, models
+
+SEARCH_INDEX_NAME = 'product_search_gin_idx'
+# Copie figée de category/search.py au moment de la migration : une
+# modification ultérieure du module ne change pas cette migration
+SEARCH_CONFIG = 'simple'
+_NON_ALNUM = re.compile(r'[^a-z0-9]+')
+
+
+def normalize_text(text):
+    if not text:
+        return ''
+    decomposed = unicodedata.normalize('NFKD', str(text).lower())
+    stripped = ''.join(c for c in decomposed if not unicodedata.combining(c))
+    return _NON_ALNUM.sub(' ', stripped).strip()
+
+
+def build_search_document(product_name, description, category_names, vendor_name):
+    parts = [product_name, description, *category_names, vendor_name]
+    return ' '.join(normalize_text(part) for part in parts if part)
+
+
+def fill_search_documents(apps, schema_editor):
+    Product = apps.get_model('category', 'Product')
+    products = Product.objects.select_related('vendor').prefetch_related('categories')
+    for product in products.iterator(chunk_size=500):
+        product.search_document = build_search_document(
+            product.product_name,
+            product.description,
+            [category.category_name for category in product.categories.all()],
+            product.vendor.vendor_name,
+        )
+        product.save(update_fields=['search_document'])
+
+
+def _search_index(apps):
+    from django.contrib.postgres.indexes import GinIndex
+    from django.contrib.postgres.search import SearchVector
+
+    return GinIndex(SearchVector('search_document', config=SEARCH_CONFIG), name=SEARCH_INDEX_NAME)
+
+
+def create_search_index(apps, schema_editor):
+    # L'index GIN n'existe que sous PostgreSQL ; les autres moteurs utilisent LIKE
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.add_index(apps.get_model('category', 'Product'), _search_index(apps))
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.remove_index(apps.get_model('category', 'Product'), _search_index(apps))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('category', '0010_product_product_available_recent_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='search_document',
+            field=models.TextField(blank=True, default='', editable=False),
+        ),
+        migrations.RunPython(fill_search_documents, migrations.RunPython.noop),
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,61 @@
+# Generated by Django 4.2.4 on 2026-10-18 09:55
+
+from decimal import Decimal, ROUND_HALF_UP
+
+import category.ratings
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def compute_ratings(apps, schema_editor):
+    # Calcul figé ici (copie de category/ratings.py à cette date) : le module
+    # n'est importé que pour la valeur par défaut du champ, comme Django l'exige
+    Product = apps.get_model('category', 'Product')
+    ProductReview = apps.get_model('category', 'ProductReview')
+
+    counts = ProductReview.objects.values_list('product_id', 'rating').annotate(n=Count('id')).order_by()
+    distributions = {}
+    for product_id, rating, n in counts:
+        distributions.setdefault(product_id, {str(star): 0 for star in range(1, 6)})[str(rating)] = n
+
+    rows = []
+    for pk, distribution in distributions.items():
+        count = sum(distribution.values())
+        total = sum(int(star) * n for star, n in distribution.items())
+        rows.append(Product(
+            pk=pk,
+            rating_avg=(Decimal(total) / count).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP),
+            rating_count=count,
+            rating_distribution=distribution,
+        ))
+    Product.objects.bulk_update(rows, ['rating_avg', 'rating_count', 'rating_distribution'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('category', '0012_productimage_productsize_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='rating_avg',
+            field=models.DecimalField(decimal_places=2, default=0, editable=False, max_digits=3),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='rating_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='rating_distribution',
+            field=models.JSONField(default=category.ratings.empty_distribution, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['is_available', '-rating_avg', '-created_at', '-id'], name='product_available_rating_idx'),
+        ),
+        migrations.RunPython(compute_ratings, migrations.RunPython.noop),
+    ]
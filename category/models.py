@@ -2,12 +2,15 @@ from django.db import models
 from django.utils.text import slugify
 from vendor.models import Vendor
 from django.core.validators import MinValueValidator, MaxValueValidator
+from .ratings import empty_distribution
+from .search import build_search_document
+from .storage import content_storage
 
 class Category(models.Model):
     category_name = models.CharField(max_length=50)
     slug = models.SlugField(unique=True)
     description = models.TextField(max_length=250, blank=True, null=True)
-    image = models.ImageField(upload_to='categories/', blank=True, null=True)
+    image = models.ImageField(upload_to='categories/', storage=content_storage, blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -23,6 +26,55 @@ class Category(models.Model):
             self.slug = slugify(self.category_name)
         super().save(*args, **kwargs)
 
+class ProductQuerySet(models.QuerySet):
+    def for_listing(self):
+        """
+        Précharge tout ce que ProductSerializer lit pour chaque produit
+        (vendeur, catégories, tailles, galerie) afin d'éviter le N+1.
+        """
+        return self.select_related('vendor').prefetch_related('categories', 'sizes', 'gallery')
+
+    def fingerprints(self):
+        """
+        Une requête : pour chaque produit, sa date de modification et celles
+        (max + nombre, pour repérer les suppressions) de sa galerie, de ses
+        tailles, de ses avis et de ses catégories. Un lien ajouté ou retiré
+        change `updated_at` du produit (category/signals.py).
+        """
+        def latest(queryset, field='updated_at'):
+            return models.Subquery(
+                queryset.filter(product=models.OuterRef('pk')).order_by()
+                .values('product').annotate(last=models.Max(field)).values('last')
+            )
+
+        def count(queryset):
+            return models.Subquery(
+                queryset.filter(product=models.OuterRef('pk')).order_by()
+                .values('product').annotate(total=models.Count('pk')).values('total')
+            )
+
+        return self.annotate(
+            gallery_updated=latest(ProductImage.objects.all()),
+            gallery_count=count(ProductImage.objects.all()),
+            sizes_updated=latest(ProductSize.objects.all()),
+            sizes_count=count(ProductSize.objects.all()),
+            reviews_updated=latest(ProductReview.objects.all()),
+            reviews_count=count(ProductReview.objects.all()),
+            categories_updated=latest(Product.categories.through.objects.all(), 'category__updated_at'),
+            categories_count=count(Product.categories.through.objects.all()),
+        ).values(
+            'updated_at', 'gallery_updated', 'gallery_count', 'sizes_updated', 'sizes_count',
+            'reviews_updated', 'reviews_count', 'categories_updated', 'categories_count',
+        )
+
+
+# Écrits par .update() en dehors de Product.save() : agrégats des avis
+# (category/ratings.py) et déclinaisons de l'image (category/images.py)
+BACKGROUND_FIELDS = {'rating_avg', 'rating_count', 'rating_distribution', 'renditions'}
+# Champs du produit repris dans search_document
+SEARCH_FIELDS = {'product_name', 'description', 'vendor', 'vendor_id'}
+
+
 class Product(models.Model):
     vendor = models.ForeignKey(Vendor, on_delete=models.CASCADE, related_name='products')
     categories = models.ManyToManyField(Category, related_name='products')
@@ -35,10 +87,26 @@ class Product(models.Model):
     discount_price = models.DecimalField(max_digits=10, decimal_places=2, blank=True, null=True)
     is_new = models.BooleanField(default=False)
     is_featured = models.BooleanField(default=False)
-    image = models.ImageField(upload_to='products/')
+    image = models.ImageField(upload_to='products/', storage=content_storage)
+    # Texte normalisé (nom, description, catégories, vendeur) interrogé par ?search=
+    search_document = models.TextField(blank=True, default='', editable=False)
+    # Agrégats des avis, tenus à jour à chaque avis (category/ratings.py)
+    rating_avg = models.DecimalField(max_digits=3, decimal_places=2, default=0, editable=False)
+    rating_count = models.PositiveIntegerField(default=0, editable=False)
+    rating_distribution = models.JSONField(default=empty_distribution, editable=False)
+    # Déclinaisons redimensionnées de `image` (category/images.py)
+    renditions = models.JSONField(default=dict, blank=True, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = ProductQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['is_available', '-created_at', '-id'], name='product_available_recent_idx'),
+            models.Index(fields=['is_available', '-rating_avg', '-created_at', '-id'], name='product_available_rating_idx'),
+        ]
+
     def get_main_image_url(self):
         main = self.gallery.filter(is_main=True).first()
         return main.image.url if main else self.image.url
@@ -55,13 +123,48 @@ class Product(models.Model):
                 slug = f"{base_slug}-{counter}"
                 counter += 1
             self.slug = slug
+        if kwargs.get('update_fields') is None and not self._state.adding and not kwargs.get('force_insert'):
+            # Une sauvegarde complète ne réécrit pas les valeurs chargées avant
+            # un avis concurrent ou la fin de la génération des déclinaisons
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in BACKGROUND_FIELDS
+            ]
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or SEARCH_FIELDS.intersection(update_fields):
+            # Catégories et nom du vendeur sont suivis par leurs signaux (category/signals.py) :
+            # le document n'est recalculé que si le nom, la description ou le vendeur changent
+            state = self.get_search_state()
+            if self._state.adding or state is None or state != getattr(self, '_search_state', None):
+                self.search_document = build_search_document(
+                    self.product_name,
+                    self.description,
+                    [category.category_name for category in self.categories.all()] if self.pk else [],
+                    self.vendor.vendor_name,
+                )
+                if update_fields is not None:
+                    kwargs['update_fields'] = {*update_fields, 'search_document'}
         super().save(*args, **kwargs)
+        self._search_state = self.get_search_state()
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._search_state = instance.get_search_state()
+        return instance
+
+    def get_search_state(self):
+        # Champs différés (only()/defer()) : état inconnu, le document sera recalculé
+        state = tuple(self.__dict__.get(name, models.DEFERRED) for name in ('product_name', 'description', 'vendor_id'))
+        return None if models.DEFERRED in state else state
 
 class ProductImage(models.Model):
     product = models.ForeignKey('Product', on_delete=models.CASCADE, related_name='gallery')
-    image = models.ImageField(upload_to='products/gallery/')
+    image = models.ImageField(upload_to='products/gallery/', storage=content_storage)
     alt_text = models.CharField(max_length=100, blank=True, null=True)
     is_main = models.BooleanField(default=False)
+    renditions = models.JSONField(default=dict, blank=True, editable=False)
+    updated_at = models.DateTimeField(auto_now=True)
 
     def save(self, *args, **kwargs):
         if self.is_main:
@@ -79,6 +182,7 @@ class ProductSize(models.Model):
     product = models.ForeignKey('Product', on_delete=models.CASCADE, related_name='sizes')
     size = models.CharField(max_length=5, choices=SIZE_CHOICES)
     stock = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         unique_together = ('product', 'size')
@@ -97,6 +201,22 @@ class ProductReview(models.Model):
     class Meta:
         unique_together = ('user', 'product')
         ordering = ['-created_at']
+        indexes = [
+            # Pages d'avis d'un produit, toutes notes ou filtrées par ?rating=
+            models.Index(fields=['product', '-created_at', '-id'], name='review_product_recent_idx'),
+            models.Index(fields=['product', 'rating', '-created_at', '-id'], name='review_product_rating_idx'),
+        ]
 
     def __str__(self):
         return f"{self.user.username} - {self.product.product_name} ({self.rating}★)"
+
+
+class StoredFile(models.Model):
+    """Fichier de ContentAddressedStorage et nombre de champs qui y font référence."""
+    name = models.CharField(max_length=255, primary_key=True)
+    size = models.PositiveBigIntegerField()
+    references = models.PositiveIntegerField(default=1)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.name} ({self.references})"
@@ -0,0 +1,84 @@
+from decimal import Decimal, ROUND_HALF_UP
+
+from django.db import transaction
+from django.db.models import Count
+
+STARS = range(1, 6)
+
+
+def empty_distribution():
+    return {str(star): 0 for star in STARS}
+
+
+def rating_fields(distribution):
+    """Champs `rating_*` d'un produit à partir de son histogramme `{"1": n, ..., "5": n}`."""
+    distribution = {**empty_distribution(), **distribution}
+    count = sum(distribution.values())
+    total = sum(int(star) * n for star, n in distribution.items())
+    average = Decimal(total) / count if count else Decimal(0)
+    return {
+        'rating_avg': average.quantize(Decimal('0.01'), rounding=ROUND_HALF_UP),
+        'rating_count': count,
+        'rating_distribution': distribution,
+    }
+
+
+def apply_rating_change(product_id, removed=None, added=None):
+    """
+    Met à jour les agrégats d'un produit après un avis créé (`added`),
+    supprimé (`removed`) ou modifié (les deux), sans relire ses avis : la
+    ligne du produit est verrouillée le temps du calcul, deux avis
+    simultanés ne peuvent pas perdre une mise à jour.
+    """
+    from .models import Product
+
+    with transaction.atomic():
+        distribution = (
+            Product.objects
+            .select_for_update()
+            .filter(pk=product_id)
+            .values_list('rating_distribution', flat=True)
+            .first()
+        )
+        if distribution is None:
+            # Produit supprimé avec ses avis
+            return
+        distribution = {**empty_distribution(), **distribution}
+        if removed:
+            distribution[str(removed)] = max(distribution[str(removed)] - 1, 0)
+        if added:
+            distribution[str(added)] += 1
+        Product.objects.filter(pk=product_id).update(**rating_fields(distribution))
+
+
+def rebuild_ratings(products, reviews=None, batch_size=1000):
+    """Recalcule les agrégats des produits donnés : une requête groupée et un UPDATE groupé par lot."""
+    if reviews is None:
+        from .models import ProductReview
+        reviews = ProductReview.objects.all()
+
+    updated = 0
+    product_ids = list(products.order_by('pk').values_list('pk', flat=True))
+    for start in range(0, len(product_ids), batch_size):
+        batch = product_ids[start:start + batch_size]
+        distributions = {pk: {} for pk in batch}
+        counts = (
+            reviews
+            .filter(product_id__in=batch)
+            .values_list('product_id', 'rating')
+            .annotate(n=Count('id'))
+            .order_by()
+        )
+        for product_id, rating, n in counts:
+            distributions[product_id][str(rating)] = n
+
+        rows = []
+        for pk, distribution in distributions.items():
+            row = products.model(pk=pk)
+            for field, value in rating_fields(distribution).items():
+                setattr(row, field, value)
+            rows.append(row)
+        with transaction.atomic():
+            products.model.objects.bulk_update(rows, ['rating_avg', 'rating_count', 'rating_distribution'])
+        updated += len(rows)
+    return updated
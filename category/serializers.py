@@ -1,16 +1,30 @@
 from rest_framework import serializers
 import json
+from leMaillotApi.serializers import SparseFieldsetMixin
+from .images import map_renditions, rendition_urls
 from .models import Category, Product, ProductImage, ProductSize, ProductReview
 
-class CategorySerializer(serializers.ModelSerializer):
+class CategorySerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     class Meta:
         model = Category
         fields = ['id', 'category_name', 'slug', 'description', 'image']
 
-class ProductImageSerializer(serializers.ModelSerializer):
+class ProductImageSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+    # 🖼️ Déclinaisons redimensionnées (thumbnail, card, full) en WebP et JPEG
+    renditions = serializers.SerializerMethodField()
+
     class Meta:
         model = ProductImage
-        fields = ['id', 'image', 'alt_text', 'is_main']
+        fields = ['id', 'image', 'renditions', 'alt_text', 'is_main']
+
+    def get_renditions(self, obj):
+        return rendition_urls(obj, self.context.get('request'))
+
+    # Lecture rapide (leMaillotApi/rows.py)
+    def row_renditions(self, reader):
+        url = reader.media_url(ProductImage._meta.get_field('image').storage)
+        reader.require('renditions')
+        return lambda row: map_renditions(row['renditions'], url)
 
 class ProductSizeSerializer(serializers.ModelSerializer):
     class Meta:
@@ -22,24 +36,50 @@ class ProductSizeSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError("Stock cannot be negative.")
         return value
 
-class ProductSerializer(serializers.ModelSerializer):
+def load_row_categories(rows):
+    """`{produit: [(id, slug)]}` des catégories d'un lot de lignes produit."""
+    links = (
+        Product.categories.through.objects
+        .filter(product_id__in=[row['id'] for row in rows])
+        .order_by('category_id')
+        .values_list('product_id', 'category_id', 'category__slug')
+    )
+    categories = {}
+    for product_id, category_id, slug in links:
+        categories.setdefault(product_id, []).append((category_id, slug))
+    return categories
+
+
+class ProductSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     sizes = serializers.CharField(write_only=True)
     categories = serializers.PrimaryKeyRelatedField(queryset=Category.objects.all(), many=True)
     category_slugs = serializers.SerializerMethodField()
     sizes_display = ProductSizeSerializer(many=True, read_only=True, source='sizes')
     gallery = ProductImageSerializer(many=True, read_only=True)
     image = serializers.SerializerMethodField()
+    image_renditions = serializers.SerializerMethodField()
 
     class Meta:
         model = Product
         fields = [
             'id', 'product_name', 'slug', 'description',
             'price', 'discount_price', 'stock', 'is_available',
-            'is_new', 'is_featured', 'image', 'categories', 'category_slugs',
+            'is_new', 'is_featured', 'image', 'image_renditions', 'categories', 'category_slugs',
             'sizes', 'sizes_display', 'gallery', 'vendor',
+            'rating_avg', 'rating_count', 'rating_distribution',
             'created_at', 'updated_at'
         ]
-        read_only_fields = ['vendor', 'slug', 'created_at', 'updated_at']
+        read_only_fields = [
+            'vendor', 'slug', 'rating_avg', 'rating_count', 'rating_distribution', 'created_at', 'updated_at',
+        ]
+
+    # Relations lues par chaque champ (optimize_queryset)
+    field_prefetches = {
+        'categories': ['categories'],
+        'category_slugs': ['categories'],
+        'sizes_display': ['sizes'],
+        'gallery': ['gallery'],
+    }
 
     def get_image(self, obj):
         request = self.context.get('request')
@@ -47,9 +87,31 @@ class ProductSerializer(serializers.ModelSerializer):
             return request.build_absolute_uri(obj.image.url)
         return None
 
+    def get_image_renditions(self, obj):
+        return rendition_urls(obj, self.context.get('request'))
+
     def get_category_slugs(self, obj):
         return [cat.slug for cat in obj.categories.all()]
 
+    # Lecture rapide (leMaillotApi/rows.py)
+    def row_image(self, reader):
+        url = reader.media_url(Product._meta.get_field('image').storage)
+        reader.require('image')
+        return lambda row: url(row['image'])
+
+    def row_image_renditions(self, reader):
+        url = reader.media_url(Product._meta.get_field('image').storage)
+        reader.require('renditions')
+        return lambda row: map_renditions(row['renditions'], url)
+
+    def row_categories(self, reader):
+        categories = reader.batch('categories', load_row_categories)
+        return lambda row: [pk for pk, _ in categories.get(row['id'], ())]
+
+    def row_category_slugs(self, reader):
+        categories = reader.batch('categories', load_row_categories)
+        return lambda row: [slug for _, slug in categories.get(row['id'], ())]
+
     def create(self, validated_data):
         request = self.context.get('request')
 
@@ -83,7 +145,7 @@ class ProductSerializer(serializers.ModelSerializer):
 
         return product
 
-class ProductReviewSerializer(serializers.ModelSerializer):
+class ProductReviewSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     user = serializers.SerializerMethodField(read_only=True)
 
     class Meta:
@@ -106,3 +168,19 @@ class ProductReviewSerializer(serializers.ModelSerializer):
             **validated_data
         )
 
+
+
+class UploadFileSerializer(serializers.Serializer):
+    name = serializers.CharField(max_length=100)
+    size = serializers.IntegerField(min_value=1)
+
+
+class UploadSessionSerializer(serializers.Serializer):
+    files = UploadFileSerializer(many=True, allow_empty=False)
+
+
+class UploadFinalizeSerializer(serializers.Serializer):
+    session = serializers.CharField()
+    alt_texts = serializers.ListField(
+        child=serializers.CharField(max_length=100, allow_blank=True), required=False,
+    )
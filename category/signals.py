@@ -0,0 +1,150 @@
+from django.db import transaction
+from django.db.models.signals import pre_save, post_save, post_delete, m2m_changed
+from django.dispatch import receiver
+from django.utils import timezone
+
+from vendor.models import Vendor
+from .cache import bump_versions, invalidate_products, vendor_scope, CATEGORIES_SCOPE, PRODUCTS_SCOPE
+from .models import Category, Product, ProductImage, ProductSize, ProductReview
+from .images import delete_renditions, schedule_renditions
+from .ratings import apply_rating_change
+from .storage import release_file
+from .search import refresh_search_documents
+
+
+@receiver(m2m_changed, sender=Product.categories.through)
+def product_categories_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if reverse and action == 'pre_clear':
+        # Catégorie vidée : mémoriser ses produits avant la suppression des liens
+        instance._cleared_product_ids = list(instance.products.values_list('pk', flat=True))
+        return
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+
+    if not reverse:
+        product_ids = [instance.pk]
+    elif action == 'post_clear':
+        product_ids = getattr(instance, '_cleared_product_ids', [])
+    else:
+        product_ids = pk_set or []
+    # Liens modifiés : nouvelle date de modification, donc nouvel ETag (PublicProductDetailAPIView)
+    Product.objects.filter(pk__in=product_ids).update(updated_at=timezone.now())
+    refresh_search_documents(Product.objects.filter(pk__in=product_ids))
+    invalidate_products(product_ids)
+
+
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+def product_changed(sender, instance, **kwargs):
+    invalidate_products([instance.pk], [instance.vendor_id])
+
+
+@receiver(post_save, sender=Product)
+@receiver(post_save, sender=ProductImage)
+def product_image_saved(sender, instance, **kwargs):
+    # Nouvelle image : déclinaisons générées en arrière-plan après le commit
+    schedule_renditions(instance)
+
+
+@receiver(post_delete, sender=Product)
+@receiver(post_delete, sender=ProductImage)
+def product_image_deleted(sender, instance, **kwargs):
+    transaction.on_commit(lambda: delete_renditions(instance.renditions, instance.image.storage))
+
+
+@receiver(pre_save, sender=Category)
+@receiver(pre_save, sender=Product)
+@receiver(pre_save, sender=ProductImage)
+def image_saving(sender, instance, update_fields=None, **kwargs):
+    # Image avant modification, rendue au stockage si elle est remplacée
+    if instance.pk and (update_fields is None or 'image' in update_fields):
+        instance._previous_image = sender.objects.filter(pk=instance.pk).values_list('image', flat=True).first()
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_save, sender=Product)
+@receiver(post_save, sender=ProductImage)
+def image_saved(sender, instance, **kwargs):
+    previous = getattr(instance, '_previous_image', None)
+    instance._previous_image = None
+    if previous and previous != instance.image.name:
+        release_file(instance.image.storage, previous)
+
+
+@receiver(post_delete, sender=Category)
+@receiver(post_delete, sender=Product)
+@receiver(post_delete, sender=ProductImage)
+def image_deleted(sender, instance, **kwargs):
+    # Une référence par enregistrement : suppression directe ou en cascade
+    release_file(instance.image.storage, instance.image.name)
+
+
+@receiver(post_save, sender=ProductImage)
+@receiver(post_delete, sender=ProductImage)
+@receiver(post_save, sender=ProductSize)
+@receiver(post_delete, sender=ProductSize)
+def product_detail_changed(sender, instance, **kwargs):
+    invalidate_products([instance.product_id])
+
+
+@receiver(pre_save, sender=ProductReview)
+def product_review_saving(sender, instance, **kwargs):
+    # Note avant modification, pour corriger l'histogramme du produit
+    if instance.pk:
+        instance._previous_rating = (
+            ProductReview.objects.filter(pk=instance.pk).values_list('rating', flat=True).first()
+        )
+
+
+@receiver(post_save, sender=ProductReview)
+def product_review_saved(sender, instance, created, **kwargs):
+    previous = None if created else getattr(instance, '_previous_rating', None)
+    if previous != instance.rating:
+        apply_rating_change(instance.product_id, removed=previous, added=instance.rating)
+    # La note apparaît dans les listes : invalider aussi les listes du vendeur
+    invalidate_products([instance.product_id])
+
+
+@receiver(post_delete, sender=ProductReview)
+def product_review_deleted(sender, instance, **kwargs):
+    apply_rating_change(instance.product_id, removed=instance.rating)
+    invalidate_products([instance.product_id])
+
+
+@receiver(post_save, sender=Category)
+def category_saved(sender, instance, created, **kwargs):
+    if not created:
+        refresh_search_documents(instance.products.all())
+    bump_versions(CATEGORIES_SCOPE)
+
+
+@receiver(post_delete, sender=Category)
+def category_deleted(sender, instance, **kwargs):
+    bump_versions(CATEGORIES_SCOPE)
+
+
+@receiver(pre_save, sender=Vendor)
+def vendor_saving(sender, instance, update_fields=None, **kwargs):
+    # Nom avant modification : seul un renommage touche les documents de recherche
+    instance._previous_vendor_name = None
+    if instance.pk and (update_fields is None or 'vendor_name' in update_fields):
+        instance._previous_vendor_name = (
+            Vendor.objects.filter(pk=instance.pk).values_list('vendor_name', flat=True).first()
+        )
+
+
+@receiver(post_save, sender=Vendor)
+def vendor_saved(sender, instance, created, **kwargs):
+    scopes = [vendor_scope(instance.pk)]
+    previous = getattr(instance, '_previous_vendor_name', None)
+    instance._previous_vendor_name = None
+    renamed = not created and previous is not None and previous != instance.vendor_name
+    if renamed and refresh_search_documents(instance.products.all()):
+        # Le nom du vendeur fait partie du document de recherche
+        scopes.append(PRODUCTS_SCOPE)
+    bump_versions(*scopes)
+
+
+@receiver(post_delete, sender=Vendor)
+def vendor_deleted(sender, instance, **kwargs):
+    bump_versions(vendor_scope(instance.pk))
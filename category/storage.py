@@ -0,0 +1,115 @@
+import hashlib
+import os
+import uuid
+
+from django.core.files.storage import FileSystemStorage
+from django.db import IntegrityError, transaction
+from django.db.models import F
+
+# Préfixe des fichiers nommés par leur contenu : content/ab/ab12...ef.jpg
+CONTENT_PREFIX = 'content'
+# Fichiers en cours d'écriture, hors du préfixe servi publiquement
+TEMPORARY_PREFIX = 'content-tmp'
+
+
+def is_content_addressed(name):
+    # content/tmp/ : temporaires d'avant TEMPORARY_PREFIX, jamais publiés
+    return name.startswith(f"{CONTENT_PREFIX}/") and not name.startswith(f"{CONTENT_PREFIX}/tmp/")
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """
+    Stockage des images du catalogue nommées par l'empreinte SHA-256 de leur
+    contenu : une photo envoyée dix fois n'est écrite qu'une fois. Chaque
+    `save` ajoute une référence (StoredFile), chaque `delete` en retire une ;
+    le fichier n'est supprimé qu'avec la dernière. Un nom ne désigne jamais
+    deux contenus différents : il peut être mis en cache indéfiniment.
+    """
+
+    def get_available_name(self, name, max_length=None):
+        # Le nom définitif dépend du contenu : il est calculé dans _save
+        return name
+
+    def _save(self, name, content):
+        from .models import StoredFile
+
+        # Un seul passage : empreinte calculée pendant l'écriture d'un fichier temporaire
+        temporary = self.path(f"{TEMPORARY_PREFIX}/{uuid.uuid4().hex}")
+        os.makedirs(os.path.dirname(temporary), exist_ok=True)
+        digest = hashlib.sha256()
+        size = 0
+        if hasattr(content, 'seek'):
+            content.seek(0)
+        with open(temporary, 'wb') as output:
+            for chunk in content.chunks():
+                digest.update(chunk)
+                output.write(chunk)
+                size += len(chunk)
+
+        digest = digest.hexdigest()
+        extension = os.path.splitext(name)[1].lower()
+        name = f"{CONTENT_PREFIX}/{digest[:2]}/{digest}{extension}"
+        full_path = self.path(name)
+        if os.path.exists(full_path):
+            os.remove(temporary)
+        else:
+            os.makedirs(os.path.dirname(full_path), exist_ok=True)
+            # Même contenu écrit en parallèle : le remplacement atomique est sans effet
+            os.replace(temporary, full_path)
+            if self.file_permissions_mode is not None:
+                os.chmod(full_path, self.file_permissions_mode)
+
+        references = StoredFile.objects.filter(name=name)
+        with transaction.atomic():
+            if not references.update(references=F('references') + 1):
+                try:
+                    with transaction.atomic():
+                        StoredFile.objects.create(name=name, size=size)
+                except IntegrityError:
+                    references.update(references=F('references') + 1)
+        return name
+
+    def delete(self, name):
+        from .models import StoredFile
+
+        if not is_content_addressed(name):
+            # Fichier antérieur au stockage par contenu : comportement habituel
+            return super().delete(name)
+
+        with transaction.atomic():
+            stored = StoredFile.objects.select_for_update().filter(name=name).first()
+            if stored is None:
+                return
+            if stored.references > 1:
+                StoredFile.objects.filter(name=name).update(references=F('references') - 1)
+                return
+            stored.delete()
+            transaction.on_commit(lambda: self._unlink(name))
+
+    def _unlink(self, name):
+        from .models import StoredFile
+
+        # Contenu ré-envoyé entre-temps : le fichier sert de nouveau
+        if not StoredFile.objects.filter(name=name).exists():
+            super().delete(name)
+
+
+def release_file(storage, name):
+    """
+    Rend le fichier `name` d'un enregistrement supprimé ou remplacé : dans
+    la transaction pour le stockage par contenu (décompte annulé avec elle),
+    après le commit pour un ancien fichier, supprimé directement.
+    """
+    if not name:
+        return
+    if is_content_addressed(name):
+        storage.delete(name)
+    else:
+        transaction.on_commit(lambda: storage.delete(name))
+
+
+_content_storage = ContentAddressedStorage()
+
+
+def content_storage():
+    return _content_storage
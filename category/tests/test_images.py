@@ -0,0 +1,138 @@
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
+
+from django.core.cache import cache
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from PIL import Image
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from accounts.models import User
+from category.images import generate_renditions, rendition_paths
+from category.models import Product, ProductImage
+from vendor.models import Vendor
+
+
+def image_upload(name='photo.png', size=(2000, 1000)):
+    output = BytesIO()
+    Image.new('RGB', size, (200, 30, 30)).save(output, 'PNG')
+    return SimpleUploadedFile(name, output.getvalue(), content_type='image/png')
+
+
+@override_settings(IMAGE_RENDITIONS_ASYNC=False)
+class ProductImageRenditionTests(APITestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        media = override_settings(MEDIA_ROOT=self.media_root)
+        media.enable()
+        self.addCleanup(media.disable)
+
+        self.user = User.objects.create_user(
+            first_name="Vendor",
+            last_name="Test",
+            phone_number="22990000000",
+            username="vendor",
+            email="vendor@example.com",
+            password="vendorpass123",
+        )
+        self.client.force_authenticate(self.user)
+        self.vendor = Vendor.objects.create(user=self.user, vendor_name="Boutique", is_approved=True)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.product = Product.objects.create(
+                vendor=self.vendor, product_name="Maillot", price="15000.00", stock=10, image=image_upload(),
+            )
+
+    def assert_renditions(self, renditions):
+        for name, expected in (('full', (1280, 640)), ('card', (480, 240)), ('thumbnail', (160, 80))):
+            for extension, image_format in (('webp', 'WEBP'), ('jpeg', 'JPEG')):
+                with default_storage.open(renditions[name][extension]) as rendition, Image.open(rendition) as image:
+                    self.assertEqual((image.format, image.size), (image_format, expected))
+
+    def test_uploads_get_renditions_exposed_by_serializers(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                reverse('upload-multiple-images', kwargs={'pk': self.product.pk}),
+                {'images': [image_upload('a.png'), image_upload('b.png', (300, 600))]},
+                format='multipart',
+            )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.renditions['source'], self.product.image.name)
+        self.assert_renditions(self.product.renditions)
+
+        small = ProductImage.objects.latest('id')
+        # Jamais agrandie au-delà de l'original
+        self.assertEqual(Image.open(default_storage.open(small.renditions['full']['webp'])).size, (300, 600))
+
+        response = self.client.get(reverse('public-product-detail', kwargs={'pk': self.product.pk}))
+        self.assertTrue(response.data['image_renditions']['card']['webp'].endswith('.webp'))
+        self.assertEqual(len(response.data['gallery']), 2)
+        self.assertEqual(set(response.data['gallery'][0]['renditions']), {'full', 'card', 'thumbnail'})
+
+    def test_multipart_upload_inserts_images_in_one_query(self):
+        with CaptureQueriesContext(connection) as queries, self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                reverse('upload-multiple-images', kwargs={'pk': self.product.pk}),
+                {'images': [image_upload(f'{i}.png', (200, 100)) for i in range(3)]},
+                format='multipart',
+            )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        inserts = [q['sql'] for q in queries if q['sql'].startswith('INSERT') and 'productimage' in q['sql']]
+        self.assertEqual(len(inserts), 1)
+        self.assertTrue(all(image.renditions for image in ProductImage.objects.all()))
+
+    def test_unreadable_image_is_logged_without_failing_the_upload(self):
+        corrupt = SimpleUploadedFile('corrompue.png', b'pas une image', content_type='image/png')
+        with self.assertLogs('category.images', 'ERROR'), self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                reverse('upload-multiple-images', kwargs={'pk': self.product.pk}),
+                {'images': [corrupt]},
+                format='multipart',
+            )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(ProductImage.objects.get().renditions, {})
+
+    def test_renditions_are_rendered_in_a_process_pool(self):
+        image = ProductImage(product=self.product, image=image_upload())
+        image.renditions = {'source': 'ancienne.png'}
+        ProductImage.objects.bulk_create([image])
+
+        with ProcessPoolExecutor(max_workers=1) as executor:
+            renditions = generate_renditions(ProductImage, image.pk, executor=executor)
+
+        self.assertEqual(ProductImage.objects.get(pk=image.pk).renditions, renditions)
+        self.assert_renditions(renditions)
+
+    def test_stale_product_save_keeps_generated_renditions(self):
+        # self.product a été chargé avant la génération : renditions vide en mémoire
+        self.assertEqual(self.product.renditions, {})
+        renditions = Product.objects.get(pk=self.product.pk).renditions
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.product.price = "12000.00"
+            self.product.save()
+
+        product = Product.objects.get(pk=self.product.pk)
+        self.assertEqual(product.price, 12000)
+        self.assertEqual(product.renditions, renditions)
+        self.assert_renditions(product.renditions)
+
+    def test_deleted_image_removes_its_renditions(self):
+        self.product.refresh_from_db()
+        paths = rendition_paths(self.product.renditions)
+        self.assertEqual(len(paths), 6)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.product.delete()
+        self.assertFalse(any(default_storage.exists(path) for path in paths))
@@ -0,0 +1,173 @@
+from decimal import Decimal
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from accounts.models import User
+from category.models import Product, ProductReview
+from vendor.models import Vendor
+
+
+def create_user(username):
+    return User.objects.create_user(
+        first_name="Test",
+        last_name="User",
+        phone_number="22990000000",
+        username=username,
+        email=f"{username}@example.com",
+        password="securepass123",
+    )
+
+
+class ProductRatingTests(APITestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.vendor = Vendor.objects.create(vendor_name="Boutique", is_approved=True)
+        self.products = [
+            Product.objects.create(
+                vendor=self.vendor,
+                product_name=f"Maillot {i}",
+                price="15000.00",
+                stock=10,
+                image="products/maillot.jpg",
+            )
+            for i in range(3)
+        ]
+        self.users = [create_user(f"client{i}") for i in range(3)]
+
+    def review(self, user, product, rating):
+        self.client.force_authenticate(user)
+        return self.client.post(
+            reverse('product-reviews-list', kwargs={'product_id': product.pk}), {'rating': rating}, format='json',
+        )
+
+    def test_aggregates_follow_review_changes(self):
+        product = self.products[0]
+        for user, rating in zip(self.users, (5, 4, 4)):
+            self.assertEqual(self.review(user, product, rating).status_code, status.HTTP_201_CREATED)
+
+        review = ProductReview.objects.get(user=self.users[0])
+        self.client.force_authenticate(self.users[0])
+        url = reverse('product-reviews-detail', kwargs={'product_id': product.pk, 'pk': review.pk})
+        self.client.patch(url, {'rating': 1}, format='json')
+
+        product.refresh_from_db()
+        self.assertEqual(product.rating_count, 3)
+        self.assertEqual(product.rating_avg, Decimal('3.00'))
+        self.assertEqual(product.rating_distribution, {'1': 1, '2': 0, '3': 0, '4': 2, '5': 0})
+
+        self.client.delete(url)
+        product.refresh_from_db()
+        self.assertEqual(product.rating_count, 2)
+        self.assertEqual(product.rating_avg, Decimal('4.00'))
+
+        response = self.client.get(reverse('product-review-summary', kwargs={'product_id': product.pk}))
+        self.assertEqual(response.data, {'average_rating': 4.0, 'total_reviews': 2, 'distribution': {4: 2}})
+
+    def test_public_list_sorts_and_filters_by_rating(self):
+        self.review(self.users[0], self.products[1], 5)
+        self.review(self.users[0], self.products[2], 3)
+        self.client.force_authenticate(None)
+
+        response = self.client.get(reverse('public-product-list'), {'ordering': 'rating'})
+        self.assertEqual(
+            [item['id'] for item in response.data['results']],
+            [self.products[1].pk, self.products[2].pk, self.products[0].pk],
+        )
+        self.assertEqual(response.data['results'][0]['rating_count'], 1)
+
+        response = self.client.get(reverse('public-product-list'), {'min_rating': 4})
+        self.assertEqual([item['id'] for item in response.data['results']], [self.products[1].pk])
+
+    def test_min_rating_must_be_a_number_between_0_and_5(self):
+        for value in ('abc', '5.5', '-1', 'NaN'):
+            response = self.client.get(reverse('public-product-list'), {'min_rating': value})
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, value)
+        response = self.client.get(reverse('public-product-list'), {'min_rating': '4.5'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_product_save_keeps_concurrent_review_aggregates(self):
+        stale = Product.objects.get(pk=self.products[0].pk)
+        self.review(self.users[0], self.products[0], 5)
+
+        stale.stock = 3
+        stale.save()
+
+        product = Product.objects.get(pk=stale.pk)
+        self.assertEqual(product.stock, 3)
+        self.assertEqual(product.rating_avg, Decimal('5.00'))
+        self.assertEqual(product.rating_count, 1)
+        self.assertEqual(product.rating_distribution['5'], 1)
+
+    def test_rebuild_command_recomputes_from_reviews(self):
+        self.review(self.users[0], self.products[0], 2)
+        self.review(self.users[1], self.products[0], 5)
+        Product.objects.update(rating_avg=0, rating_count=0, rating_distribution={})
+
+        call_command('rebuild_product_ratings', stdout=StringIO())
+
+        product = Product.objects.get(pk=self.products[0].pk)
+        self.assertEqual(product.rating_avg, Decimal('3.50'))
+        self.assertEqual(product.rating_count, 2)
+        self.assertEqual(product.rating_distribution, {'1': 0, '2': 1, '3': 0, '4': 0, '5': 1})
+        self.assertEqual(Product.objects.get(pk=self.products[1].pk).rating_count, 0)
+
+
+class ProductReviewListTests(APITestCase):
+
+    def setUp(self):
+        vendor = Vendor.objects.create(vendor_name="Boutique", is_approved=True)
+        self.product = Product.objects.create(
+            vendor=vendor, product_name="Maillot", price="15000.00", stock=10, image="products/maillot.jpg",
+        )
+        self.url = reverse('product-reviews-list', kwargs={'product_id': self.product.pk})
+
+    def add_reviews(self, count, rating=4):
+        for i in range(count):
+            ProductReview.objects.create(
+                user=create_user(f"client{ProductReview.objects.count()}"), product=self.product, rating=rating,
+            )
+
+    def count_queries(self, params=None):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url, params or {})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response, len(queries)
+
+    def test_review_queries_do_not_grow_with_page_size(self):
+        self.add_reviews(2)
+        _, few = self.count_queries()
+        self.add_reviews(8)
+        response, many = self.count_queries()
+
+        self.assertEqual(many, few)
+        self.assertEqual(len(response.data['results']), 10)
+        self.assertIn('username', response.data['results'][0]['user'])
+
+    def test_reviews_are_paged_by_cursor(self):
+        self.add_reviews(5)
+        seen = []
+        response, _ = self.count_queries({'page_size': 2})
+        while True:
+            seen += [review['id'] for review in response.data['results']]
+            if not response.data['next']:
+                break
+            response = self.client.get(response.data['next'])
+
+        expected = list(ProductReview.objects.order_by('-created_at', '-id').values_list('id', flat=True))
+        self.assertEqual(seen, expected)
+
+    def test_reviews_filtered_by_rating(self):
+        self.add_reviews(2, rating=5)
+        self.add_reviews(3, rating=2)
+
+        response, _ = self.count_queries({'rating': 5})
+        self.assertEqual([review['rating'] for review in response.data['results']], [5, 5])
+        self.assertEqual(self.client.get(self.url, {'rating': 9}).status_code, status.HTTP_400_BAD_REQUEST)
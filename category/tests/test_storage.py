@@ -0,0 +1,222 @@
+import os
+import shutil
+import tempfile
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from accounts.models import User
+
+from category.models import Product, ProductImage, StoredFile
+from category.storage import content_storage
+from vendor.models import Vendor
+from .test_images import image_upload
+
+
+@override_settings(IMAGE_RENDITIONS_ASYNC=False)
+class ContentAddressedStorageTests(TestCase):
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        media = override_settings(MEDIA_ROOT=self.media_root)
+        media.enable()
+        self.addCleanup(media.disable)
+        self.vendor = Vendor.objects.create(vendor_name="Boutique", is_approved=True)
+
+    def create_product(self, upload):
+        return Product.objects.create(
+            vendor=self.vendor, product_name="Maillot", price="15000.00", stock=10, image=upload,
+        )
+
+    def test_identical_uploads_share_one_file(self):
+        first = self.create_product(image_upload('face.png'))
+        second = self.create_product(image_upload('copie.png'))
+        gallery = ProductImage.objects.create(product=second, image=image_upload('galerie.png'))
+
+        self.assertEqual(first.image.name, second.image.name)
+        self.assertEqual(gallery.image.name, first.image.name)
+        self.assertRegex(first.image.name, r'^content/[0-9a-f]{2}/[0-9a-f]{64}\.png$')
+        self.assertEqual(StoredFile.objects.get(name=first.image.name).references, 3)
+        self.assertEqual(len(os.listdir(os.path.dirname(first.image.path))), 1)
+
+    def test_file_is_unlinked_with_its_last_reference(self):
+        first = self.create_product(image_upload())
+        second = self.create_product(image_upload())
+        path = first.image.path
+
+        with self.captureOnCommitCallbacks(execute=True):
+            first.image.delete(save=False)
+        self.assertTrue(os.path.exists(path))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            second.image.delete(save=False)
+        self.assertFalse(os.path.exists(path))
+        self.assertFalse(StoredFile.objects.exists())
+
+    def references(self, name):
+        return StoredFile.objects.filter(name=name).values_list('references', flat=True).first()
+
+    def test_deleting_a_product_releases_its_images(self):
+        product = self.create_product(image_upload('face.png'))
+        ProductImage.objects.create(product=product, image=image_upload('galerie.png', size=(300, 300)))
+        other = self.create_product(image_upload('copie.png'))
+        self.assertEqual(self.references(product.image.name), 2)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            product.delete()
+
+        # Galerie supprimée en cascade : plus aucune référence
+        self.assertEqual(self.references(other.image.name), 1)
+        self.assertEqual(StoredFile.objects.count(), 1)
+
+    def test_replacing_an_image_releases_the_previous_one(self):
+        image = ProductImage.objects.create(product=self.create_product(image_upload()), image=image_upload('a.png', size=(300, 300)))
+        previous = image.image.name
+
+        image.image = image_upload('b.png', size=(200, 200))
+        with self.captureOnCommitCallbacks(execute=True):
+            image.save()
+
+        self.assertIsNone(self.references(previous))
+        self.assertEqual(self.references(image.image.name), 1)
+
+        # Sauvegarde sans changement d'image : rien n'est rendu
+        image.alt_text = "Dos"
+        image.save()
+        self.assertEqual(self.references(image.image.name), 1)
+
+    def test_delete_view_releases_the_file_once(self):
+        user = User.objects.create_user(
+            first_name="Vendor", last_name="Test", phone_number="22990000000",
+            username="vendor", email="vendor@example.com", password="vendorpass123",
+        )
+        self.vendor.user = user
+        self.vendor.save()
+        product = self.create_product(image_upload())
+        image = ProductImage.objects.create(product=product, image=image_upload('copie.png'))
+        self.assertEqual(self.references(image.image.name), 2)
+
+        client = APIClient()
+        client.force_authenticate(user)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = client.delete(reverse('delete-product-image', args=[image.pk]))
+
+        self.assertEqual(response.status_code, 204)
+        self.assertEqual(self.references(product.image.name), 1)
+
+    def test_media_served_with_immutable_cache_headers(self):
+        name = content_storage().save('x.txt', SimpleUploadedFile('x.txt', b'contenu'))
+
+        response = self.client.get(f"/media/{name}")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Cache-Control'], 'public, max-age=31536000, immutable')
+        self.assertEqual(self.client.get('/media/vendor/license/permis.png').status_code, 404)
+
+
+class MediaServingTests(TestCase):
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        media = override_settings(MEDIA_ROOT=self.media_root)
+        media.enable()
+        self.addCleanup(media.disable)
+        self.data = bytes(range(256)) * 40
+        self.name = content_storage().save('photo.jpg', SimpleUploadedFile('photo.jpg', self.data))
+        self.url = f"/media/{self.name}"
+
+    def test_etag_revalidation_answers_304(self):
+        response = self.client.get(self.url)
+        self.assertEqual(b''.join(response.streaming_content), self.data)
+        self.assertEqual(response['ETag'], f'"{os.path.splitext(os.path.basename(self.name))[0]}"')
+        self.assertEqual(response['Content-Type'], 'image/jpeg')
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['Cache-Control'], 'public, max-age=31536000, immutable')
+
+    def test_path_traversal_out_of_content_is_404(self):
+        os.makedirs(os.path.join(self.media_root, 'vendor/license'))
+        with open(os.path.join(self.media_root, 'vendor/license/kyc.jpg'), 'wb') as file:
+            file.write(b'prive')
+        for url in (
+            '/media/content/../vendor/license/kyc.jpg',
+            '/media/content/%2e%2e/vendor/license/kyc.jpg',
+            '/media/content/xx/../../vendor/license/kyc.jpg',
+            '/media/content/../../etc/passwd',
+        ):
+            self.assertEqual(self.client.get(url).status_code, 404, url)
+        # Chemin non normalisé mais qui reste dans content/ : servi
+        directory, filename = os.path.split(self.name)
+        self.assertEqual(self.client.get(f"/media/{directory}/./{filename}").status_code, 200)
+
+    def test_temporary_uploads_are_not_served(self):
+        # Les temporaires du stockage ne sont jamais écrits sous content/
+        self.assertFalse(os.path.exists(os.path.join(self.media_root, 'content', 'tmp')))
+        self.assertEqual(os.listdir(os.path.join(self.media_root, 'content-tmp')), [])
+        for name in ('content/tmp/0123abcd', 'content-tmp/0123abcd'):
+            os.makedirs(os.path.join(self.media_root, os.path.dirname(name)), exist_ok=True)
+            with open(os.path.join(self.media_root, name), 'wb') as file:
+                file.write(b'moitie')
+            self.assertEqual(self.client.get(f"/media/{name}").status_code, 404, name)
+
+    def test_range_requests(self):
+        response = self.client.get(self.url, HTTP_RANGE='bytes=100-199')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response['Content-Range'], f"bytes 100-199/{len(self.data)}")
+        self.assertEqual(b''.join(response.streaming_content), self.data[100:200])
+
+        response = self.client.get(self.url, HTTP_RANGE='bytes=-10')
+        self.assertEqual(b''.join(response.streaming_content), self.data[-10:])
+
+        response = self.client.get(self.url, HTTP_RANGE=f"bytes={len(self.data)}-")
+        self.assertEqual(response.status_code, 416)
+
+        # If-Range périmé : fichier entier
+        response = self.client.get(self.url, HTTP_RANGE='bytes=0-9', HTTP_IF_RANGE='"ancien"')
+        self.assertEqual(response.status_code, 200)
+
+    @override_settings(MEDIA_ACCEL_REDIRECT='/protected-media/')
+    def test_accel_redirect_offloads_to_nginx(self):
+        response = self.client.get(self.url)
+
+        self.assertEqual(response['X-Accel-Redirect'], f"/protected-media/{self.name}")
+        self.assertEqual(response.content, b'')
+        self.assertIn('ETag', response)
+
+    def test_precompressed_variants_follow_accept_encoding(self):
+        response = self.client.get(self.url, HTTP_ACCEPT_ENCODING='gzip')
+        self.assertNotIn('Content-Encoding', response)
+        self.assertNotIn('Accept-Encoding', response.get('Vary', ''))
+
+        full_path = os.path.join(self.media_root, self.name)
+        for suffix in ('.gz', '.br'):
+            with open(full_path + suffix, 'wb') as file:
+                file.write(suffix.encode())
+
+        for accepted, coding in (
+            ('gzip', 'gzip'),
+            ('br;q=0.5, gzip', 'gzip'),
+            ('gzip, br', 'br'),
+            ('*', 'br'),
+            ('gzip;q=0', None),
+            ('x-gzip', None),
+            ('*;q=0', None),
+            ('', None),
+        ):
+            response = self.client.get(self.url, HTTP_ACCEPT_ENCODING=accepted)
+            self.assertEqual(response.get('Content-Encoding'), coding, accepted)
+            self.assertIn('Accept-Encoding', response['Vary'], accepted)
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
+        self.assertIn('Accept-Encoding', response['Vary'])
+        response = self.client.get(self.url, HTTP_RANGE='bytes=0-9', HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response.status_code, 206)
+        self.assertIn('Accept-Encoding', response['Vary'])
+        with override_settings(MEDIA_ACCEL_REDIRECT='/protected-media/'):
+            self.assertIn('Accept-Encoding', self.client.get(self.url)['Vary'])
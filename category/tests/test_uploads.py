@@ -0,0 +1,154 @@
+import shutil
+import tempfile
+from io import BytesIO
+from unittest import mock
+
+from django.core.cache import cache
+from django.db import DatabaseError, connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from PIL import Image
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from accounts.models import User
+from category.models import Product, ProductImage, StoredFile
+from vendor.models import Vendor
+
+
+def image_bytes(size=(800, 600), image_format='JPEG'):
+    output = BytesIO()
+    Image.new('RGB', size, (30, 30, 200)).save(output, image_format)
+    return output.getvalue()
+
+
+def create_user(username):
+    return User.objects.create_user(
+        first_name="Vendor",
+        last_name="Test",
+        phone_number="22990000000",
+        username=username,
+        email=f"{username}@example.com",
+        password="vendorpass123",
+    )
+
+
+@override_settings(IMAGE_RENDITIONS_ASYNC=False)
+class UploadSessionTests(APITestCase):
+
+    def setUp(self):
+        cache.clear()
+        root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, root, ignore_errors=True)
+        storage = override_settings(MEDIA_ROOT=f"{root}/media", UPLOAD_TEMP_DIR=f"{root}/uploads")
+        storage.enable()
+        self.addCleanup(storage.disable)
+
+        self.user = create_user("vendor")
+        self.client.force_authenticate(self.user)
+        vendor = Vendor.objects.create(user=self.user, vendor_name="Boutique", is_approved=True)
+        self.product = Product.objects.create(
+            vendor=vendor, product_name="Maillot", price="15000.00", stock=10, image="products/maillot.jpg",
+        )
+        self.files = [image_bytes(), image_bytes((400, 400))]
+
+    def start_session(self, names=None):
+        names = names or [f"photo{i}.jpg" for i in range(len(self.files))]
+        response = self.client.post(
+            reverse('upload-session', kwargs={'pk': self.product.pk}),
+            {'files': [{'name': name, 'size': len(data)} for name, data in zip(names, self.files)]},
+            format='json',
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        return response.data
+
+    def put(self, url, data, content_range=None):
+        headers = {'HTTP_CONTENT_RANGE': content_range} if content_range else {}
+        self.client.force_authenticate(None)
+        response = self.client.put(url, data, content_type='application/octet-stream', **headers)
+        self.client.force_authenticate(self.user)
+        return response
+
+    def finalize(self, session, **extra):
+        return self.client.post(
+            reverse('upload-session-finalize', kwargs={'pk': self.product.pk}),
+            {'session': session, **extra},
+            format='json',
+        )
+
+    def test_chunked_uploads_are_attached_in_one_insert(self):
+        session = self.start_session()
+        first, second = session['uploads']
+        data = self.files[0]
+        middle = len(data) // 2
+        self.assertEqual(self.put(first['url'], data[:middle], f"bytes 0-{middle - 1}/{len(data)}").status_code, 200)
+        response = self.put(first['url'], data[middle:], f"bytes {middle}-{len(data) - 1}/{len(data)}")
+        self.assertEqual(response.data['received'], len(data))
+        self.put(second['url'], self.files[1])
+
+        with CaptureQueriesContext(connection) as queries, self.captureOnCommitCallbacks(execute=True):
+            response = self.finalize(session['session'], alt_texts=["Face", "Dos"])
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        inserts = [q['sql'] for q in queries if q['sql'].startswith('INSERT') and 'productimage' in q['sql']]
+        self.assertEqual(len(inserts), 1)
+        images = list(ProductImage.objects.filter(product=self.product).order_by('id'))
+        self.assertEqual([image.alt_text for image in images], ["Face", "Dos"])
+        self.assertEqual(images[0].image.read(), self.files[0])
+        # Déclinaisons générées comme pour un envoi multipart
+        self.assertEqual(images[1].renditions['source'], images[1].image.name)
+
+    def test_incomplete_upload_is_rejected(self):
+        session = self.start_session()
+        self.put(session['uploads'][0]['url'], self.files[0][:100], f"bytes 0-99/{len(self.files[0])}")
+
+        response = self.finalize(session['session'])
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(set(response.data['uploads']), {0, 1})
+        self.assertFalse(ProductImage.objects.exists())
+
+    def test_targets_and_sessions_are_signed(self):
+        session = self.start_session()
+        self.assertEqual(self.put(reverse('upload-chunk', kwargs={'token': 'faux'}), b'x').status_code, 403)
+        response = self.put(session['uploads'][0]['url'], b'x', f"bytes 0-0/{len(self.files[0]) + 1}")
+        self.assertEqual(response.status_code, 416)
+
+        # Une session ne peut pas être finalisée par un autre vendeur
+        other = create_user("autre")
+        Vendor.objects.create(user=other, vendor_name="Autre", is_approved=True)
+        self.client.force_authenticate(other)
+        self.assertEqual(self.finalize(session['session']).status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_stored_extension_comes_from_the_detected_format(self):
+        self.files = [image_bytes(image_format='GIF'), image_bytes(image_format='PNG')]
+        session = self.start_session(["polyglotte.jpg", "photo.JPEG"])
+        for upload, data in zip(session['uploads'], self.files):
+            self.put(upload['url'], data)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.finalize(session['session'])
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        names = ProductImage.objects.order_by('id').values_list('image', flat=True)
+        self.assertEqual([name.rsplit('.', 1)[1] for name in names], ['gif', 'png'])
+
+    def test_failed_insert_releases_stored_files(self):
+        session = self.start_session()
+        for upload, data in zip(session['uploads'], self.files):
+            self.put(upload['url'], data)
+
+        with mock.patch.object(ProductImage.objects, 'bulk_create', side_effect=DatabaseError("insert")):
+            with self.assertRaises(DatabaseError):
+                self.finalize(session['session'])
+
+        self.assertFalse(StoredFile.objects.exists())
+
+    def test_non_image_extensions_are_rejected(self):
+        response = self.client.post(
+            reverse('upload-session', kwargs={'pk': self.product.pk}),
+            {'files': [{'name': "x.html", 'size': 100}]},
+            format='json',
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
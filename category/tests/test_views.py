@@ -0,0 +1,466 @@
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from accounts.models import User
+from category.cache import get_versions, PRODUCTS_SCOPE
+from category.models import Category, Product, ProductImage, ProductSize
+from vendor.models import Vendor
+
+
+class ProductListingQueryTests(APITestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            first_name="Vendor",
+            last_name="Test",
+            phone_number="22990000000",
+            username="vendor",
+            email="vendor@example.com",
+            password="vendorpass123",
+        )
+        self.vendor = Vendor.objects.create(user=self.user, vendor_name="Boutique", is_approved=True)
+        self.categories = [
+            Category.objects.create(category_name="Clubs"),
+            Category.objects.create(category_name="Sélections"),
+        ]
+        self.url = reverse('public-product-list')
+
+    def create_products(self, count):
+        for i in range(count):
+            product = Product.objects.create(
+                vendor=self.vendor,
+                product_name=f"Maillot {Product.objects.count()}",
+                price="15000.00",
+                stock=10,
+                image="products/maillot.jpg",
+            )
+            product.categories.set(self.categories)
+            ProductSize.objects.create(product=product, size="M", stock=5)
+            ProductSize.objects.create(product=product, size="L", stock=5)
+            ProductImage.objects.create(product=product, image="products/gallery/face.jpg")
+            ProductImage.objects.create(product=product, image="products/gallery/dos.jpg")
+
+    def count_list_queries(self, **params):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return len(ctx.captured_queries), response
+
+    def test_public_product_list_query_count_is_constant(self):
+        self.create_products(10)
+        small_count, response = self.count_list_queries(page_size=2)
+        self.assertEqual(len(response.data['results']), 2)
+
+        large_count, response = self.count_list_queries(page_size=10)
+        self.assertEqual(len(response.data['results']), 10)
+        self.assertEqual(small_count, large_count)
+
+    def test_public_product_list_serializes_prefetched_relations(self):
+        self.create_products(1)
+        _, response = self.count_list_queries()
+        product = response.data['results'][0]
+        self.assertEqual(sorted(product['category_slugs']), ['clubs', 'selections'])
+        self.assertEqual({size['size'] for size in product['sizes_display']}, {'M', 'L'})
+        self.assertEqual(len(product['gallery']), 2)
+
+    def test_public_product_list_cursor_pages_are_stable(self):
+        self.create_products(5)
+        seen = []
+        response = self.client.get(self.url, {'page_size': 2})
+        while True:
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            seen.extend(product['id'] for product in response.data['results'])
+            if not response.data['next']:
+                break
+            response = self.client.get(response.data['next'])
+
+        expected = list(Product.objects.order_by('-created_at', '-id').values_list('id', flat=True))
+        self.assertEqual(seen, expected)
+
+    def test_public_product_list_page_size_is_capped(self):
+        self.create_products(3)
+        with self.settings(API_MAX_PAGE_SIZE=2):
+            response = self.client.get(self.url, {'page_size': 50})
+        self.assertEqual(len(response.data['results']), 2)
+
+    def test_public_product_list_fields_skips_unrequested_relations(self):
+        self.create_products(3)
+        full_count, _ = self.count_list_queries()
+        sparse_count, response = self.count_list_queries(fields='id,product_name,price,image')
+        self.assertEqual(set(response.data['results'][0]), {'id', 'product_name', 'price', 'image'})
+        # Ni catégories, ni tailles, ni galerie préchargées
+        self.assertEqual(sparse_count, full_count - 3)
+
+        _, response = self.count_list_queries(fields='id,gallery')
+        self.assertEqual(len(response.data['results'][0]['gallery']), 2)
+
+    def test_fast_product_list_matches_serializer(self):
+        self.create_products(3)
+        product = Product.objects.first()
+        Product.objects.filter(pk=product.pk).update(
+            discount_price="12500.50", rating_avg="4.25", rating_count=4,
+            renditions={'source': product.image.name, 'card': {'webp': 'content/ab/carte 1.webp'}},
+        )
+        product.categories.set([Category.objects.create(category_name="Rétro"), *self.categories])
+        ProductImage.objects.filter(product=product).update(
+            renditions={'source': 'x.jpg', 'thumbnail': {'jpeg': 'content/cd/vignette.jpg'}},
+        )
+
+        cases = [
+            {}, {'page_size': 2}, {'ordering': 'rating'}, {'search': 'maillot'},
+            {'fields': 'id,image,image_renditions,gallery,price'},
+        ]
+        for params in cases:
+            cache.clear()
+            with self.settings(FAST_READ_SERIALIZERS=False):
+                expected = self.client.get(self.url, params).content
+            cache.clear()
+            fast = self.client.get(self.url, params).content
+            self.assertEqual(fast, expected, params)
+        self.assertIn('carte%201.webp', self.client.get(self.url).json()['results'][-1]['image_renditions']['card']['webp'])
+
+        response = self.client.get(self.url, {'page_size': 2})
+        cache.clear()
+        self.assertEqual(self.client.get(response.data['next']).status_code, status.HTTP_200_OK)
+
+    def test_public_product_list_unknown_field_is_400(self):
+        self.create_products(1)
+        response = self.client.get(self.url, {'fields': 'id,stock_secret'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('stock_secret', str(response.data['fields']))
+
+    def test_public_product_detail_fields(self):
+        self.create_products(1)
+        product = Product.objects.get()
+        url = reverse('public-product-detail', kwargs={'pk': product.pk})
+        self.assertIn('gallery', self.client.get(url).data)
+        response = self.client.get(url, {'fields': 'id,price'})
+        self.assertEqual(response.data, {'id': product.pk, 'price': '15000.00'})
+
+
+class ProductSearchTests(APITestCase):
+
+    def setUp(self):
+        cache.clear()
+        user = User.objects.create_user(
+            first_name="Vendor",
+            last_name="Test",
+            phone_number="22990000000",
+            username="vendor",
+            email="vendor@example.com",
+            password="vendorpass123",
+        )
+        self.vendor = Vendor.objects.create(user=user, vendor_name="Boutique Étoile", is_approved=True)
+        self.selections = Category.objects.create(category_name="Sélections nationales")
+        self.url = reverse('public-product-list')
+
+    def create_product(self, name, description=""):
+        return Product.objects.create(
+            vendor=self.vendor,
+            product_name=name,
+            description=description,
+            price="15000.00",
+            image="products/maillot.jpg",
+        )
+
+    def search(self, query):
+        response = self.client.get(self.url, {'search': query})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [product['product_name'] for product in response.data['results']]
+
+    def test_search_is_accent_insensitive(self):
+        self.create_product("Maillot Côte d'Ivoire domicile")
+        self.create_product("Maillot Bénin extérieur")
+
+        self.assertEqual(self.search("cote"), ["Maillot Côte d'Ivoire domicile"])
+        self.assertEqual(self.search("BENIN"), ["Maillot Bénin extérieur"])
+        self.assertEqual(self.search("exterieur"), ["Maillot Bénin extérieur"])
+
+    def test_search_covers_categories_and_vendor(self):
+        product = self.create_product("Maillot Sénégal")
+        self.create_product("Short Sénégal")
+        self.assertEqual(self.search("selections"), [])
+
+        product.categories.add(self.selections)
+        self.assertEqual(self.search("selections"), ["Maillot Sénégal"])
+
+        self.selections.category_name = "Équipes nationales"
+        self.selections.save()
+        self.assertEqual(self.search("equipes"), ["Maillot Sénégal"])
+
+        self.vendor.vendor_name = "Dakar Sport"
+        self.vendor.save()
+        self.assertEqual(set(self.search("dakar")), {"Maillot Sénégal", "Short Sénégal"})
+
+    def test_search_ranks_products_matching_more_terms_first(self):
+        self.create_product("Maillot Maroc", "Édition 2024")
+        self.create_product("Maillot Maroc domicile", "Édition 2022")
+        self.create_product("Short Maroc")
+
+        self.assertEqual(self.search("maillot maroc domicile")[0], "Maillot Maroc domicile")
+        self.assertEqual(len(self.search("maillot maroc domicile")), 3)
+
+    def test_search_without_usable_terms_returns_nothing(self):
+        self.create_product("Maillot Ghana")
+        self.assertEqual(self.search("!!"), [])
+
+    def test_product_save_rebuilds_document_only_when_indexed_fields_change(self):
+        product = Product.objects.get(pk=self.create_product("Maillot Mali").pk)
+        product.categories.add(self.selections)
+
+        with CaptureQueriesContext(connection) as ctx:
+            product.stock = 4
+            product.save()
+            product.save(update_fields=['stock'])
+        # Image précédente (signal) puis les deux UPDATE : ni catégories ni vendeur
+        self.assertEqual(len(ctx.captured_queries), 3)
+
+        product.product_name = "Maillot Mali domicile"
+        product.save(update_fields=['product_name'])
+        product.refresh_from_db()
+        self.assertIn("domicile", product.search_document)
+        self.assertIn("selections", product.search_document)
+
+    def test_vendor_save_without_rename_keeps_documents(self):
+        self.create_product("Maillot Niger")
+        products_version = get_versions([PRODUCTS_SCOPE])
+
+        self.vendor.is_approved = False
+        self.vendor.save()
+        self.vendor.vendor_name = "Niamey Sport"
+        self.vendor.save(update_fields=['is_approved'])
+        self.assertEqual(get_versions([PRODUCTS_SCOPE]), products_version)
+        self.assertEqual(self.search("niamey"), [])
+
+        self.vendor.save()
+        self.assertNotEqual(get_versions([PRODUCTS_SCOPE]), products_version)
+        self.assertEqual(self.search("niamey"), ["Maillot Niger"])
+
+
+class CatalogueCacheTests(APITestCase):
+
+    def setUp(self):
+        cache.clear()
+        user = User.objects.create_user(
+            first_name="Vendor",
+            last_name="Test",
+            phone_number="22990000000",
+            username="vendor",
+            email="vendor@example.com",
+            password="vendorpass123",
+        )
+        self.vendor = Vendor.objects.create(user=user, vendor_name="Boutique", is_approved=True)
+        self.product = self.create_product("Maillot Bénin")
+        self.other = self.create_product("Maillot Togo")
+
+    def create_product(self, name):
+        return Product.objects.create(
+            vendor=self.vendor,
+            product_name=name,
+            price="15000.00",
+            image="products/maillot.jpg",
+        )
+
+    def get(self, url, params=None):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url, params or {})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response, len(ctx.captured_queries)
+
+    def test_product_list_is_served_from_cache(self):
+        url = reverse('public-product-list')
+        response, _ = self.get(url, {'search': 'Bénin'})
+        self.assertEqual(response['X-Cache'], 'MISS')
+
+        # Paramètres équivalents après normalisation : même entrée
+        response, queries = self.get(url, {'search': 'benin '})
+        self.assertEqual(response['X-Cache'], 'HIT')
+        self.assertEqual(queries, 0)
+        self.assertEqual(len(response.data['results']), 1)
+
+    def test_product_change_invalidates_its_entries_only(self):
+        detail = reverse('public-product-detail', args=[self.product.pk])
+        other_detail = reverse('public-product-detail', args=[self.other.pk])
+        self.get(detail)
+        self.get(other_detail)
+
+        ProductSize.objects.create(product=self.product, size="M", stock=3)
+
+        response, _ = self.get(detail)
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.data['sizes_display'], [{'size': 'M', 'stock': 3}])
+        response, _ = self.get(other_detail)
+        self.assertEqual(response['X-Cache'], 'HIT')
+
+    def test_category_change_invalidates_category_list(self):
+        url = reverse('public-category-list')
+        category = Category.objects.create(category_name="Clubs")
+        self.get(url)
+        self.assertEqual(self.get(url)[0]['X-Cache'], 'HIT')
+
+        category.category_name = "Clubs européens"
+        category.save()
+
+        response, _ = self.get(url)
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.data[0]['category_name'], "Clubs européens")
+
+    def test_cache_stats_are_reported_to_staff(self):
+        url = reverse('public-product-list')
+        self.get(url)
+        self.get(url)
+
+        admin = User.objects.create_user(
+            first_name="Admin", last_name="Test", phone_number="22991111111",
+            username="admin", email="admin@example.com", password="adminpass123",
+        )
+        admin.is_staff = True
+        admin.save()
+        self.client.force_authenticate(admin)
+        response = self.client.get(reverse('catalogue-cache-stats'))
+        self.assertEqual(response.data, {'hits': 1, 'misses': 1, 'hit_ratio': 0.5})
+
+
+class ConditionalGetTests(APITestCase):
+
+    def setUp(self):
+        cache.clear()
+        user = User.objects.create_user(
+            first_name="Vendor",
+            last_name="Test",
+            phone_number="22990000000",
+            username="vendor",
+            email="vendor@example.com",
+            password="vendorpass123",
+        )
+        vendor = Vendor.objects.create(user=user, vendor_name="Boutique", is_approved=True)
+        self.product = Product.objects.create(
+            vendor=vendor,
+            product_name="Maillot Bénin",
+            price="15000.00",
+            image="products/maillot.jpg",
+        )
+        self.size = ProductSize.objects.create(product=self.product, size="M", stock=3)
+        self.url = reverse('public-product-detail', args=[self.product.pk])
+
+    def test_product_detail_answers_304_when_unchanged(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn('Last-Modified', response)
+        etag = response['ETag']
+
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response['ETag'], etag)
+        self.assertEqual(len(ctx.captured_queries), 1)
+
+    def test_product_detail_etag_follows_related_changes(self):
+        etag = self.client.get(self.url)['ETag']
+
+        self.size.delete()
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['sizes_display'], [])
+
+        etag = response['ETag']
+        ProductImage.objects.create(product=self.product, image="products/gallery/dos.jpg")
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_product_detail_etag_follows_category_links(self):
+        clubs, selections, retro = (
+            Category.objects.create(category_name=name) for name in ("Clubs", "Sélections", "Rétro")
+        )
+        self.product.categories.set([clubs, selections])
+        etag = self.client.get(self.url)['ETag']
+
+        # Lien retiré : la date max des catégories restantes ne bouge pas
+        self.product.categories.remove(clubs)
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['category_slugs'], ['selections'])
+
+        # Catégorie remplacée par une plus ancienne : même nombre de liens
+        etag = response['ETag']
+        Category.objects.filter(pk=retro.pk).update(updated_at=clubs.updated_at)
+        self.product.categories.set([retro])
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        # {1, 4} -> {2, 3} : même nombre, même somme d'identifiants, même date
+        first, second, third, fourth = (
+            Category.objects.create(category_name=f"Ligue {i}", slug=f"ligue-{i}") for i in range(4)
+        )
+        Category.objects.update(updated_at=clubs.updated_at)
+        self.product.categories.set([first, fourth])
+        etag = self.client.get(self.url)['ETag']
+        self.product.categories.set([second, third])
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['category_slugs'], ['ligue-1', 'ligue-2'])
+
+    def test_product_list_answers_304_without_queries(self):
+        url = reverse('public-product-list')
+        etag = self.client.get(url)['ETag']
+
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(len(ctx.captured_queries), 0)
+
+        self.product.price = "12000.00"
+        self.product.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+
+class DeliverableProductsTests(APITestCase):
+    # Un client à Cotonou
+    LOCATION = {'lat': 6.3703, 'lng': 2.3912}
+
+    def setUp(self):
+        cache.clear()
+        self.nearby = self.create_vendor("Cotonou Sport", 6.3800, 2.4000, radius=10)
+        self.far = self.create_vendor("Parakou Sport", 9.3372, 2.6303, radius=10)
+        self.pickup_only = self.create_vendor("Retrait Sport", 6.3703, 2.3912, radius=0)
+        self.url = reverse('public-product-list')
+
+    def create_vendor(self, name, lat, lng, radius):
+        vendor = Vendor.objects.create(
+            vendor_name=name, is_approved=True, latitude=lat, longitude=lng, delivery_radius_km=radius,
+        )
+        Product.objects.create(vendor=vendor, product_name=f"Maillot {name}", price="15000.00", image="products/maillot.jpg")
+        return vendor
+
+    def get_vendor_ids(self, params):
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [product['vendor'] for product in response.data['results']], response
+
+    def test_only_vendors_delivering_to_the_customer(self):
+        vendor_ids, _ = self.get_vendor_ids(self.LOCATION)
+        self.assertEqual(vendor_ids, [self.nearby.pk])
+
+        vendor_ids, _ = self.get_vendor_ids({})
+        self.assertEqual(len(vendor_ids), 3)
+
+    def test_radius_change_invalidates_cached_list(self):
+        self.get_vendor_ids(self.LOCATION)
+        vendor_ids, response = self.get_vendor_ids({'lat': 6.3704, 'lng': 2.3913})
+        self.assertEqual(response['X-Cache'], 'HIT')
+
+        self.pickup_only.delivery_radius_km = 5
+        self.pickup_only.save()
+        vendor_ids, response = self.get_vendor_ids(self.LOCATION)
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(sorted(vendor_ids), sorted([self.nearby.pk, self.pickup_only.pk]))
+
+    def test_invalid_location_is_400(self):
+        response = self.client.get(self.url, {'lat': 'abc', 'lng': 2.39})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
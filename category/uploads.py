@@ -0,0 +1,200 @@
+import os
+import threading
+import uuid
+
+from django.conf import settings
+from django.core import signing
+from django.core.files import File
+from django.db import transaction
+from django.urls import reverse
+from django.utils.module_loading import import_string
+from PIL import Image, UnidentifiedImageError
+from rest_framework.exceptions import ValidationError
+
+UPLOAD_SESSION_SALT = 'category.upload-session'
+UPLOAD_TARGET_SALT = 'category.upload-target'
+MAX_FILES_PER_SESSION = 20
+# Formats acceptés (détectés par Pillow) et extension du fichier publié :
+# jamais celle fournie par le client (un polyglotte GIF/HTML nommé x.html
+# serait servi en text/html)
+IMAGE_FORMATS = {'JPEG': '.jpg', 'PNG': '.png', 'WEBP': '.webp', 'GIF': '.gif'}
+IMAGE_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.webp', '.gif'}
+
+
+class LocalUploadBackend:
+    """
+    Stand-in local d'un stockage objet (S3, GCS...) : les fichiers arrivent
+    par PUT successifs (`Content-Range`) sur l'URL signée de UploadChunkAPIView
+    et sont écrits dans UPLOAD_TEMP_DIR. Un backend distant renverrait des
+    URLs présignées : seul `upload_target` change, le reste de la session
+    (taille, ouverture, suppression) passe par les mêmes méthodes.
+    """
+    chunk_size = 5 * 1024 * 1024
+
+    def path(self, key):
+        return os.path.join(settings.UPLOAD_TEMP_DIR, key)
+
+    def upload_target(self, request, key, size):
+        token = signing.dumps({'key': key, 'size': size}, salt=UPLOAD_TARGET_SALT)
+        return {
+            'url': request.build_absolute_uri(reverse('upload-chunk', kwargs={'token': token})),
+            'method': 'PUT',
+            'chunk_size': self.chunk_size,
+        }
+
+    def write_chunk(self, key, offset, stream, length):
+        os.makedirs(settings.UPLOAD_TEMP_DIR, exist_ok=True)
+        path = self.path(key)
+        with open(path, 'r+b' if os.path.exists(path) else 'wb') as destination:
+            destination.seek(offset)
+            remaining = length
+            while remaining > 0:
+                block = stream.read(min(remaining, 64 * 1024))
+                if not block:
+                    break
+                destination.write(block)
+                remaining -= len(block)
+        return length - remaining
+
+    def size(self, key):
+        try:
+            return os.path.getsize(self.path(key))
+        except OSError:
+            return None
+
+    def open(self, key):
+        return open(self.path(key), 'rb')
+
+    def delete(self, key):
+        try:
+            os.remove(self.path(key))
+        except FileNotFoundError:
+            pass
+
+
+_backends = {}
+_backends_lock = threading.Lock()
+
+
+def get_upload_backend():
+    path = settings.UPLOAD_BACKEND
+    with _backends_lock:
+        if path not in _backends:
+            _backends[path] = import_string(path)()
+        return _backends[path]
+
+
+def create_upload_session(request, product, files):
+    """
+    Prépare l'envoi direct de `files` ([{name, size}]) vers le stockage :
+    une cible signée par fichier et un jeton de session, valables
+    UPLOAD_SESSION_MAX_AGE secondes, à présenter à la finalisation.
+    """
+    if not files or len(files) > MAX_FILES_PER_SESSION:
+        raise ValidationError({'files': f"Entre 1 et {MAX_FILES_PER_SESSION} fichiers par session."})
+
+    backend = get_upload_backend()
+    uploads, targets = [], []
+    for file in files:
+        if not 0 < file['size'] <= settings.UPLOAD_MAX_SIZE:
+            raise ValidationError({'files': f"Taille maximale : {settings.UPLOAD_MAX_SIZE} octets."})
+        if os.path.splitext(file['name'])[1].lower() not in IMAGE_EXTENSIONS:
+            raise ValidationError({'files': f"Extensions acceptées : {', '.join(sorted(IMAGE_EXTENSIONS))}."})
+        key = uuid.uuid4().hex
+        uploads.append({'key': key, 'name': os.path.basename(file['name']), 'size': file['size']})
+        targets.append({'key': key, 'name': file['name'], **backend.upload_target(request, key, file['size'])})
+
+    session = signing.dumps(
+        {'product': product.pk, 'user': request.user.pk, 'uploads': uploads},
+        salt=UPLOAD_SESSION_SALT,
+        compress=True,
+    )
+    return {'session': session, 'expires_in': settings.UPLOAD_SESSION_MAX_AGE, 'uploads': targets}
+
+
+def load_upload_target(token):
+    try:
+        return signing.loads(token, salt=UPLOAD_TARGET_SALT, max_age=settings.UPLOAD_SESSION_MAX_AGE)
+    except signing.BadSignature:
+        return None
+
+
+def load_upload_session(token, product, user):
+    try:
+        session = signing.loads(token, salt=UPLOAD_SESSION_SALT, max_age=settings.UPLOAD_SESSION_MAX_AGE)
+    except signing.BadSignature:
+        raise ValidationError({'session': "Session d'envoi invalide ou expirée."})
+    if session['product'] != product.pk or session['user'] != user.pk:
+        raise ValidationError({'session': "Cette session ne concerne pas ce produit."})
+    return session['uploads']
+
+
+def create_gallery_images(product, files):
+    """
+    Enregistre les fichiers `(nom, fichier, texte alternatif)` dans la
+    galerie du produit : un INSERT pour toutes les lignes ProductImage et
+    un seul envoi à la génération des déclinaisons. Si l'INSERT échoue, les
+    références prises dans le stockage sont rendues.
+    """
+    from .cache import invalidate_products
+    from .images import schedule_renditions
+    from .models import ProductImage
+    from .storage import release_file
+
+    storage = ProductImage._meta.get_field('image').storage
+    images = []
+    try:
+        for name, file, alt_text in files:
+            images.append(ProductImage(product=product, image=storage.save(name, file), alt_text=alt_text))
+
+        with transaction.atomic():
+            images = ProductImage.objects.bulk_create(images)
+            # bulk_create n'envoie pas post_save : déclinaisons et cache à la main
+            schedule_renditions(*images)
+            transaction.on_commit(lambda: invalidate_products([product.pk], [product.vendor_id]))
+    except Exception:
+        for image in images:
+            release_file(storage, image.image.name)
+        raise
+    return images
+
+
+def finalize_upload_session(product, uploads, alt_texts=None):
+    """
+    Vérifie que chaque fichier est complet et lisible comme image, le range
+    dans la galerie du produit puis crée toutes les lignes ProductImage en
+    un seul INSERT.
+    """
+    backend = get_upload_backend()
+    errors, extensions = {}, {}
+    for index, upload in enumerate(uploads):
+        if backend.size(upload['key']) != upload['size']:
+            errors[index] = "Fichier incomplet ou absent."
+            continue
+        try:
+            with backend.open(upload['key']) as file, Image.open(file) as image:
+                image.verify()
+                image_format = image.format
+        except (UnidentifiedImageError, OSError, SyntaxError):
+            errors[index] = "Le fichier n'est pas une image valide."
+            continue
+        if image_format not in IMAGE_FORMATS:
+            errors[index] = f"Format d'image non accepté : {image_format}."
+            continue
+        extensions[index] = IMAGE_FORMATS[image_format]
+    if errors:
+        raise ValidationError({'uploads': errors})
+
+    alt_texts = alt_texts or []
+
+    def files():
+        for index, upload in enumerate(uploads):
+            with backend.open(upload['key']) as file:
+                stem = os.path.splitext(upload['name'])[0]
+                alt_text = alt_texts[index] if index < len(alt_texts) else ''
+                yield f"products/gallery/{stem}{extensions[index]}", File(file), alt_text
+
+    images = create_gallery_images(product, files())
+    for upload in uploads:
+        backend.delete(upload['key'])
+    return images
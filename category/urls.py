@@ -5,7 +5,8 @@ from .views import (
     PublicProductListAPIView, UploadProductImageAPIView, PublicProductDetailAPIView,
     DeleteProductImageAPIView, ProductImageListAPIView, PublicProductImageListAPIView,
     UploadMultipleProductImagesAPIView, ProductImageUpdateAPIView, DeleteProductImageAPIView,
-    review_summary, ProductReviewViewSet
+    review_summary, ProductReviewViewSet, CatalogueCacheStatsAPIView,
+    ProductUploadSessionAPIView, FinalizeUploadSessionAPIView, UploadChunkAPIView,
 )
 from rest_framework.routers import DefaultRouter
 
@@ -23,8 +24,12 @@ urlpatterns = [
     path('store/products/<int:pk>/images/', PublicProductImageListAPIView.as_view(), name='public-product-image-list'),
     path('products/<int:pk>/upload-images/', UploadMultipleProductImagesAPIView.as_view(), name='upload-multiple-images'),
     path('products/images/<int:pk>/update/', ProductImageUpdateAPIView.as_view(), name='update-product-image'),
+    path('products/<int:pk>/upload-sessions/', ProductUploadSessionAPIView.as_view(), name='upload-session'),
+    path('products/<int:pk>/upload-sessions/finalize/', FinalizeUploadSessionAPIView.as_view(), name='upload-session-finalize'),
+    path('uploads/<str:token>/', UploadChunkAPIView.as_view(), name='upload-chunk'),
     path('store/products/<int:pk>/', PublicProductDetailAPIView.as_view(), name='public-product-detail'),
-    path('products/<int:product_id>/reviews/summary/', review_summary),
+    path('products/<int:product_id>/reviews/summary/', review_summary, name='product-review-summary'),
+    path('store/cache-stats/', CatalogueCacheStatsAPIView.as_view(), name='catalogue-cache-stats'),
 ]
 
 urlpatterns += router.urls
@@ -1,22 +1,46 @@
-from django.db.models import Q
+import re
+from decimal import Decimal, InvalidOperation
+
+from django.db import transaction
 from rest_framework import generics, permissions, status, viewsets
-from rest_framework.exceptions import PermissionDenied, ValidationError
+from rest_framework.exceptions import PermissionDenied, ValidationError, NotFound
+from rest_framework.response import Response
 from accounts.permissions import IsVendor
-from rest_framework.permissions import IsAuthenticated, AllowAny
+from rest_framework.permissions import IsAuthenticated, AllowAny, IsAdminUser
 from .models import Category, Product, ProductImage, ProductReview
-from .serializers import CategorySerializer, ProductSerializer, ProductImageSerializer, ProductReviewSerializer
+from .serializers import (
+    CategorySerializer, ProductSerializer, ProductImageSerializer, ProductReviewSerializer,
+    UploadFinalizeSerializer, UploadSessionSerializer,
+)
+from .search import search_products
+from .uploads import (
+    create_gallery_images, create_upload_session, finalize_upload_session, get_upload_backend,
+    load_upload_session, load_upload_target,
+)
+from .cache import (
+    CatalogueCacheMixin, cached_response, get_cache_stats,
+    CATEGORIES_SCOPE, COVERAGE_SCOPE, PRODUCTS_SCOPE, product_scope, vendor_scope,
+)
 from rest_framework.views import APIView
 from rest_framework.parsers import MultiPartParser
 from rest_framework.generics import DestroyAPIView, UpdateAPIView, RetrieveAPIView
 from rest_framework.renderers import JSONRenderer
-from rest_framework.decorators import api_view
+from rest_framework.decorators import api_view, permission_classes
+from leMaillotApi.conditional import ConditionalGetMixin, latest_of
+from leMaillotApi.pagination import CreatedAtCursorPagination
+from leMaillotApi.rows import RowListMixin
+from leMaillotApi.serializers import parse_fields
+from vendor.coverage import location_cell, parse_coordinates
 
 # 🔓 Vue publique pour afficher toutes les catégories
-class PublicCategoryListAPIView(generics.ListAPIView):
+class PublicCategoryListAPIView(ConditionalGetMixin, CatalogueCacheMixin, generics.ListAPIView):
     queryset = Category.objects.all().order_by('category_name')
     serializer_class = CategorySerializer
     permission_classes = []
 
+    def get_cache_scopes(self):
+        return [CATEGORIES_SCOPE]
+
 class BaseVendorProtectedView:
     def get_vendor_or_403(self):
         try:
@@ -30,7 +54,7 @@ class ProductListCreateAPIView(BaseVendorProtectedView, generics.ListCreateAPIVi
     permission_classes = [IsVendor]
 
     def get_queryset(self):
-        return Product.objects.filter(vendor=self.get_vendor_or_403())
+        return Product.objects.for_listing().filter(vendor=self.get_vendor_or_403())
 
     def perform_create(self, serializer):
         vendor = self.get_vendor_or_403()
@@ -42,15 +66,50 @@ class ProductRetrieveUpdateDestroyAPIView(BaseVendorProtectedView, generics.Retr
     permission_classes = [IsVendor]
 
     def get_queryset(self):
-        return Product.objects.filter(vendor=self.get_vendor_or_403())
+        return Product.objects.for_listing().filter(vendor=self.get_vendor_or_403())
 
-class PublicProductListAPIView(generics.ListAPIView):
+class PublicProductListAPIView(ConditionalGetMixin, CatalogueCacheMixin, RowListMixin, generics.ListAPIView):
+    """
+    🛍️ Catalogue public : filtres, tri et pagination par curseur.
+
+    ?search= : recherche plein texte sur l'index GIN sous PostgreSQL. Sur
+    les autres moteurs (SQLite en test), repli sur `search_document LIKE
+    '%mot%'` : parcours complet de la table, acceptable pour les tests
+    seulement (category/search.py).
+    """
     serializer_class = ProductSerializer
     permission_classes = []
     renderer_classes = [JSONRenderer]
+    pagination_class = CreatedAtCursorPagination
+    cache_params = (
+        'category', 'min_price', 'max_price', 'vendor', 'featured', 'search',
+        'min_rating', 'ordering', 'cursor', 'page_size', 'fields',
+    )
+
+    def get_location(self):
+        return parse_coordinates(self.request.query_params.get('lat'), self.request.query_params.get('lng'))
+
+    def get_cache_scopes(self):
+        # Liste d'un seul vendeur : invalidée uniquement par ses produits
+        vendor_id = self.request.query_params.get('vendor', '').strip()
+        if vendor_id.isdigit():
+            scopes = [vendor_scope(int(vendor_id)), CATEGORIES_SCOPE]
+        else:
+            scopes = [PRODUCTS_SCOPE, CATEGORIES_SCOPE]
+        if self.get_location():
+            scopes.append(COVERAGE_SCOPE)
+        return scopes
+
+    def get_cache_extra(self):
+        # Tous les clients d'une même cellule partagent la même entrée de cache
+        location = self.get_location()
+        return [*super().get_cache_extra(), ('cell', location_cell(*location) if location else None)]
 
     def get_queryset(self):
-        queryset = Product.objects.filter(is_available=True)
+        # ?fields= : seules les relations des champs demandés sont préchargées
+        queryset = ProductSerializer.optimize_queryset(
+            Product.objects.filter(is_available=True), parse_fields(self.request),
+        )
 
         # 🔍 Filtres GET
         category_slugs = self.request.query_params.get('category')
@@ -74,16 +133,37 @@ class PublicProductListAPIView(generics.ListAPIView):
         if featured == "true":
             queryset = queryset.filter(is_featured=True)
 
+        # ⭐ Note moyenne minimale (agrégats précalculés sur le produit)
+        min_rating = self.request.query_params.get('min_rating')
+        if min_rating:
+            try:
+                min_rating = Decimal(min_rating)
+            except InvalidOperation:
+                min_rating = None
+            if min_rating is None or not min_rating.is_finite() or not 0 <= min_rating <= 5:
+                raise ValidationError({'min_rating': "La note minimale doit être un nombre entre 0 et 5."})
+            queryset = queryset.filter(rating_avg__gte=min_rating)
+
         search = self.request.query_params.get('search')
         if search:
-            queryset = queryset.filter(
-                Q(product_name__icontains=search) |
-                Q(description__icontains=search) |
-                Q(category__category_name__icontains=search)
-            )
+            queryset = search_products(queryset, search)
+
+        # 🚚 Livrable chez moi : vendeurs dont la zone couvre la cellule du client
+        location = self.get_location()
+        if location:
+            queryset = queryset.filter(vendor__coverage_cells__cell=location_cell(*location))
 
         return queryset.order_by('-created_at')
 
+    def get_cursor_ordering(self):
+        # 🔍 Les résultats d'une recherche sont classés par pertinence
+        if self.request.query_params.get('search'):
+            return ('-search_rank', '-created_at', '-id')
+        # ⭐ ?ordering=rating : les mieux notés d'abord (index product_available_rating_idx)
+        if self.request.query_params.get('ordering') == 'rating':
+            return ('-rating_avg', '-created_at', '-id')
+        return CreatedAtCursorPagination.ordering
+
     def get_serializer_context(self):
         return {'request': self.request}
 
@@ -123,7 +203,7 @@ class DeleteProductImageAPIView(DestroyAPIView):
 
     def destroy(self, request, *args, **kwargs):
         image = self.get_object()
-        image.image.delete(save=False)  # supprime le fichier physique
+        # Le fichier est rendu au stockage par le signal post_delete
         image.delete()
         return Response({"message": "Image supprimée avec succès"}, status=204)
 
@@ -146,10 +226,13 @@ class ProductImageListAPIView(generics.ListAPIView):
 
         return ProductImage.objects.filter(product=product)
 
-class PublicProductImageListAPIView(generics.ListAPIView):
+class PublicProductImageListAPIView(CatalogueCacheMixin, generics.ListAPIView):
     serializer_class = ProductImageSerializer
     permission_classes = []
 
+    def get_cache_scopes(self):
+        return [product_scope(self.kwargs['pk'])]
+
     def get_queryset(self):
         product_id = self.kwargs['pk']
         return ProductImage.objects.filter(product_id=product_id, product__is_available=True)
@@ -173,12 +256,85 @@ class UploadMultipleProductImagesAPIView(APIView):
         if not files:
             return Response({"error": "Aucune image reçue"}, status=400)
 
-        created = 0
-        for image_file in files:
-            ProductImage.objects.create(product=product, image=image_file)
-            created += 1
+        field = ProductImage._meta.get_field('image')
+        images = create_gallery_images(
+            product, ((field.generate_filename(None, image_file.name), image_file, None) for image_file in files),
+        )
+
+        return Response({"message": f"{len(images)} image(s) ajoutée(s) avec succès"}, status=201)
+
+
+
+def get_own_product(request, pk):
+    try:
+        product = Product.objects.select_related('vendor__user').get(pk=pk)
+    except Product.DoesNotExist:
+        raise NotFound("Produit introuvable")
+    if product.vendor.user != request.user:
+        raise PermissionDenied("Vous ne pouvez modifier que vos propres produits")
+    return product
+
+
+class ProductUploadSessionAPIView(APIView):
+    """
+    📤 Envoi direct des images : renvoie une cible signée par fichier (PUT
+    vers le stockage, sans passer par un worker en multipart) et un jeton de
+    session pour la finalisation.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request, pk):
+        product = get_own_product(request, pk)
+        serializer = UploadSessionSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        return Response(create_upload_session(request, product, serializer.validated_data['files']), status=201)
+
+
+class FinalizeUploadSessionAPIView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request, pk):
+        product = get_own_product(request, pk)
+        serializer = UploadFinalizeSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        uploads = load_upload_session(serializer.validated_data['session'], product, request.user)
+        images = finalize_upload_session(product, uploads, serializer.validated_data.get('alt_texts'))
+        return Response(ProductImageSerializer(images, many=True, context={'request': request}).data, status=201)
+
+
+CONTENT_RANGE_RE = re.compile(r'^bytes (\d+)-(\d+)/(\d+)$')
+
 
-        return Response({"message": f"{created} image(s) ajoutée(s) avec succès"}, status=201)
+class UploadChunkAPIView(APIView):
+    """
+    Réception des morceaux pour LocalUploadBackend : l'URL signée tient lieu
+    d'authentification. `Content-Range: bytes début-fin/total` pour un envoi
+    en plusieurs PUT, sinon le corps entier.
+    """
+    authentication_classes = []
+    permission_classes = [AllowAny]
+
+    def put(self, request, token):
+        target = load_upload_target(token)
+        if target is None:
+            return Response({"error": "Lien d'envoi invalide ou expiré"}, status=403)
+
+        content_range = request.headers.get('Content-Range')
+        if content_range:
+            match = CONTENT_RANGE_RE.match(content_range)
+            if not match:
+                return Response({"error": "En-tête Content-Range invalide"}, status=400)
+            start, end, total = map(int, match.groups())
+        else:
+            start, end, total = 0, target['size'] - 1, target['size']
+        if total != target['size'] or not start <= end < total:
+            return Response({"error": "Plage hors du fichier annoncé"}, status=416)
+
+        backend = get_upload_backend()
+        length = end - start + 1
+        if backend.write_chunk(target['key'], start, request.stream, length) != length:
+            return Response({"error": "Morceau incomplet"}, status=400)
+        return Response({"received": backend.size(target['key'])}, status=200)
 
 
 class ProductImageUpdateAPIView(UpdateAPIView):
@@ -192,10 +348,25 @@ class ProductImageUpdateAPIView(UpdateAPIView):
             raise PermissionDenied("Vous ne pouvez modifier que vos propres images")
         return image
 
-class PublicProductDetailAPIView(RetrieveAPIView):
-    queryset = Product.objects.filter(is_available=True)
+class PublicProductDetailAPIView(ConditionalGetMixin, CatalogueCacheMixin, RetrieveAPIView):
     serializer_class = ProductSerializer
     permission_classes = [AllowAny]
+    cache_params = ('fields',)
+
+    def get_queryset(self):
+        return ProductSerializer.optimize_queryset(
+            Product.objects.filter(is_available=True), parse_fields(self.request),
+        )
+
+    def get_cache_scopes(self):
+        return [product_scope(self.kwargs['pk']), CATEGORIES_SCOPE]
+
+    def get_fingerprint(self):
+        row = Product.objects.filter(pk=self.kwargs['pk'], is_available=True).fingerprints().first()
+        if row is None:
+            return None
+        dates = [value for key, value in row.items() if key.endswith('updated') or key == 'updated_at']
+        return latest_of(dates), tuple(row.values())
 
     def get_serializer_context(self):
         return {'request': self.request}
@@ -203,6 +374,8 @@ class PublicProductDetailAPIView(RetrieveAPIView):
 
 class ProductReviewViewSet(viewsets.ModelViewSet):
     serializer_class = ProductReviewSerializer
+    # Pages par curseur (created_at, id) : index review_product_recent_idx
+    pagination_class = CreatedAtCursorPagination
 
     def get_permissions(self):
         if self.request.method in ['GET']:
@@ -210,21 +383,33 @@ class ProductReviewViewSet(viewsets.ModelViewSet):
         return [IsAuthenticated()]
 
     def get_queryset(self):
-        return ProductReview.objects.filter(product_id=self.kwargs['product_id'])
+        # Auteur chargé dans la même requête (ProductReviewSerializer.get_user)
+        queryset = ProductReview.objects.select_related('user').filter(product_id=self.kwargs['product_id'])
+
+        rating = self.request.query_params.get('rating')
+        if rating:
+            if rating not in ('1', '2', '3', '4', '5'):
+                raise ValidationError({'rating': "La note doit être comprise entre 1 et 5."})
+            queryset = queryset.filter(rating=rating)
+        return queryset
 
     def perform_create(self, serializer):
         product_id = self.kwargs['product_id']
         if ProductReview.objects.filter(user=self.request.user, product_id=product_id).exists():
             raise ValidationError("Vous avez déjà laissé un avis pour ce produit.")
-        serializer.save(product_id=product_id)
+        # L'avis et les agrégats du produit (signaux) sont écrits ensemble
+        with transaction.atomic():
+            serializer.save(product_id=product_id)
 
     def perform_update(self, serializer):
-        serializer.save()
+        with transaction.atomic():
+            serializer.save()
 
     def perform_destroy(self, instance):
         if instance.user != self.request.user:
             raise PermissionDenied("Vous ne pouvez pas supprimer cet avis.")
-        instance.delete()
+        with transaction.atomic():
+            instance.delete()
 
     def get_object(self):
         obj = super().get_object()
@@ -235,14 +420,31 @@ class ProductReviewViewSet(viewsets.ModelViewSet):
 
 
 @api_view(['GET'])
-
+@permission_classes([AllowAny])
 def review_summary(request, product_id):
-    reviews = ProductReview.objects.filter(product_id=product_id)
-    average = reviews.aggregate(avg=Avg('rating'))['avg'] or 0
-    total = reviews.count()
-    distribution = reviews.values('rating').annotate(count=Count('id')).order_by('-rating')
-    return Response({
-        "average_rating": round(average, 2),
-        "total_reviews": total,
-        "distribution": {item['rating']: item['count'] for item in distribution}
-    })
\ No newline at end of file
+    def compute():
+        # Agrégats tenus à jour sur le produit : une seule requête
+        ratings = (
+            Product.objects
+            .filter(pk=product_id)
+            .values('rating_avg', 'rating_count', 'rating_distribution')
+            .first()
+        ) or {'rating_avg': 0, 'rating_count': 0, 'rating_distribution': {}}
+        return Response({
+            "average_rating": float(ratings['rating_avg']),
+            "total_reviews": ratings['rating_count'],
+            "distribution": {
+                int(star): count
+                for star, count in sorted(ratings['rating_distribution'].items(), reverse=True)
+                if count
+            }
+        })
+
+    return cached_response(request, 'review_summary', [product_scope(product_id)], compute)
+
+
+class CatalogueCacheStatsAPIView(APIView):
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        return Response(get_cache_stats())
\ No newline at end of file
@@ -0,0 +1,42 @@
+import hashlib
+
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+
+def latest_of(values):
+    """Date la plus récente parmi `values` (None ignorés)."""
+    dates = [value for value in values if value is not None]
+    return max(dates) if dates else None
+
+
+class ConditionalGetMixin:
+    """
+    GET conditionnels (ETag / Last-Modified) : si le client possède déjà la
+    version courante, la vue répond 304 sans exécuter le serializer.
+
+    `get_fingerprint()` renvoie `(dernière modification ou None, état)` où
+    `état` est une valeur peu coûteuse qui change dès que la réponse change,
+    ou None si la ressource est introuvable (la vue répond alors normalement).
+    """
+
+    def get(self, request, *args, **kwargs):
+        fingerprint = self.get_fingerprint()
+        if fingerprint is None:
+            return super().get(request, *args, **kwargs)
+
+        last_modified, state = fingerprint
+        raw = repr((request.get_host(), request.get_full_path(), request.accepted_media_type, state))
+        etag = quote_etag(hashlib.sha256(raw.encode()).hexdigest()[:40])
+        timestamp = int(last_modified.timestamp()) if last_modified else None
+
+        response = get_conditional_response(request, etag=etag, last_modified=timestamp)
+        if response is None:
+            response = super().get(request, *args, **kwargs)
+            if response.status_code != 200:
+                return response
+
+        response['ETag'] = etag
+        if timestamp is not None:
+            response['Last-Modified'] = http_date(timestamp)
+        return response
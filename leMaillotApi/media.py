@@ -0,0 +1,181 @@
+import mimetypes
+import os
+import posixpath
+import re
+
+from django.conf import settings
+from django.http import FileResponse, Http404, HttpResponse, StreamingHttpResponse
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+from category.storage import is_content_addressed
+
+# Un nom de fichier par contenu ne désigne jamais autre chose : cache d'un an
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+# Variantes précompressées posées à côté du fichier (ex. par un script de déploiement)
+PRECOMPRESSED = (('br', '.br'), ('gzip', '.gz'))
+
+
+def media_etag(path, stat, coding=None):
+    # Stockage par contenu : l'empreinte SHA-256 est déjà dans le nom
+    if is_content_addressed(path):
+        tag = posixpath.splitext(posixpath.basename(path))[0]
+    else:
+        tag = f"{int(stat.st_mtime):x}-{stat.st_size:x}"
+    # Une variante compressée est une autre représentation : autre ETag
+    return quote_etag(f"{tag}-{coding}" if coding else tag)
+
+
+def clean_media_path(path):
+    """Chemin normalisé sous MEDIA_ROOT, ou None s'il tente d'en sortir (`..`, chemin absolu)."""
+    path = posixpath.normpath(path.replace('\\', '/'))
+    if path.startswith('/') or '..' in path.split('/') or path == '.':
+        return None
+    return path
+
+
+def parse_accept_encoding(header):
+    """Qualité `{codage: q}` de chaque codage d'un en-tête Accept-Encoding ; q=0 refuse le codage."""
+    qualities = {}
+    for item in (header or '').split(','):
+        coding, *params = [part.strip() for part in item.split(';')]
+        if not coding:
+            continue
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition('=')
+            if name.strip().lower() == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        qualities[coding.lower()] = quality
+    return qualities
+
+
+def pick_encoding(header, codings):
+    """Codage préféré du client parmi `codings` (dans l'ordre de préférence du serveur), ou None."""
+    qualities = parse_accept_encoding(header)
+    default = qualities.get('*', 0.0)
+    best, best_quality = None, 0.0
+    for coding in codings:
+        quality = qualities.get(coding, default)
+        if quality > best_quality:
+            best, best_quality = coding, quality
+    return best
+
+
+def parse_range(header, size):
+    """
+    Plage `(début, fin)` incluse d'un en-tête Range à une seule plage, None
+    s'il faut envoyer le fichier entier (pas de Range, plusieurs plages), ou
+    False si la plage est hors du fichier.
+    """
+    match = RANGE_RE.match(header or '')
+    if not match or match.groups() == ('', ''):
+        return None
+    start, end = match.groups()
+    if not start:
+        # bytes=-500 : les 500 derniers octets
+        start, end = max(size - int(end), 0), size - 1
+    else:
+        start, end = int(start), min(int(end), size - 1) if end else size - 1
+    if start > end or start >= size:
+        return False
+    return start, end
+
+
+def read_range(file, start, length, block_size=64 * 1024):
+    try:
+        file.seek(start)
+        while length > 0:
+            block = file.read(min(block_size, length))
+            if not block:
+                break
+            length -= len(block)
+            yield block
+    finally:
+        file.close()
+
+
+def serve_media(request, path):
+    """
+    Fichiers de MEDIA_ROOT. Hors DEBUG, seuls les fichiers du stockage par
+    contenu (images du catalogue, publiques) sont servis.
+
+    Avec MEDIA_ACCEL_REDIRECT, Django ne fait que répondre X-Accel-Redirect :
+    nginx envoie le fichier (sendfile, plages, keep-alive) sans occuper de
+    worker. Sinon : ETag et Last-Modified (réponse 304 sans lire le
+    fichier), plages `Range` (206), variantes .br/.gz précompressées, et
+    FileResponse, qui utilise sendfile quand le serveur WSGI le permet.
+    """
+    # Normaliser avant tout test : « content/../vendor/... » n'est pas une image du catalogue
+    path = clean_media_path(path)
+    if path is None or (not is_content_addressed(path) and not settings.DEBUG):
+        raise Http404
+    try:
+        full_path = safe_join(settings.MEDIA_ROOT, path)
+        stat = os.stat(full_path)
+    except (OSError, ValueError):
+        raise Http404
+    if not os.path.isfile(full_path):
+        raise Http404
+
+    # Variantes présentes : la réponse dépend d'Accept-Encoding, quelle qu'elle soit (200, 206, 304, X-Accel)
+    variants = [coding for coding, suffix in PRECOMPRESSED if os.path.isfile(full_path + suffix)]
+    coding = None
+    if variants and not request.headers.get('Range') and not settings.MEDIA_ACCEL_REDIRECT:
+        coding = pick_encoding(request.headers.get('Accept-Encoding'), variants)
+
+    etag = media_etag(path, stat, coding)
+    cache_control = IMMUTABLE_CACHE_CONTROL if is_content_addressed(path) else f"public, max-age={settings.MEDIA_MAX_AGE}"
+    headers = {
+        'ETag': etag,
+        'Last-Modified': http_date(stat.st_mtime),
+        'Cache-Control': cache_control,
+        'Accept-Ranges': 'bytes',
+    }
+    if variants:
+        headers['Vary'] = 'Accept-Encoding'
+
+    response = get_conditional_response(request, etag=etag, last_modified=int(stat.st_mtime))
+    if response is not None:
+        for header, value in headers.items():
+            response[header] = value
+        return response
+
+    content_type = mimetypes.guess_type(full_path)[0] or 'application/octet-stream'
+
+    if settings.MEDIA_ACCEL_REDIRECT:
+        response = HttpResponse(content_type=content_type)
+        response['X-Accel-Redirect'] = f"{settings.MEDIA_ACCEL_REDIRECT.rstrip('/')}/{path}"
+        for header, value in headers.items():
+            response[header] = value
+        return response
+
+    # Une seule plage, et seulement si If-Range désigne toujours ce fichier
+    if_range = request.headers.get('If-Range')
+    byte_range = parse_range(request.headers.get('Range'), stat.st_size) if if_range in (None, etag) else None
+    if byte_range is False:
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f"bytes */{stat.st_size}"
+        return response
+    if byte_range:
+        start, end = byte_range
+        response = StreamingHttpResponse(
+            read_range(open(full_path, 'rb'), start, end - start + 1), status=206, content_type=content_type,
+        )
+        response['Content-Length'] = end - start + 1
+        response['Content-Range'] = f"bytes {start}-{end}/{stat.st_size}"
+    elif coding:
+        suffix = dict(PRECOMPRESSED)[coding]
+        response = FileResponse(open(full_path + suffix, 'rb'), content_type=content_type)
+        response['Content-Encoding'] = coding
+    else:
+        response = FileResponse(open(full_path, 'rb'), content_type=content_type)
+
+    for header, value in headers.items():
+        response[header] = value
+    return response
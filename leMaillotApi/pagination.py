@@ -0,0 +1,36 @@
+from django.conf import settings
+from rest_framework.pagination import CursorPagination, LimitOffsetPagination
+
+
+class CreatedAtCursorPagination(CursorPagination):
+    """
+    Pagination par curseur (keyset) sur (created_at, id).
+
+    Contrairement à la pagination par offset, chaque page est une simple
+    requête `WHERE created_at < ... ORDER BY created_at DESC, id DESC LIMIT n`
+    servie par un index composite : une page profonde coûte autant que la
+    première.
+    """
+    ordering = ('-created_at', '-id')
+    page_size_query_param = 'page_size'
+
+    def __init__(self):
+        self.page_size = settings.API_PAGE_SIZE
+        self.max_page_size = settings.API_MAX_PAGE_SIZE
+
+    def get_ordering(self, request, queryset, view):
+        # Une vue peut imposer un autre tri (ex. pertinence d'une recherche)
+        if hasattr(view, 'get_cursor_ordering'):
+            return view.get_cursor_ordering()
+        return super().get_ordering(request, queryset, view)
+
+
+class OptionalLimitOffsetPagination(LimitOffsetPagination):
+    """
+    Pagination `?limit=&offset=` pour les listes déjà triées en Python (ex.
+    par distance). Sans `limit`, la réponse reste une liste complète, comme
+    avant.
+    """
+
+    def __init__(self):
+        self.max_limit = settings.API_MAX_PAGE_SIZE
@@ -0,0 +1,231 @@
+import decimal
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.core.files.storage import FileSystemStorage
+from django.utils.encoding import filepath_to_uri
+from rest_framework import fields as drf_fields
+from rest_framework import relations, serializers
+from rest_framework.fields import empty
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+
+# Champ absent de la réponse (relation vide d'un champ non requis, comme DRF)
+SKIP = object()
+
+# to_representation sans effet sur les valeurs renvoyées par la base
+IDENTITY_REPRESENTATIONS = {
+    drf_fields.BooleanField.to_representation,
+    drf_fields.CharField.to_representation,
+    drf_fields.ChoiceField.to_representation,
+    drf_fields.FloatField.to_representation,
+    drf_fields.IntegerField.to_representation,
+    drf_fields.ReadOnlyField.to_representation,
+}
+
+
+def decimal_converter(field):
+    """Decimal -> chaîne, comme DecimalField, avec contexte et exposant calculés une fois."""
+    if field.decimal_places is None or field.localize:
+        return field.to_representation
+    exponent = decimal.Decimal('.1') ** field.decimal_places
+    context = decimal.getcontext().copy()
+    if field.max_digits is not None:
+        context.prec = field.max_digits
+    rounding = field.rounding
+
+    if not getattr(field, 'coerce_to_string', api_settings.COERCE_DECIMAL_TO_STRING):
+        return lambda value: value.quantize(exponent, rounding=rounding, context=context)
+    return lambda value: '{:f}'.format(value.quantize(exponent, rounding=rounding, context=context))
+
+
+def datetime_converter(field):
+    """datetime -> ISO 8601 dans le fuseau du champ, résolu une fois."""
+    output_format = getattr(field, 'format', api_settings.DATETIME_FORMAT)
+    if output_format is None or output_format.lower() != drf_fields.ISO_8601:
+        return field.to_representation
+    field_timezone = field.timezone if hasattr(field, 'timezone') else field.default_timezone()
+    if field_timezone is None:
+        return field.to_representation
+
+    def convert(value):
+        value = value.astimezone(field_timezone).isoformat()
+        return value[:-6] + 'Z' if value.endswith('+00:00') else value
+    return convert
+
+
+class RowReader:
+    """
+    Lecture rapide d'un sérialiseur : la réponse est construite à partir de
+    lignes `.values()` et de convertisseurs compilés une fois par requête
+    (Decimal, datetime, URL des médias), sans instance de modèle ni appel
+    de champ DRF par valeur. Le résultat est identique à `serializer.data`.
+
+    Les champs calculés (SerializerMethodField, relations multiples) sont
+    décrits par une méthode `row_<champ>(reader)` du sérialiseur, qui
+    renvoie `convert(ligne)` ; les listes imbriquées sur une relation
+    inverse (ex. `gallery`) sont chargées en une requête par lot.
+    """
+
+    def __init__(self, serializer, parent=None):
+        self.serializer = serializer
+        self.model = serializer.Meta.model
+        self.request = serializer.context.get('request')
+        self.media = parent.media if parent else {}
+        self.lookups = {}
+        self.batches = {}
+        self.loaders = []
+        self.skips = False
+        self.fields = [(field.field_name, self.build(field)) for field in serializer._readable_fields]
+
+    def require(self, *lookups):
+        self.lookups.update(dict.fromkeys(lookups))
+
+    def values(self, queryset, *lookups):
+        # Les préchargements du chemin DRF ne servent pas ici
+        return queryset.prefetch_related(None).values(*dict.fromkeys([*self.lookups, *lookups]))
+
+    def batch(self, key, load):
+        """
+        Données chargées une fois par lot de lignes (`load(lignes)` -> dict),
+        partagées par tous les champs qui utilisent la même clé.
+        """
+        if key not in self.batches:
+            self.require(self.model._meta.pk.attname)
+            self.batches[key] = {}
+            self.loaders.append((key, load))
+        return self.batches[key]
+
+    def media_url(self, storage):
+        """Nom de fichier -> URL absolue ; le préfixe n'est calculé qu'une fois."""
+        if id(storage) not in self.media:
+            request = self.request
+            if isinstance(storage, FileSystemStorage):
+                prefix = storage.base_url
+                if request is not None:
+                    prefix = request.build_absolute_uri(prefix)
+                self.media[id(storage)] = lambda name: prefix + filepath_to_uri(name).lstrip('/') if name else None
+            elif request is not None:
+                self.media[id(storage)] = lambda name: request.build_absolute_uri(storage.url(name)) if name else None
+            else:
+                self.media[id(storage)] = lambda name: storage.url(name) if name else None
+        return self.media[id(storage)]
+
+    def build(self, field):
+        hook = getattr(self.serializer, f'row_{field.field_name}', None)
+        if hook is not None:
+            return hook(self)
+        if isinstance(field, serializers.ListSerializer):
+            return self.nested(field)
+        if isinstance(field, (serializers.BaseSerializer, serializers.SerializerMethodField, relations.ManyRelatedField)):
+            raise ImproperlyConfigured(
+                f"{type(self.serializer).__name__}.{field.field_name} : définir row_{field.field_name}() pour RowReader."
+            )
+        return self.column(field)
+
+    def converter(self, field):
+        if isinstance(field, drf_fields.DecimalField):
+            return decimal_converter(field)
+        if isinstance(field, drf_fields.DateTimeField):
+            return datetime_converter(field)
+        if isinstance(field, drf_fields.FileField):
+            if not getattr(field, 'use_url', api_settings.UPLOADED_FILES_USE_URL):
+                return lambda name: name or None
+            return self.media_url(self.model._meta.get_field(field.source).storage)
+        if isinstance(field, relations.PrimaryKeyRelatedField) and field.pk_field is None:
+            return None
+        if isinstance(field, drf_fields.JSONField) and not field.binary:
+            return None
+        if type(field).to_representation in IDENTITY_REPRESENTATIONS:
+            return None
+        return field.to_representation
+
+    def column(self, field):
+        lookup = '__'.join(field.source_attrs)
+        # Relations traversées par `source='a.b'` : DRF saute le champ si l'une est vide
+        parents = ['__'.join(field.source_attrs[:index]) for index in range(1, len(field.source_attrs))]
+        self.require(lookup, *parents)
+        convert = self.converter(field)
+
+        def read(row):
+            value = row[lookup]
+            if value is None:
+                return None
+            return value if convert is None else convert(value)
+
+        if not parents:
+            return read
+
+        def missing():
+            if field.default is not empty:
+                return field.get_default()
+            if field.allow_null:
+                return None
+            if not field.required:
+                return SKIP
+            raise AttributeError(f"{type(self.serializer).__name__}.{field.field_name} : relation vide.")
+
+        self.skips = True
+        return lambda row: missing() if any(row[parent] is None for parent in parents) else read(row)
+
+    def nested(self, field):
+        """Liste imbriquée sur une relation inverse : une requête pour tout le lot."""
+        relation = self.model._meta.get_field(field.source)
+        if not relation.one_to_many:
+            raise ImproperlyConfigured(f"{type(self.serializer).__name__}.{field.field_name} : relation non prise en charge.")
+        reader = RowReader(field.child, parent=self)
+        foreign_key = relation.field.attname
+        pk = self.model._meta.pk.attname
+
+        def load(rows):
+            queryset = relation.related_model._default_manager.filter(**{f'{foreign_key}__in': [row[pk] for row in rows]})
+            # Ordre du préchargement DRF : celui du modèle, sinon l'ordre d'insertion
+            if not queryset.ordered:
+                queryset = queryset.order_by('pk')
+            related = list(reader.values(queryset, foreign_key))
+            groups = {}
+            for row, item in zip(related, reader.read(related)):
+                groups.setdefault(row[foreign_key], []).append(item)
+            return groups
+
+        groups = self.batch(f'nested:{field.field_name}', load)
+        return lambda row: groups.get(row[pk], [])
+
+    def read(self, rows):
+        rows = list(rows)
+        for key, load in self.loaders:
+            self.batches[key].clear()
+            if rows:
+                self.batches[key].update(load(rows))
+        fields = self.fields
+        data = [{name: read(row) for name, read in fields} for row in rows]
+        if self.skips:
+            data = [{name: value for name, value in item.items() if value is not SKIP} for item in data]
+        return data
+
+
+class RowListMixin:
+    """
+    `list()` servi par RowReader à partir de `.values()` : même réponse que
+    le sérialiseur de la vue, sans instance de modèle. FAST_READ_SERIALIZERS
+    désactivé, la vue revient au chemin DRF habituel.
+    """
+
+    def get_row_ordering(self, queryset):
+        # Champs lus par la pagination par curseur pour construire les liens
+        get_ordering = getattr(self.paginator, 'get_ordering', None)
+        ordering = get_ordering(self.request, queryset, self) if get_ordering else queryset.query.order_by
+        return [name.lstrip('-') for name in ordering if isinstance(name, str)]
+
+    def list(self, request, *args, **kwargs):
+        if not settings.FAST_READ_SERIALIZERS:
+            return super().list(request, *args, **kwargs)
+
+        reader = RowReader(self.get_serializer())
+        queryset = self.filter_queryset(self.get_queryset())
+        rows = reader.values(queryset, *self.get_row_ordering(queryset))
+
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(reader.read(page))
+        return Response(reader.read(rows))
@@ -0,0 +1,55 @@
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import SAFE_METHODS
+
+FIELDS_PARAM = 'fields'
+
+
+def parse_fields(request, param=FIELDS_PARAM):
+    """Champs demandés par `?fields=id,product_name,price`, ou None pour tous."""
+    if request is None or request.method not in SAFE_METHODS:
+        return None
+    raw = request.query_params.get(param, '')
+    fields = {name.strip() for name in raw.split(',') if name.strip()}
+    return fields or None
+
+
+class SparseFieldsetMixin:
+    """
+    Sérialiseur restreint aux champs demandés, par `fields=[...]` ou par
+    `?fields=` (lectures uniquement ; autre paramètre via le contexte
+    `fields_param`). Les autres champs sont retirés dès la construction : ni
+    calcul, ni URL, ni sous-sérialiseur pour eux.
+
+    `field_select_related` / `field_prefetches` (`{champ: [relations]}`)
+    indiquent ce que chaque champ lit ; `optimize_queryset` ne charge que les
+    relations des champs demandés. Sans effet sur un sérialiseur imbriqué,
+    qui n'a pas la requête dans son contexte à la construction.
+    """
+    field_select_related = {}
+    field_prefetches = {}
+
+    def __init__(self, *args, fields=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if fields is None:
+            fields = parse_fields(self.context.get('request'), self.context.get('fields_param', FIELDS_PARAM))
+        if fields is None:
+            return
+        unknown = set(fields) - set(self.fields)
+        if unknown:
+            raise ValidationError({FIELDS_PARAM: f"Champs inconnus : {', '.join(sorted(unknown))}"})
+        for name in set(self.fields) - set(fields):
+            self.fields.pop(name)
+
+    @classmethod
+    def optimize_queryset(cls, queryset, fields=None):
+        def lookups(mapping):
+            names = mapping if fields is None else [name for name in mapping if name in fields]
+            return list(dict.fromkeys(lookup for name in names for lookup in mapping[name]))
+
+        select_related = lookups(cls.field_select_related)
+        if select_related:
+            queryset = queryset.select_related(*select_related)
+        prefetches = lookups(cls.field_prefetches)
+        if prefetches:
+            queryset = queryset.prefetch_related(*prefetches)
+        return queryset
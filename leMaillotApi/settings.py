@@ -142,12 +142,20 @@ STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
 #Media file configuration
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
+
+# Médias (leMaillotApi/media.py). Derrière nginx, MEDIA_ACCEL_REDIRECT est le
+# préfixe d'une location `internal` pointant sur MEDIA_ROOT : nginx envoie les
+# fichiers à la place des workers
+MEDIA_ACCEL_REDIRECT = config('MEDIA_ACCEL_REDIRECT', default='')
+MEDIA_MAX_AGE = config('MEDIA_MAX_AGE', cast=int, default=60 * 60 * 24)
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/4.2/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
-EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
+EMAIL_BACKEND = config('EMAIL_BACKEND', default='django.core.mail.backends.smtp.EmailBackend')
+EMAIL_FILE_PATH = config('EMAIL_FILE_PATH', default=str(BASE_DIR / 'sent_emails'))
 EMAIL_HOST = config('EMAIL_HOST', default='smtp.gmail.com')
 EMAIL_PORT = config('EMAIL_PORT', cast=int, default=587)
 EMAIL_HOST_USER = config('EMAIL_HOST_USER')
@@ -158,6 +166,19 @@ TWILIO_ACCOUNT_SID = config("TWILIO_ACCOUNT_SID")
 TWILIO_AUTH_TOKEN = config("TWILIO_AUTH_TOKEN")
 TWILIO_PHONE_NUMBER = config("TWILIO_PHONE_NUMBER")
 
+# Outbox e-mail/SMS (notifications/outbox.py). En local : EMAIL_BACKEND console
+# ou fichier, SMS_BACKEND=notifications.sms.ConsoleBackend. OUTBOX_SEND_ON_COMMIT :
+# envoi dans le processus web après le commit, nouveaux essais par minuteur ; sinon
+# `manage.py send_outbox --loop` (worker) ou en cron. OUTBOX_LEASE : durée (s) de
+# réservation d'un message pendant son envoi
+SMS_BACKEND = config('SMS_BACKEND', default='notifications.sms.TwilioBackend')
+OUTBOX_SEND_ON_COMMIT = config('OUTBOX_SEND_ON_COMMIT', cast=bool, default=True)
+OUTBOX_BATCH_SIZE = config('OUTBOX_BATCH_SIZE', cast=int, default=50)
+OUTBOX_MAX_ATTEMPTS = config('OUTBOX_MAX_ATTEMPTS', cast=int, default=5)
+OUTBOX_RETRY_DELAY = config('OUTBOX_RETRY_DELAY', cast=int, default=30)
+OUTBOX_MAX_RETRY_DELAY = config('OUTBOX_MAX_RETRY_DELAY', cast=int, default=60 * 60)
+OUTBOX_LEASE = config('OUTBOX_LEASE', cast=int, default=5 * 60)
+
 STRIPE_SECRET_KEY = config("STRIPE_SECRET_KEY")
 STRIPE_WEBHOOK_SECRET = config("STRIPE_WEBHOOK_SECRET")
 
@@ -170,6 +191,74 @@ REST_FRAMEWORK = {
     ]
 }
 
+# Cache : Redis partagé en production, mémoire locale sinon (dev, tests)
+REDIS_URL = config('REDIS_URL', default='')
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
+# Les réponses du catalogue sont invalidées par version (category/cache.py) ;
+# ce délai n'est qu'un filet de sécurité.
+CATALOGUE_CACHE_TIMEOUT = config('CATALOGUE_CACHE_TIMEOUT', cast=int, default=60 * 60 * 24)
+
+# Pagination par curseur des listes (voir leMaillotApi/pagination.py)
+API_PAGE_SIZE = config('API_PAGE_SIZE', cast=int, default=20)
+API_MAX_PAGE_SIZE = config('API_MAX_PAGE_SIZE', cast=int, default=100)
+
+# Listes très lues (produits, commandes, notifications) construites depuis
+# .values() plutôt que par les sérialiseurs DRF (voir leMaillotApi/rows.py)
+FAST_READ_SERIALIZERS = config('FAST_READ_SERIALIZERS', cast=bool, default=True)
+
+# Numéros de commande (order/utils/sequence.py) : au-delà de 1, chaque processus
+# réserve un bloc de numéros à la fois (moins de verrous, mais des trous possibles)
+ORDER_NUMBER_BLOCK_SIZE = config('ORDER_NUMBER_BLOCK_SIZE', cast=int, default=1)
+
+# File des notifications (notifications/queue.py) : pool de threads du processus
+# web par défaut, ou DatabaseQueue vidée par `manage.py process_notifications`
+NOTIFICATIONS_QUEUE_BACKEND = config('NOTIFICATIONS_QUEUE_BACKEND', default='notifications.queue.ThreadPoolQueue')
+NOTIFICATIONS_WORKERS = config('NOTIFICATIONS_WORKERS', cast=int, default=2)
+
+# Recherche des vendeurs proches (vendor/geo.py) : index en mémoire par grille
+# de cellules (en degrés), sinon rectangle englobant filtré en base
+VENDOR_GEO_INDEX = config('VENDOR_GEO_INDEX', cast=bool, default=True)
+VENDOR_GEO_CELL_SIZE = config('VENDOR_GEO_CELL_SIZE', cast=float, default=0.1)
+
+# Tarifs de livraison (vendor/delivery.py) : frais du vendeur + supplément selon
+# la distance. (distance max en km ou None, supplément en FCFA, délai en heures)
+DELIVERY_BANDS = [
+    (5, 0, 24),
+    (15, 500, 48),
+    (40, 1000, 72),
+    (None, 2000, 120),
+]
+DELIVERY_DEFAULT_ETA_HOURS = 72
+
+# Panier invité signé (cart/guest.py), fusionné dans le panier à la connexion
+GUEST_CART_MAX_AGE = config('GUEST_CART_MAX_AGE', cast=int, default=60 * 60 * 24 * 30)
+
+# Déclinaisons des images produit (category/images.py) : générées par un pool
+# de processus après l'envoi, ou dans la requête si IMAGE_RENDITIONS_ASYNC=False
+IMAGE_RENDITIONS_ASYNC = config('IMAGE_RENDITIONS_ASYNC', cast=bool, default=True)
+IMAGE_WORKERS = config('IMAGE_WORKERS', cast=int, default=2)
+
+# Envoi direct des images (category/uploads.py) : cibles signées valables
+# UPLOAD_SESSION_MAX_AGE secondes. LocalUploadBackend reçoit les PUT dans
+# UPLOAD_TEMP_DIR ; un backend de stockage objet y renverrait des URLs présignées
+UPLOAD_BACKEND = config('UPLOAD_BACKEND', default='category.uploads.LocalUploadBackend')
+UPLOAD_TEMP_DIR = config('UPLOAD_TEMP_DIR', default=os.path.join(BASE_DIR, 'uploads'))
+UPLOAD_MAX_SIZE = config('UPLOAD_MAX_SIZE', cast=int, default=10 * 1024 * 1024)
+UPLOAD_SESSION_MAX_AGE = config('UPLOAD_SESSION_MAX_AGE', cast=int, default=60 * 60)
+
 SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(days=7),
     "REFRESH_TOKEN_LIFETIME": timedelta(days=7),
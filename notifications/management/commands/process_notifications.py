@@ -0,0 +1,25 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from notifications.queue import DatabaseQueue
+
+
+class Command(BaseCommand):
+    help = "Traite les événements de notification en attente (file DatabaseQueue)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--limit', type=int, default=100)
+        parser.add_argument('--loop', action='store_true', help="Tourner en continu.")
+        parser.add_argument('--interval', type=float, default=1.0)
+
+    def handle(self, *args, **options):
+        queue = DatabaseQueue()
+        while True:
+            processed = queue.process_pending(limit=options['limit'])
+            if processed:
+                self.stdout.write(f"{processed} événement(s) traité(s)")
+            if not options['loop']:
+                break
+            if processed < options['limit']:
+                time.sleep(options['interval'])
@@ -0,0 +1,28 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from notifications.outbox import send_pending
+
+
+class Command(BaseCommand):
+    help = (
+        "Envoie les e-mails et SMS en attente dans l'outbox. Avec OUTBOX_SEND_ON_COMMIT=False : "
+        "worker (--loop) ou cron toutes les minutes."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--limit', type=int, default=settings.OUTBOX_BATCH_SIZE)
+        parser.add_argument('--loop', action='store_true', help="Tourner en continu.")
+        parser.add_argument('--interval', type=float, default=5.0)
+
+    def handle(self, *args, **options):
+        while True:
+            sent = send_pending(limit=options['limit'])
+            if sent:
+                self.stdout.write(f"{sent} message(s) traité(s)")
+            if not options['loop']:
+                break
+            if sent < options['limit']:
+                time.sleep(options['interval'])
@@ -1,5 +1,6 @@
 from django.db import models
 from django.contrib.auth import get_user_model
+from django.utils import timezone
 
 User = get_user_model()
 
@@ -18,5 +19,70 @@ class Notification(models.Model):
     is_read = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', '-created_at', '-id'], name='notif_user_recent_idx'),
+        ]
+
     def __str__(self):
         return f"{self.title} ({'Lu' if self.is_read else 'Non lu'})"
+
+
+class NotificationEvent(models.Model):
+    """Événement en attente de traitement (file `DatabaseQueue`, voir notifications/queue.py)."""
+    name = models.CharField(max_length=50)
+    payload = models.JSONField(default=dict)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    last_error = models.TextField(blank=True, default='')
+    created_at = models.DateTimeField(auto_now_add=True)
+    processed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['processed_at', 'id'], name='notif_event_pending_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.name} ({'traité' if self.processed_at else 'en attente'})"
+
+
+class OutboundMessage(models.Model):
+    """E-mail ou SMS en attente d'envoi, vidé par notifications/outbox.py."""
+    EMAIL = 'email'
+    SMS = 'sms'
+    CHANNEL_CHOICES = [
+        (EMAIL, 'E-mail'),
+        (SMS, 'SMS'),
+    ]
+
+    PENDING = 'pending'
+    SENDING = 'sending'
+    SENT = 'sent'
+    FAILED = 'failed'
+    STATUS_CHOICES = [
+        (PENDING, 'En attente'),
+        # Réservé par un envoi jusqu'à next_attempt_at (repris ensuite si le processus est mort)
+        (SENDING, "En cours d'envoi"),
+        (SENT, 'Envoyé'),
+        (FAILED, 'Échec'),
+    ]
+
+    channel = models.CharField(max_length=10, choices=CHANNEL_CHOICES)
+    to = models.CharField(max_length=254)
+    subject = models.CharField(max_length=255, blank=True, default='')
+    body = models.TextField(blank=True, default='')
+    html = models.TextField(blank=True, default='')
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=PENDING)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    last_error = models.TextField(blank=True, default='')
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at', 'id'], name='outbox_pending_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.get_channel_display()} → {self.to} ({self.get_status_display()})"
@@ -0,0 +1,201 @@
+import logging
+import os
+import threading
+from datetime import timedelta
+from email.mime.image import MIMEImage
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db import close_old_connections, transaction
+from django.db.models import Min
+from django.utils import timezone
+
+from .models import OutboundMessage
+from .sms import get_sms_backend
+
+logger = logging.getLogger(__name__)
+
+LOGO_CID = 'lemaillot_logo'
+LOGO_PATH = 'static/email_assets/LeMaillot_final.webp'
+
+_drain_lock = threading.Lock()
+_retry_lock = threading.Lock()
+_retry_timer = None
+_retry_due = None
+
+
+def queue_email(subject, to, html='', body=''):
+    message = OutboundMessage.objects.create(
+        channel=OutboundMessage.EMAIL, to=to, subject=subject, body=body, html=html,
+    )
+    _schedule_send()
+    return message
+
+
+def queue_sms(to, body):
+    message = OutboundMessage.objects.create(channel=OutboundMessage.SMS, to=to, body=body)
+    _schedule_send()
+    return message
+
+
+def _schedule_send():
+    # Sans worker dédié (OUTBOX_SEND_ON_COMMIT), un thread vide l'outbox après le commit
+    if settings.OUTBOX_SEND_ON_COMMIT:
+        transaction.on_commit(lambda: threading.Thread(target=_drain, daemon=True).start())
+
+
+def _drain():
+    # Un seul vidage à la fois par processus : les autres messages partent dans le même lot
+    if not _drain_lock.acquire(blocking=False):
+        return
+    try:
+        close_old_connections()
+        while send_pending() == settings.OUTBOX_BATCH_SIZE:
+            pass
+        _schedule_retry()
+    except Exception:
+        logger.exception("Échec du vidage de l'outbox")
+    finally:
+        _drain_lock.release()
+        close_old_connections()
+
+
+def _schedule_retry():
+    """
+    Sans worker, rien ne relancerait un message reprogrammé : un minuteur
+    vide de nouveau l'outbox à la prochaine échéance (nouvel essai ou
+    réservation expirée). Avec un worker `send_outbox --loop`, inutile.
+    """
+    global _retry_timer, _retry_due
+    due = (
+        OutboundMessage.objects
+        .filter(status__in=[OutboundMessage.PENDING, OutboundMessage.SENDING])
+        .aggregate(due=Min('next_attempt_at'))['due']
+    )
+    if due is None:
+        return
+    with _retry_lock:
+        current = _retry_timer
+        # Minuteur déjà prévu plus tôt (hors celui qui s'exécute en ce moment)
+        if (current is not None and current.is_alive() and current is not threading.current_thread()
+                and _retry_due <= due):
+            return
+        if current is not None and current is not threading.current_thread():
+            current.cancel()
+        delay = max((due - timezone.now()).total_seconds(), 0)
+        _retry_timer = threading.Timer(delay, _drain)
+        _retry_timer.daemon = True
+        _retry_due = due
+        _retry_timer.start()
+
+
+@lru_cache(maxsize=1)
+def get_logo():
+    """Logo intégré aux e-mails, lu une seule fois par processus."""
+    with open(os.path.join(settings.BASE_DIR, LOGO_PATH), 'rb') as img:
+        logo = MIMEImage(img.read())
+    logo.add_header('Content-ID', f'<{LOGO_CID}>')
+    logo.add_header('Content-Disposition', 'inline', filename='logo.webp')
+    return logo
+
+
+def build_email(message, connection=None):
+    email = EmailMultiAlternatives(
+        message.subject, message.body, settings.DEFAULT_FROM_EMAIL, [message.to], connection=connection,
+    )
+    if message.html:
+        email.attach_alternative(message.html, "text/html")
+        if f"cid:{LOGO_CID}" in message.html:
+            email.attach(get_logo())
+    return email
+
+
+def retry_delay(attempts):
+    # 30 s, 1 min, 2 min, 4 min... plafonné à OUTBOX_MAX_RETRY_DELAY
+    return timedelta(seconds=min(settings.OUTBOX_RETRY_DELAY * 2 ** (attempts - 1), settings.OUTBOX_MAX_RETRY_DELAY))
+
+
+def claim_pending(limit):
+    """
+    Réserve un lot de messages dus dans une transaction courte : statut
+    SENDING jusqu'à `now + OUTBOX_LEASE`. Un message dont l'envoi a été
+    interrompu (processus tué) est repris à l'expiration de la réservation.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        # SKIP LOCKED : plusieurs workers peuvent se partager l'outbox
+        messages = list(
+            OutboundMessage.objects
+            .select_for_update(skip_locked=True)
+            .filter(
+                status__in=[OutboundMessage.PENDING, OutboundMessage.SENDING],
+                next_attempt_at__lte=now,
+            )
+            .order_by('next_attempt_at', 'id')[:limit]
+        )
+        lease = now + timedelta(seconds=settings.OUTBOX_LEASE)
+        OutboundMessage.objects.filter(pk__in=[message.pk for message in messages]).update(
+            status=OutboundMessage.SENDING, next_attempt_at=lease,
+        )
+    return messages
+
+
+def send_pending(limit=None):
+    """
+    Envoie un lot de messages dus et renvoie leur nombre. Les messages sont
+    réservés, envoyés hors transaction (aucun verrou pendant SMTP/Twilio),
+    puis leur résultat enregistré. Les e-mails du lot partagent une seule
+    connexion SMTP ; un échec ne bloque que son message, reprogrammé avec un
+    délai croissant jusqu'à OUTBOX_MAX_ATTEMPTS.
+    """
+    messages = claim_pending(limit or settings.OUTBOX_BATCH_SIZE)
+    if not messages:
+        return 0
+
+    emails = [message for message in messages if message.channel == OutboundMessage.EMAIL]
+    if emails:
+        connection = get_connection()
+        try:
+            connection.open()
+        except Exception as exc:
+            for message in emails:
+                message.attempts += 1
+                _failed(message, exc)
+        else:
+            try:
+                for message in emails:
+                    _deliver(message, lambda: build_email(message, connection).send())
+            finally:
+                connection.close()
+
+    for message in messages:
+        if message.channel == OutboundMessage.SMS:
+            _deliver(message, lambda: get_sms_backend().send(message.to, message.body))
+
+    OutboundMessage.objects.bulk_update(
+        messages, ['status', 'attempts', 'last_error', 'next_attempt_at', 'sent_at'],
+    )
+    return len(messages)
+
+
+def _deliver(message, send):
+    message.attempts += 1
+    try:
+        send()
+    except Exception as exc:
+        _failed(message, exc)
+    else:
+        message.status = OutboundMessage.SENT
+        message.sent_at = timezone.now()
+        message.last_error = ''
+
+
+def _failed(message, exc):
+    logger.warning("Envoi %s à %s impossible : %r", message.channel, message.to, exc)
+    message.last_error = repr(exc)
+    if message.attempts >= settings.OUTBOX_MAX_ATTEMPTS:
+        message.status = OutboundMessage.FAILED
+    else:
+        message.status = OutboundMessage.PENDING
+        message.next_attempt_at = timezone.now() + retry_delay(message.attempts)
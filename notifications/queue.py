@@ -0,0 +1,87 @@
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import NotificationEvent
+from .utils import process_event
+
+logger = logging.getLogger(__name__)
+
+
+class ThreadPoolQueue:
+    """
+    File en mémoire traitée par un pool de threads du processus web. Les
+    événements partent après le commit : une commande annulée ne notifie
+    personne. Un événement en cours est perdu si le processus s'arrête.
+    """
+
+    def __init__(self):
+        self._executor = ThreadPoolExecutor(
+            max_workers=settings.NOTIFICATIONS_WORKERS,
+            thread_name_prefix='notifications',
+        )
+
+    def dispatch(self, name, payload):
+        transaction.on_commit(lambda: self._executor.submit(self._run, name, payload))
+
+    def _run(self, name, payload):
+        close_old_connections()
+        try:
+            process_event(name, payload)
+        except Exception:
+            logger.exception("Échec du traitement de l'événement %s %s", name, payload)
+        finally:
+            close_old_connections()
+
+
+class DatabaseQueue:
+    """
+    File persistée dans la table NotificationEvent, écrite dans la même
+    transaction que la commande. Elle est vidée par `process_pending()`,
+    appelé par la commande `process_notifications` (ou directement en test).
+    """
+    max_attempts = 5
+
+    def dispatch(self, name, payload):
+        NotificationEvent.objects.create(name=name, payload=payload)
+
+    def process_pending(self, limit=100):
+        processed = 0
+        with transaction.atomic():
+            # SKIP LOCKED : plusieurs workers peuvent vider la file en parallèle
+            events = list(
+                NotificationEvent.objects
+                .select_for_update(skip_locked=True)
+                .filter(processed_at__isnull=True, attempts__lt=self.max_attempts)
+                .order_by('id')[:limit]
+            )
+            for event in events:
+                try:
+                    with transaction.atomic():
+                        process_event(event.name, event.payload)
+                except Exception as exc:
+                    logger.exception("Échec du traitement de l'événement %s", event.pk)
+                    event.attempts += 1
+                    event.last_error = repr(exc)
+                else:
+                    event.processed_at = timezone.now()
+                    processed += 1
+            NotificationEvent.objects.bulk_update(events, ['attempts', 'last_error', 'processed_at'])
+        return processed
+
+
+_queues = {}
+_queues_lock = threading.Lock()
+
+
+def get_queue():
+    path = settings.NOTIFICATIONS_QUEUE_BACKEND
+    with _queues_lock:
+        if path not in _queues:
+            _queues[path] = import_string(path)()
+        return _queues[path]
@@ -0,0 +1,47 @@
+import sys
+import threading
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+# Messages envoyés par LocMemBackend (équivalent de django.core.mail.outbox)
+outbox = []
+
+
+class TwilioBackend:
+    """Un seul client Twilio par processus : sa session HTTP garde les connexions ouvertes."""
+
+    def __init__(self):
+        from twilio.rest import Client
+
+        self.client = Client(settings.TWILIO_ACCOUNT_SID, settings.TWILIO_AUTH_TOKEN)
+
+    def send(self, to, body):
+        self.client.messages.create(body=body, from_=settings.TWILIO_PHONE_NUMBER, to=to)
+
+
+class ConsoleBackend:
+    """Affiche les SMS au lieu de les envoyer (développement)."""
+
+    def send(self, to, body):
+        sys.stdout.write(f"SMS to {to}:\n{body}\n{'-' * 40}\n")
+        sys.stdout.flush()
+
+
+class LocMemBackend:
+    """Garde les SMS en mémoire dans `notifications.sms.outbox` (tests)."""
+
+    def send(self, to, body):
+        outbox.append({'to': to, 'body': body})
+
+
+_backends = {}
+_backends_lock = threading.Lock()
+
+
+def get_sms_backend():
+    path = settings.SMS_BACKEND
+    with _backends_lock:
+        if path not in _backends:
+            _backends[path] = import_string(path)()
+        return _backends[path]
@@ -0,0 +1,110 @@
+from unittest import mock
+
+from django.db import DatabaseError
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from accounts.models import User
+from category.models import Product
+from notifications.models import Notification, NotificationEvent
+from notifications.queue import DatabaseQueue
+from notifications.utils import dispatch_event, process_event
+from order.models import Order, OrderItem
+from vendor.models import Vendor
+
+
+def create_user(username):
+    return User.objects.create_user(
+        first_name="Test",
+        last_name="User",
+        phone_number="22990000000",
+        username=username,
+        email=f"{username}@example.com",
+        password="securepass123",
+    )
+
+
+@override_settings(NOTIFICATIONS_QUEUE_BACKEND='notifications.queue.DatabaseQueue')
+class OrderNotificationTests(APITestCase):
+
+    def setUp(self):
+        self.customer = create_user("client")
+        self.vendors = [
+            Vendor.objects.create(user=create_user(f"vendeur{i}"), vendor_name=f"Boutique {i}")
+            for i in range(2)
+        ]
+        self.products = [
+            Product.objects.create(
+                vendor=self.vendors[i % 2],
+                product_name=f"Maillot {i}",
+                price="15000.00",
+                stock=10,
+                image="products/maillot.jpg",
+            )
+            for i in range(4)
+        ]
+
+    def test_checkout_only_enqueues_the_event(self):
+        self.client.force_authenticate(self.customer)
+        response = self.client.post(reverse('order-create'), {
+            'delivery_method': 'pickup',
+            'items': [{'product': product.pk, 'quantity': 1} for product in self.products],
+        }, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(NotificationEvent.objects.get().name, 'order.created')
+        self.assertFalse(Notification.objects.exists())
+
+        self.assertEqual(DatabaseQueue().process_pending(), 1)
+        # Le client, puis chaque vendeur une seule fois malgré ses deux articles
+        recipients = sorted(Notification.objects.values_list('user_id', flat=True))
+        self.assertEqual(recipients, sorted([self.customer.pk, *(vendor.user_id for vendor in self.vendors)]))
+        self.assertIsNotNone(NotificationEvent.objects.get().processed_at)
+        self.assertEqual(DatabaseQueue().process_pending(), 0)
+
+    def test_order_and_event_are_written_together(self):
+        self.client.force_authenticate(self.customer)
+        with mock.patch.object(DatabaseQueue, 'dispatch', side_effect=DatabaseError("file indisponible")):
+            with self.assertRaises(DatabaseError):
+                self.client.post(reverse('order-create'), {
+                    'delivery_method': 'pickup',
+                    'items': [{'product': self.products[0].pk, 'quantity': 1}],
+                }, format='json')
+
+        # Pas de commande sans son événement (ni stock réservé)
+        self.assertFalse(Order.objects.exists())
+        self.products[0].refresh_from_db()
+        self.assertEqual(self.products[0].stock, 10)
+
+    def test_paid_order_notifies_each_vendor_once(self):
+        order = Order.objects.create(customer=self.customer, total_price=0, delivery_address="Cotonou")
+        OrderItem.objects.bulk_create([
+            OrderItem(order=order, product=product, quantity=1, price=product.price)
+            for product in self.products
+        ])
+
+        self.assertEqual(process_event('order.status_changed', {'order_id': order.pk, 'status': 'paid'}), 2)
+        self.assertEqual(Notification.objects.filter(title="Paiement confirmé").count(), 2)
+
+    def test_customer_who_is_also_vendor_gets_both_messages(self):
+        seller = self.vendors[0].user
+        order = Order.objects.create(customer=seller, total_price=0, delivery_address="Cotonou")
+        OrderItem.objects.bulk_create([
+            OrderItem(order=order, product=product, quantity=1, price=product.price)
+            for product in self.products
+        ])
+
+        self.assertEqual(process_event('order.created', {'order_id': order.pk}), 3)
+        titles = sorted(Notification.objects.filter(user=seller).values_list('title', flat=True))
+        self.assertEqual(titles, ["Commande confirmée", "Nouvelle commande"])
+
+    def test_failing_event_is_retried_later(self):
+        dispatch_event('order.created', order_id=0)
+
+        self.assertEqual(DatabaseQueue().process_pending(), 0)
+        event = NotificationEvent.objects.get()
+        self.assertEqual(event.attempts, 1)
+        self.assertIn('DoesNotExist', event.last_error)
+        self.assertIsNone(event.processed_at)
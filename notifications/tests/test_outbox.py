@@ -0,0 +1,128 @@
+from datetime import timedelta
+
+from django.core import mail
+from django.core.mail.backends import locmem
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from accounts.models import User
+from accounts.utils import send_verification_code_email, send_verification_code_sms
+from notifications import sms
+from notifications.models import OutboundMessage
+from notifications import outbox
+from notifications.outbox import queue_email, queue_sms, send_pending
+
+
+class CountingEmailBackend(locmem.EmailBackend):
+    opened = 0
+
+    def open(self):
+        CountingEmailBackend.opened += 1
+        return True
+
+
+class FailingSMSBackend:
+
+    def send(self, to, body):
+        raise ConnectionError("Twilio indisponible")
+
+
+class ObservingSMSBackend:
+    statuses = []
+
+    def send(self, to, body):
+        # Statut vu par les autres connexions pendant l'appel à Twilio
+        ObservingSMSBackend.statuses.append(OutboundMessage.objects.get(to=to).status)
+
+
+@override_settings(
+    OUTBOX_SEND_ON_COMMIT=False,
+    SMS_BACKEND='notifications.sms.LocMemBackend',
+    EMAIL_BACKEND='notifications.tests.test_outbox.CountingEmailBackend',
+)
+class OutboxTests(TestCase):
+
+    def setUp(self):
+        sms.outbox.clear()
+        CountingEmailBackend.opened = 0
+        self.user = User.objects.create_user(
+            first_name="Awa",
+            last_name="Test",
+            phone_number="+22990000000",
+            username="awa",
+            email="awa@example.com",
+            password="securepass123",
+        )
+        self.user.verification_code = "123456"
+
+    def test_messages_wait_in_the_outbox(self):
+        send_verification_code_email(self.user)
+        send_verification_code_sms(self.user)
+
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertEqual(OutboundMessage.objects.filter(status=OutboundMessage.PENDING).count(), 2)
+
+        self.assertEqual(send_pending(), 2)
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, ["awa@example.com"])
+        # Logo intégré via cid:lemaillot_logo
+        self.assertEqual(len(mail.outbox[0].attachments), 1)
+        self.assertEqual(sms.outbox, [{'to': "+22990000000", 'body': OutboundMessage.objects.get(channel='sms').body}])
+        self.assertIn("123456", sms.outbox[0]['body'])
+        self.assertFalse(OutboundMessage.objects.exclude(status=OutboundMessage.SENT).exists())
+
+    def test_batch_reuses_one_email_connection(self):
+        for i in range(5):
+            queue_email("Bonjour", f"client{i}@example.com", html="<p>Bonjour</p>")
+
+        self.assertEqual(send_pending(), 5)
+        self.assertEqual(len(mail.outbox), 5)
+        self.assertEqual(CountingEmailBackend.opened, 1)
+
+    @override_settings(SMS_BACKEND='notifications.tests.test_outbox.FailingSMSBackend', OUTBOX_MAX_ATTEMPTS=2)
+    def test_failed_message_is_retried_with_backoff(self):
+        message = queue_sms("+22990000000", "Code : 123456")
+
+        self.assertEqual(send_pending(), 1)
+        message.refresh_from_db()
+        self.assertEqual((message.status, message.attempts), (OutboundMessage.PENDING, 1))
+        self.assertGreater(message.next_attempt_at, timezone.now())
+        self.assertIn("Twilio indisponible", message.last_error)
+
+        # Pas encore dû
+        self.assertEqual(send_pending(), 0)
+
+        OutboundMessage.objects.update(next_attempt_at=timezone.now())
+        self.assertEqual(send_pending(), 1)
+        message.refresh_from_db()
+        self.assertEqual((message.status, message.attempts), (OutboundMessage.FAILED, 2))
+
+    @override_settings(SMS_BACKEND='notifications.tests.test_outbox.ObservingSMSBackend')
+    def test_messages_are_claimed_before_sending(self):
+        ObservingSMSBackend.statuses = []
+        queue_sms("+22990000000", "Code : 123456")
+
+        self.assertEqual(send_pending(), 1)
+        self.assertEqual(ObservingSMSBackend.statuses, [OutboundMessage.SENDING])
+        self.assertEqual(OutboundMessage.objects.get().status, OutboundMessage.SENT)
+
+    def test_expired_claim_is_taken_again(self):
+        message = queue_sms("+22990000000", "Code : 123456")
+        OutboundMessage.objects.update(status=OutboundMessage.SENDING, next_attempt_at=timezone.now() + timedelta(minutes=5))
+        self.assertEqual(send_pending(), 0)
+
+        OutboundMessage.objects.update(next_attempt_at=timezone.now())
+        self.assertEqual(send_pending(), 1)
+        message.refresh_from_db()
+        self.assertEqual(message.status, OutboundMessage.SENT)
+
+    @override_settings(SMS_BACKEND='notifications.tests.test_outbox.FailingSMSBackend')
+    def test_retry_is_scheduled_without_new_messages(self):
+        queue_sms("+22990000000", "Code : 123456")
+        send_pending()
+        message = OutboundMessage.objects.get()
+
+        outbox._schedule_retry()
+        self.addCleanup(outbox._retry_timer.cancel)
+        self.assertEqual(outbox._retry_due, message.next_attempt_at)
+        self.assertTrue(outbox._retry_timer.is_alive())
@@ -0,0 +1,32 @@
+from rest_framework.test import APITestCase
+from django.urls import reverse
+
+from notifications.models import Notification
+from notifications.tests.test_events import create_user
+
+
+class NotificationListTests(APITestCase):
+
+    def setUp(self):
+        self.user = create_user("client")
+        self.client.force_authenticate(self.user)
+        Notification.objects.create(user=create_user("autre"), title="Pas pour moi", message="...")
+        for i in range(5):
+            Notification.objects.create(
+                user=self.user, title=f"Commande n°{i}", message="Votre commande « maillot » est prête ✅",
+                type='ORDER', is_read=i % 2 == 0,
+            )
+        self.url = reverse('notification-list')
+
+    def test_fast_list_matches_serializer(self):
+        for params in ({}, {'page_size': 2}):
+            with self.settings(FAST_READ_SERIALIZERS=False):
+                expected = self.client.get(self.url, params).content
+            with self.assertNumQueries(1):
+                fast = self.client.get(self.url, params).content
+            self.assertEqual(fast, expected)
+
+        response = self.client.get(self.url, {'page_size': 2})
+        self.assertEqual(len(response.data['results']), 2)
+        response = self.client.get(response.data['next'])
+        self.assertEqual([item['title'] for item in response.data['results']], ["Commande n°2", "Commande n°1"])
@@ -1,5 +1,9 @@
 from .models import Notification
 
+# Événements connus : nom -> fonction `handler(payload)` (voir register_event)
+_EVENT_HANDLERS = {}
+
+
 def notify_user(user, title, message, type="INFO"):
     Notification.objects.create(
         user=user,
@@ -7,3 +11,43 @@ def notify_user(user, title, message, type="INFO"):
         message=message,
         type=type
     )
+
+
+def register_event(name):
+    """
+    Déclare le traitement d'un événement. Le handler reçoit le payload et
+    renvoie les notifications à créer sous forme de tuples
+    `(user_id, title, message, type)`.
+    """
+    def decorator(handler):
+        _EVENT_HANDLERS[name] = handler
+        return handler
+    return decorator
+
+
+def dispatch_event(name, **payload):
+    """
+    Confie l'événement à la file configurée (NOTIFICATIONS_QUEUE_BACKEND) :
+    la requête n'attend ni le calcul des destinataires ni les INSERT.
+    Le payload doit être sérialisable en JSON (des identifiants, pas des objets).
+    """
+    from .queue import get_queue
+
+    if name not in _EVENT_HANDLERS:
+        raise KeyError(f"Événement de notification inconnu : {name}")
+    get_queue().dispatch(name, payload)
+
+
+def process_event(name, payload):
+    """
+    Crée les notifications d'un événement en un INSERT groupé. Les doublons
+    (même destinataire, même titre, même message) ne sont créés qu'une fois ;
+    un client qui est aussi vendeur reçoit ses deux messages.
+    """
+    notifications = {}
+    for user_id, title, message, type in _EVENT_HANDLERS[name](payload):
+        key = (user_id, title, message)
+        if user_id is not None and key not in notifications:
+            notifications[key] = Notification(user_id=user_id, title=title, message=message, type=type)
+    Notification.objects.bulk_create(notifications.values())
+    return len(notifications)
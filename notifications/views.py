@@ -5,10 +5,13 @@ from rest_framework.response import Response
 from rest_framework.decorators import action
 from .models import Notification
 from .serializers import NotificationSerializer
+from leMaillotApi.pagination import CreatedAtCursorPagination
+from leMaillotApi.rows import RowListMixin
 
-class NotificationViewSet(viewsets.ModelViewSet):
+class NotificationViewSet(RowListMixin, viewsets.ModelViewSet):
     serializer_class = NotificationSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = CreatedAtCursorPagination
 
     def get_queryset(self):
         return Notification.objects.filter(user=self.request.user).order_by('-created_at')
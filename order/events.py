@@ -0,0 +1,55 @@
+from notifications.utils import register_event
+from vendor.models import Vendor
+from .models import Order
+
+
+def _vendor_user_ids(order_id):
+    # Un vendeur par commande, quel que soit son nombre d'articles
+    return (
+        Vendor.objects
+        .filter(products__orderitem__order_id=order_id, user__isnull=False)
+        .values_list('user_id', flat=True)
+        .distinct()
+    )
+
+
+@register_event('order.created')
+def order_created(payload):
+    order = Order.objects.only('customer_id', 'order_number').get(pk=payload['order_id'])
+    yield (
+        order.customer_id,
+        "Commande confirmée",
+        f"Votre commande #{order.order_number} a été confirmée ✅",
+        "ORDER",
+    )
+    for user_id in _vendor_user_ids(order.pk):
+        yield user_id, "Nouvelle commande", "Vous avez une nouvelle commande à traiter 📦", "ORDER"
+
+
+@register_event('order.status_changed')
+def order_status_changed(payload):
+    order = Order.objects.only('customer_id', 'order_number').get(pk=payload['order_id'])
+    status = payload['status']
+    if status == "shipped":
+        yield (
+            order.customer_id,
+            "Commande expédiée",
+            f"Bonne nouvelle ! Votre commande #{order.order_number} est en route 🚚",
+            "ORDER",
+        )
+    elif status == "delivered":
+        yield (
+            order.customer_id,
+            "Commande livrée",
+            f"Votre commande #{order.order_number} a été livrée 🎉",
+            "ORDER",
+        )
+    elif status == "paid":
+        # Pour le vendeur (optionnel, selon qui paie)
+        for user_id in _vendor_user_ids(order.pk):
+            yield (
+                user_id,
+                "Paiement confirmé",
+                f"Le paiement de la commande #{order.order_number} est validé 💰",
+                "ORDER",
+            )
@@ -0,0 +1,68 @@
+import datetime
+import threading
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections
+
+from order.models import OrderNumberSequence
+from order.utils.sequence import BlockAllocator, allocate
+
+# Jour fictif : la séquence de test ne touche pas aux numéros réels
+BENCHMARK_DAY = datetime.date(2000, 1, 1)
+
+
+class Command(BaseCommand):
+    help = "Mesure l'attribution des numéros de commande (séquence en base, puis par blocs) sur plusieurs threads."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--count', type=int, default=5000)
+        parser.add_argument('--threads', type=int, default=8)
+        parser.add_argument('--block-size', type=int, default=100)
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"Moteur : {connection.vendor}, {options['count']} numéros, {options['threads']} threads")
+        try:
+            self.measure("séquence (1 par 1)", lambda: allocate(BENCHMARK_DAY), options)
+            allocator = BlockAllocator(options['block_size'])
+            self.measure(
+                f"blocs de {options['block_size']}",
+                lambda: allocator.allocate(BENCHMARK_DAY),
+                options,
+            )
+        finally:
+            OrderNumberSequence.objects.filter(day=BENCHMARK_DAY).delete()
+
+    def measure(self, label, next_value, options):
+        OrderNumberSequence.objects.filter(day=BENCHMARK_DAY).delete()
+        per_thread = options['count'] // options['threads']
+        results = []
+        errors = []
+
+        def worker():
+            values = []
+            try:
+                for _ in range(per_thread):
+                    values.append(next_value())
+            except Exception as exc:
+                errors.append(exc)
+            finally:
+                results.extend(values)
+                connections.close_all()
+
+        threads = [threading.Thread(target=worker) for _ in range(options['threads'])]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+
+        if errors:
+            raise CommandError(f"{label} : {len(errors)} erreur(s), ex. {errors[0]!r}")
+        if len(set(results)) != len(results):
+            raise CommandError(f"{label} : numéros en double !")
+        self.stdout.write(
+            f"{label:<22} {len(results)} numéros en {elapsed:.2f}s "
+            f"({len(results) / elapsed:,.0f}/s), max = {max(results)}"
+        )
@@ -0,0 +1,43 @@
+# Generated by Django 4.2.4 on 2026-10-18 09:35
+
+import datetime
+import re
+
+from django.db import migrations, models
+
+ORDER_NUMBER_RE = re.compile(r'^CM-(\d{8})-(\d+)$')
+
+
+def seed_sequences(apps, schema_editor):
+    # Reprendre la numérotation là où les commandes existantes s'arrêtent
+    Order = apps.get_model('order', 'Order')
+    OrderNumberSequence = apps.get_model('order', 'OrderNumberSequence')
+    last_values = {}
+    for order_number in Order.objects.values_list('order_number', flat=True).iterator():
+        match = ORDER_NUMBER_RE.match(order_number or '')
+        if not match:
+            continue
+        day = datetime.datetime.strptime(match.group(1), '%Y%m%d').date()
+        last_values[day] = max(last_values.get(day, 0), int(match.group(2)))
+    OrderNumberSequence.objects.bulk_create(
+        [OrderNumberSequence(day=day, last_value=value) for day, value in last_values.items()],
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('order', '0009_orderitem_size'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OrderNumberSequence',
+            fields=[
+                ('day', models.DateField(primary_key=True, serialize=False)),
+                ('last_value', models.PositiveBigIntegerField(default=0)),
+            ],
+        ),
+        migrations.RunPython(seed_sequences, migrations.RunPython.noop),
+    ]
@@ -1,8 +1,6 @@
 from django.db import models
 from accounts.models import User
 from category.models import Product
-from django.utils import timezone
-import re
 
 class Order(models.Model):
     STATUS_CHOICES = [
@@ -31,6 +29,12 @@ class Order(models.Model):
     delivery_cost = models.DecimalField(max_digits=6, decimal_places=2, default=0.0)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['customer', '-created_at', '-id'], name='order_customer_recent_idx'),
+            models.Index(fields=['-created_at', '-id'], name='order_recent_idx'),
+        ]
+
     def __str__(self):
         return f"Commande #{self.id} - {self.customer.email}"
 
@@ -40,33 +44,23 @@ class Order(models.Model):
         super().save(*args, **kwargs)
 
     def generate_order_number(self):
-        today = timezone.now().strftime('%Y%m%d')
-        prefix = f"CM-{today}"
+        from .utils.sequence import next_order_number
+        return next_order_number()
 
-        last_order = (
-            Order.objects
-            .filter(order_number__startswith=prefix)
-            .order_by('-created_at')
-            .first()
-        )
 
-        if last_order:
-            # Extraire le suffixe de type XX (CM-20250702-03)
-            match = re.search(rf"{prefix}-(\d+)", last_order.order_number)
-            if match:
-                last_seq = int(match.group(1))
-            else:
-                last_seq = 0
-        else:
-            last_seq = 0
+class OrderNumberSequence(models.Model):
+    """Dernier numéro de commande attribué pour chaque jour (voir order/utils/sequence.py)."""
+    day = models.DateField(primary_key=True)
+    last_value = models.PositiveBigIntegerField(default=0)
 
-        new_seq = last_seq + 1
-        return f"{prefix}-{new_seq:02d}"
+    def __str__(self):
+        return f"{self.day} : {self.last_value}"
 
 
 class OrderItem(models.Model):
     order = models.ForeignKey(Order, on_delete=models.CASCADE, related_name='items')
     product = models.ForeignKey(Product, on_delete=models.CASCADE)
+    size = models.CharField(max_length=5, blank=True, null=True)
     quantity = models.PositiveIntegerField()
     price = models.DecimalField(max_digits=10, decimal_places=2)
 
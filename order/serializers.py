@@ -12,16 +12,20 @@ from rest_framework.views import APIView
 from .models import Order, OrderItem, OrderStatusHistory
 from category.models import Product
 from decimal import Decimal
+from django.db import transaction
 from .utils.invoice_generator import generate_invoice
+from .utils.stock import merge_lines, reserve_stock
+from vendor.delivery import delivery_total, quote_delivery
+from leMaillotApi.serializers import SparseFieldsetMixin
 
 
-class OrderItemSerializer(serializers.ModelSerializer):
+class OrderItemSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     product_name = serializers.CharField(source='product.product_name', read_only=True)
     vendor_name = serializers.CharField(source='product.vendor.vendor_name', read_only=True)
 
     class Meta:
         model = OrderItem
-        fields = ['product', 'product_name', 'vendor_name', 'quantity', 'price']
+        fields = ['product', 'product_name', 'vendor_name', 'size', 'quantity', 'price']
         read_only_fields = ['price']
 
 
@@ -81,57 +85,59 @@ class OrderCreateSerializer(serializers.ModelSerializer):
         delivery_longitude = validated_data.get('delivery_longitude')
         delivery_method = validated_data.get('delivery_method')
 
-        delivery_cost = 0.0
-        total_price = 0
-        vendor_ids = set()
-
-        # Création de la commande
-        order = Order.objects.create(
-            customer=customer,
-            delivery_method=delivery_method,
-            delivery_address=delivery_address,
-            delivery_city=delivery_city,
-            delivery_postal_code=delivery_postal_code,
-            delivery_country=delivery_country,
-            delivery_latitude=delivery_latitude,
-            delivery_longitude=delivery_longitude,
-            delivery_cost=0.0,
-            total_price=0
-        )
-
-        for item in items_data:
-            product_id = item.get('product')
-            quantity = item.get('quantity', 1)
-            product = Product.objects.get(id=product_id, is_available=True)
-
-            if product.stock < quantity:
-                raise serializers.ValidationError(
-                    f"Stock insuffisant pour le produit '{product.product_name}' (stock actuel : {product.stock})"
-                )
-
-            OrderItem.objects.create(
-                order=order,
-                product=product,
-                quantity=quantity,
-                price=product.price
+        lines = merge_lines(items_data)
+
+        # 🔒 Tout ou rien : une ligne en rupture annule la commande entière
+        with transaction.atomic():
+            order = Order.objects.create(
+                customer=customer,
+                delivery_method=delivery_method,
+                delivery_address=delivery_address,
+                delivery_city=delivery_city,
+                delivery_postal_code=delivery_postal_code,
+                delivery_country=delivery_country,
+                delivery_latitude=delivery_latitude,
+                delivery_longitude=delivery_longitude,
+                delivery_cost=Decimal('0.00'),
+                total_price=Decimal('0.00')
             )
 
-            total_price += product.price * quantity
-            product.stock -= quantity
-            product.save()
-
-            vendor_ids.add(product.vendor.id)
-
-        # Frais de livraison par vendeur si applicable
-        if delivery_method == 'delivery':
-            from vendor.models import Vendor
-            for vid in vendor_ids:
-                vendor = Vendor.objects.get(id=vid)
-                delivery_cost += float(vendor.delivery_fee)
-
-        order.delivery_cost = delivery_cost
-        order.total_price = total_price + Decimal(delivery_cost)
-        order.save()
+            reserve_stock(lines)
+
+            # Une seule requête pour tous les produits (et leurs vendeurs)
+            products = Product.objects.select_related('vendor').in_bulk({line[0] for line in lines})
+
+            order_items = []
+            total_price = Decimal('0.00')
+            vendors = {}
+            for product_id, size, quantity in lines:
+                product = products[product_id]
+                order_items.append(OrderItem(
+                    order=order,
+                    product=product,
+                    size=size,
+                    quantity=quantity,
+                    price=product.price
+                ))
+                total_price += product.price * quantity
+                vendors[product.vendor_id] = product.vendor
+
+            OrderItem.objects.bulk_create(order_items)
+
+            # Frais de livraison par vendeur (distance client ↔ vendeur) si applicable
+            delivery_cost = Decimal('0.00')
+            if delivery_method == 'delivery':
+                quotes = quote_delivery(vendors.values(), delivery_latitude, delivery_longitude)
+                refused = [vendors[vendor_id].vendor_name for vendor_id, quote in quotes.items() if not quote.deliverable]
+                if refused:
+                    raise serializers.ValidationError(
+                        f"Livraison impossible à cette adresse pour : {', '.join(sorted(refused))}."
+                    )
+                delivery_cost = delivery_total(quotes)
+
+            order.delivery_cost = delivery_cost
+            order.total_price = total_price + delivery_cost
+            order.save(update_fields=['delivery_cost', 'total_price'])
 
         return order
 
@@ -143,7 +149,7 @@ class OrderStatusHistorySerializer(serializers.ModelSerializer):
         model = OrderStatusHistory
         fields = ['previous_status', 'new_status', 'changed_by_email', 'changed_at']
 
-class OrderDetailSerializer(serializers.ModelSerializer):
+class OrderDetailSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     items = OrderItemSerializer(many=True, read_only=True)
     status_history = OrderStatusHistorySerializer(many=True, read_only=True)
     customer_email = serializers.EmailField(source='customer.email', read_only=True)
@@ -161,7 +167,14 @@ class OrderDetailSerializer(serializers.ModelSerializer):
         'delivery_latitude', 'delivery_longitude'
         ]
 
-class VendorOrderDetailSerializer(serializers.ModelSerializer):
+    # Relations lues par chaque champ (optimize_queryset)
+    field_select_related = {'customer_email': ['customer']}
+    field_prefetches = {
+        'items': ['items__product__vendor'],
+        'status_history': ['status_history__changed_by'],
+    }
+
+class VendorOrderDetailSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     items = serializers.SerializerMethodField()
     total_price = serializers.SerializerMethodField()
     customer_email = serializers.EmailField(source='customer.email', read_only=True)
@@ -179,6 +192,8 @@ class VendorOrderDetailSerializer(serializers.ModelSerializer):
             'total_price',  # total partiel (produits du vendeur)
         ]
 
+    field_select_related = {'customer_email': ['customer']}
+
     def get_items(self, obj):
         """Retourne uniquement les items du vendeur connecté"""
         user = self.context['request'].user
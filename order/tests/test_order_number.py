@@ -0,0 +1,84 @@
+import datetime
+import threading
+
+from django.db import connections
+from django.test import TestCase, TransactionTestCase, override_settings, skipUnlessDBFeature
+
+from accounts.models import User
+from order.models import Order, OrderNumberSequence
+from order.utils.sequence import BlockAllocator, allocate, format_order_number, next_order_number
+
+DAY = datetime.date(2025, 7, 2)
+
+
+class OrderNumberTests(TestCase):
+
+    def test_numbers_follow_each_other_per_day(self):
+        self.assertEqual(next_order_number(DAY), "CM-20250702-01")
+        self.assertEqual(next_order_number(DAY), "CM-20250702-02")
+        self.assertEqual(next_order_number(DAY + datetime.timedelta(days=1)), "CM-20250703-01")
+
+    def test_more_than_99_orders_a_day(self):
+        OrderNumberSequence.objects.create(day=DAY, last_value=99)
+        self.assertEqual(next_order_number(DAY), "CM-20250702-100")
+        self.assertEqual(format_order_number(DAY, 123456), "CM-20250702-123456")
+
+    def test_order_save_assigns_number(self):
+        customer = User.objects.create_user(
+            first_name="Test", last_name="User", phone_number="22990000000",
+            username="client", email="client@example.com", password="securepass123",
+        )
+        first = Order.objects.create(customer=customer, total_price=0, delivery_address="Cotonou")
+        second = Order.objects.create(customer=customer, total_price=0, delivery_address="Cotonou")
+        self.assertNotEqual(first.order_number, second.order_number)
+        self.assertTrue(second.order_number.endswith("-02"))
+
+    def test_block_allocator_hands_out_a_block_per_query(self):
+        allocator = BlockAllocator(block_size=10)
+        with self.captureOnCommitCallbacks(execute=True):
+            first = allocator.allocate(DAY)
+        with self.assertNumQueries(0):
+            following = [allocator.allocate(DAY) for _ in range(9)]
+        self.assertEqual([first, *following], list(range(1, 11)))
+        self.assertEqual(allocate(DAY), 11)
+
+    @override_settings(ORDER_NUMBER_BLOCK_SIZE=5)
+    def test_rolled_back_block_is_not_reused(self):
+        # Sans commit, le bloc reste privé : le numéro suivant repart de la base
+        self.assertEqual(next_order_number(DAY), "CM-20250702-01")
+        self.assertEqual(next_order_number(DAY), "CM-20250702-06")
+
+
+@skipUnlessDBFeature('has_select_for_update')
+class ConcurrentOrderNumberTests(TransactionTestCase):
+    THREADS = 8
+    PER_THREAD = 25
+
+    def _run(self, next_value):
+        results = []
+        start = threading.Barrier(self.THREADS)
+
+        def worker():
+            start.wait()
+            try:
+                for _ in range(self.PER_THREAD):
+                    results.append(next_value())
+            finally:
+                connections.close_all()
+
+        threads = [threading.Thread(target=worker) for _ in range(self.THREADS)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return results
+
+    def test_concurrent_allocations_are_unique(self):
+        results = self._run(lambda: allocate(DAY))
+        self.assertEqual(sorted(results), list(range(1, self.THREADS * self.PER_THREAD + 1)))
+
+    def test_concurrent_block_allocations_are_unique(self):
+        allocator = BlockAllocator(block_size=7)
+        results = self._run(lambda: allocator.allocate(DAY))
+        self.assertEqual(len(results), self.THREADS * self.PER_THREAD)
+        self.assertEqual(len(set(results)), len(results))
@@ -0,0 +1,173 @@
+import threading
+from decimal import Decimal
+from types import SimpleNamespace
+from unittest import mock
+
+from django.db import connection, connections
+from django.test import TransactionTestCase, skipUnlessDBFeature
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import serializers, status
+from rest_framework.test import APITestCase
+
+from accounts.models import User
+from category.models import Product, ProductSize
+from order.models import Order, OrderItem
+from order.serializers import OrderCreateSerializer
+from order.utils import stock
+from order.utils.sequence import next_order_number
+from vendor.models import Vendor
+
+
+def create_user(username):
+    return User.objects.create_user(
+        first_name="Test",
+        last_name="User",
+        phone_number="22990000000",
+        username=username,
+        email=f"{username}@example.com",
+        password="securepass123",
+    )
+
+
+def create_product(vendor, stock, sizes=None):
+    product = Product.objects.create(
+        vendor=vendor,
+        product_name="Maillot Bénin",
+        price="15000.00",
+        stock=stock,
+        image="products/maillot.jpg",
+    )
+    for size, size_stock in (sizes or {}).items():
+        ProductSize.objects.create(product=product, size=size, stock=size_stock)
+    return product
+
+
+class OrderStockReservationTests(APITestCase):
+
+    def setUp(self):
+        self.vendor = Vendor.objects.create(user=create_user("vendor"), vendor_name="Boutique", is_approved=True)
+        self.customer = create_user("client")
+        self.client.force_authenticate(self.customer)
+        self.url = reverse('order-create')
+
+    def test_order_decrements_product_and_size_stock(self):
+        product = create_product(self.vendor, stock=10, sizes={'M': 4, 'L': 6})
+        response = self.client.post(self.url, {'delivery_method': 'pickup', 'items': [
+            {'product': product.pk, 'size': 'M', 'quantity': 1},
+            {'product': product.pk, 'size': 'L', 'quantity': 2},
+            {'product': product.pk, 'size': 'M', 'quantity': 2},
+        ]}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        product.refresh_from_db()
+        self.assertEqual(product.stock, 5)
+        self.assertEqual(dict(product.sizes.values_list('size', 'stock')), {'M': 1, 'L': 4})
+        items = OrderItem.objects.order_by('size').values_list('size', 'quantity')
+        self.assertEqual(list(items), [('L', 2), ('M', 3)])
+
+    def test_failed_line_rolls_back_the_whole_order(self):
+        first = create_product(self.vendor, stock=10)
+        second = create_product(self.vendor, stock=10, sizes={'M': 1})
+        response = self.client.post(self.url, {'delivery_method': 'pickup', 'items': [
+            {'product': first.pk, 'quantity': 3},
+            {'product': second.pk, 'size': 'M', 'quantity': 2},
+        ]}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Order.objects.exists())
+        first.refresh_from_db()
+        second.refresh_from_db()
+        self.assertEqual((first.stock, second.stock), (10, 10))
+        self.assertEqual(second.sizes.get().stock, 1)
+
+    def test_stock_changed_after_failed_update_is_a_validation_error(self):
+        product = create_product(self.vendor, stock=10, sizes={'M': 10})
+        # UPDATE refusé mais stock suffisant à la relecture : conflit, pas d'erreur serveur
+        for failing_model in (Product, ProductSize):
+            def decrement(model, rows, now, real=stock._decrement_all, failing_model=failing_model):
+                return False if model is failing_model else real(model, rows, now)
+
+            with mock.patch.object(stock, '_decrement_all', decrement):
+                response = self.client.post(self.url, {'delivery_method': 'pickup', 'items': [
+                    {'product': product.pk, 'size': 'M', 'quantity': 1},
+                ]}, format='json')
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Order.objects.exists())
+
+    def _checkout_queries(self, products):
+        payload = {
+            'delivery_method': 'delivery',
+            'delivery_address': 'Rue 12, Cotonou',
+            'items': [{'product': product.pk, 'size': 'M', 'quantity': 2} for product in products],
+        }
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(self.url, payload, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        return len(queries)
+
+    def test_checkout_queries_do_not_grow_with_cart_size(self):
+        vendors = [
+            Vendor.objects.create(user=create_user(f"vendeur{i}"), vendor_name=f"Boutique {i}", delivery_fee="500.00")
+            for i in range(3)
+        ]
+        products = [create_product(vendors[i % 3], stock=5, sizes={'M': 5}) for i in range(30)]
+        next_order_number()  # la séquence du jour existe déjà pour les deux mesures
+
+        single = self._checkout_queries(products[:1])
+        many = self._checkout_queries(products)
+
+        self.assertEqual(single, many)
+        order = Order.objects.latest('id')
+        self.assertEqual(order.items.count(), 30)
+        self.assertEqual(order.delivery_cost, Decimal('1500.00'))
+        self.assertEqual(order.total_price, Decimal('15000.00') * 60 + Decimal('1500.00'))
+
+
+# Les écritures concurrentes demandent de vrais verrous de ligne (PostgreSQL)
+@skipUnlessDBFeature('has_select_for_update')
+class ConcurrentCheckoutTests(TransactionTestCase):
+    THREADS = 8
+    ATTEMPTS_PER_THREAD = 3
+
+    def test_concurrent_checkouts_never_oversell(self):
+        vendor = Vendor.objects.create(user=create_user("vendor"), vendor_name="Boutique", is_approved=True)
+        product = create_product(vendor, stock=10, sizes={'M': 10})
+        customers = [create_user(f"client{i}") for i in range(self.THREADS)]
+        successes = []
+        start = threading.Barrier(self.THREADS)
+
+        def checkout(customer):
+            start.wait()
+            try:
+                for _ in range(self.ATTEMPTS_PER_THREAD):
+                    serializer = OrderCreateSerializer(
+                        data={'delivery_method': 'pickup', 'items': [{'product': product.pk, 'size': 'M', 'quantity': 1}]},
+                        context={'request': SimpleNamespace(user=customer)},
+                    )
+                    serializer.is_valid(raise_exception=True)
+                    try:
+                        serializer.save()
+                        successes.append(customer.pk)
+                    except serializers.ValidationError:
+                        pass
+                    except Exception:
+                        # Verrou ou conflit côté base : la commande est annulée en entier
+                        pass
+            finally:
+                connections.close_all()
+
+        threads = [threading.Thread(target=checkout, args=(customer,)) for customer in customers]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        product.refresh_from_db()
+        sold = sum(OrderItem.objects.values_list('quantity', flat=True))
+        self.assertEqual(sold, len(successes))
+        self.assertGreater(sold, 0)
+        self.assertLessEqual(sold, 10)
+        self.assertEqual(product.stock, 10 - sold)
+        self.assertEqual(product.sizes.get().stock, 10 - sold)
+        self.assertEqual(Order.objects.count(), len(successes))
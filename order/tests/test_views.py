@@ -0,0 +1,71 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from order.models import Order, OrderStatusHistory
+from order.tests.test_stock import create_product, create_user
+from vendor.models import Vendor
+
+
+class OrderListTests(APITestCase):
+
+    def setUp(self):
+        self.vendor = Vendor.objects.create(user=create_user("vendor"), vendor_name="Boutique", is_approved=True)
+        self.customer = create_user("client")
+        self.client.force_authenticate(self.customer)
+        self.url = reverse('order-list')
+
+    def create_orders(self, count):
+        product = create_product(self.vendor, stock=100)
+        for _ in range(count):
+            response = self.client.post(reverse('order-create'), {'delivery_method': 'pickup', 'items': [
+                {'product': product.pk, 'quantity': 1},
+            ]}, format='json')
+            self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+    def count_list_queries(self, **params):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return len(ctx.captured_queries), response
+
+    def test_order_list_query_count_is_constant(self):
+        self.create_orders(1)
+        single_count, _ = self.count_list_queries()
+        self.create_orders(3)
+        many_count, response = self.count_list_queries()
+        self.assertEqual(len(response.data['results']), 4)
+        self.assertEqual(response.data['results'][0]['items'][0]['vendor_name'], "Boutique")
+        self.assertEqual(single_count, many_count)
+
+    def test_order_list_fields_skips_unrequested_relations(self):
+        self.create_orders(2)
+        full_count, _ = self.count_list_queries()
+        sparse_count, response = self.count_list_queries(fields='id,order_number,status')
+        self.assertEqual(set(response.data['results'][0]), {'id', 'order_number', 'status'})
+        # Ni lignes (avec produits et vendeurs) ni historique
+        self.assertEqual(sparse_count, full_count - 2)
+
+    def test_fast_order_list_matches_serializer(self):
+        self.create_orders(3)
+        order = Order.objects.first()
+        OrderStatusHistory.objects.create(order=order, previous_status='pending', new_status='paid', changed_by=self.customer)
+        # Auteur supprimé : DRF omet changed_by_email
+        OrderStatusHistory.objects.create(order=order, previous_status='paid', new_status='shipped', changed_by=None)
+
+        for params in ({}, {'page_size': 2}, {'fields': 'id,items,total_price'}):
+            with self.settings(FAST_READ_SERIALIZERS=False):
+                expected = self.client.get(self.url, params).content
+            with self.assertNumQueries(2 if 'fields' in params else 3):
+                fast = self.client.get(self.url, params).content
+            self.assertEqual(fast, expected)
+
+        history = self.client.get(self.url).json()['results'][-1]['status_history']
+        self.assertEqual(history[0]['changed_by_email'], "client@example.com")
+        self.assertNotIn('changed_by_email', history[1])
+
+    def test_order_list_unknown_field_is_400(self):
+        response = self.client.get(self.url, {'fields': 'id,password'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
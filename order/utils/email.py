@@ -1,6 +1,6 @@
-from django.core.mail import send_mail
 from django.template.loader import render_to_string
-from django.conf import settings
+
+from notifications.outbox import queue_email
 
 def send_order_confirmation_email(order):
     subject = f"Confirmation de votre commande #{order.order_number}"
@@ -8,10 +8,4 @@ def send_order_confirmation_email(order):
         "order": order,
         "user": order.customer,
     })
-    send_mail(
-        subject,
-        '',
-        settings.DEFAULT_FROM_EMAIL,
-        [order.customer.email],
-        html_message=message,
-    )
+    queue_email(subject, order.customer.email, html=message)
@@ -81,7 +81,8 @@ def generate_invoice(order):
     elements.append(Spacer(1, 24))
 
     # ========== TOTALS ==========
-    delivery = 1000
+    # Frais calculés à la commande (vendor/delivery.py)
+    delivery = order.delivery_cost or Decimal("0.0")
     total_with_delivery = total + delivery
 
     total_data = [
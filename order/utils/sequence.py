@@ -0,0 +1,93 @@
+import threading
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+
+ORDER_NUMBER_PREFIX = 'CM'
+
+
+def format_order_number(day, value):
+    # Au moins deux chiffres (CM-20250702-03), sans limite au-delà de 99
+    return f"{ORDER_NUMBER_PREFIX}-{day:%Y%m%d}-{value:02d}"
+
+
+def allocate(day, count=1):
+    """
+    Réserve `count` numéros consécutifs pour `day` et renvoie le premier.
+
+    L'UPDATE verrouille la ligne du jour jusqu'à la fin de la transaction :
+    deux commandes simultanées ne peuvent pas obtenir la même valeur, et une
+    commande annulée rend ses numéros.
+    """
+    from order.models import OrderNumberSequence
+
+    sequence = OrderNumberSequence.objects.filter(day=day)
+    with transaction.atomic():
+        if not sequence.update(last_value=F('last_value') + count):
+            try:
+                with transaction.atomic():
+                    OrderNumberSequence.objects.create(day=day, last_value=count)
+                return 1
+            except IntegrityError:
+                # Première commande du jour créée en même temps par un autre processus
+                sequence.update(last_value=F('last_value') + count)
+        last_value = sequence.values_list('last_value', flat=True).get()
+    return last_value - count + 1
+
+
+class BlockAllocator:
+    """
+    Réserve les numéros par blocs de `block_size` et les distribue en mémoire :
+    une seule requête par bloc au lieu d'une par commande. Un bloc réservé
+    dans une transaction n'est partagé qu'après son commit ; s'il est annulé,
+    ses numéros reviennent à la séquence. Les numéros non utilisés d'un bloc
+    (redémarrage, changement de jour) laissent des trous, jamais de doublons.
+    """
+
+    def __init__(self, block_size):
+        self.block_size = block_size
+        self._lock = threading.Lock()
+        self._blocks = {}
+
+    def allocate(self, day):
+        with self._lock:
+            block = self._blocks.get(day)
+            if block and block[0] < block[1]:
+                value = block[0]
+                block[0] += 1
+                return value
+
+        start = allocate(day, self.block_size)
+        transaction.on_commit(lambda: self._publish(day, start + 1, start + self.block_size))
+        return start
+
+    def _publish(self, day, start, end):
+        with self._lock:
+            # Les blocs des jours précédents ne serviront plus
+            self._blocks = {d: block for d, block in self._blocks.items() if d >= day}
+            block = self._blocks.get(day)
+            if not block or block[0] >= block[1]:
+                self._blocks[day] = [start, end]
+
+
+_block_allocators = {}
+_block_allocators_lock = threading.Lock()
+
+
+def get_block_allocator(block_size):
+    with _block_allocators_lock:
+        if block_size not in _block_allocators:
+            _block_allocators[block_size] = BlockAllocator(block_size)
+        return _block_allocators[block_size]
+
+
+def next_order_number(day=None):
+    day = day or timezone.now().date()
+    block_size = settings.ORDER_NUMBER_BLOCK_SIZE
+    if block_size > 1:
+        value = get_block_allocator(block_size).allocate(day)
+    else:
+        value = allocate(day)
+    return format_order_number(day, value)
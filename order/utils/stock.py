@@ -0,0 +1,147 @@
+from collections import OrderedDict, defaultdict
+from functools import reduce
+from operator import or_
+
+from django.db import transaction
+from django.db.models import Case, F, IntegerField, Q, When
+from django.utils import timezone
+from rest_framework import serializers
+
+from category.cache import invalidate_products
+from category.models import Product, ProductSize
+
+
+def merge_lines(items_data):
+    """
+    Regroupe les lignes de commande par (produit, taille) et les trie : les
+    lignes sont toujours verrouillées dans le même ordre, ce qui évite les
+    interblocages entre deux commandes concurrentes.
+    """
+    lines = OrderedDict()
+    for item in items_data:
+        try:
+            product_id = int(item.get('product'))
+            quantity = int(item.get('quantity', 1))
+        except (TypeError, ValueError):
+            raise serializers.ValidationError("Produit ou quantité invalide.")
+        if quantity < 1:
+            raise serializers.ValidationError("La quantité doit être au moins 1.")
+        size = item.get('size') or None
+        lines[(product_id, size)] = lines.get((product_id, size), 0) + quantity
+    return sorted(
+        ((product_id, size, quantity) for (product_id, size), quantity in lines.items()),
+        key=lambda line: (line[0], line[1] or ''),
+    )
+
+
+def _insufficient_stock(product_id, size=None):
+    product = Product.objects.filter(pk=product_id, is_available=True).first()
+    if product is None:
+        return serializers.ValidationError(f"Produit {product_id} introuvable ou indisponible.")
+    if size:
+        size_stock = ProductSize.objects.filter(product=product, size=size).values_list('stock', flat=True).first()
+        return serializers.ValidationError(
+            f"Stock insuffisant pour le produit '{product.product_name}' "
+            f"en taille {size} (stock actuel : {size_stock or 0})"
+        )
+    return serializers.ValidationError(
+        f"Stock insuffisant pour le produit '{product.product_name}' (stock actuel : {product.stock})"
+    )
+
+
+def _stock_conflict():
+    # Aucune ligne en défaut à la relecture : le stock a changé entre-temps
+    return serializers.ValidationError("Le stock a changé pendant la commande, veuillez réessayer.")
+
+
+class _Shortage(Exception):
+    pass
+
+
+def _decrement_all(model, rows, now):
+    """
+    Décrémente `stock` pour toutes les lignes `(filtre, quantité)` en un seul
+    UPDATE ... CASE. Les lignes sont d'abord verrouillées par ordre de clé
+    (SELECT ... FOR UPDATE ORDER BY pk) : l'UPDATE seul les verrouille dans
+    l'ordre du plan d'exécution, et deux commandes concurrentes pourraient
+    s'interbloquer. Si une ligne n'a pas assez de stock, le nombre de lignes
+    modifiées ne correspond pas : le point de sauvegarde est annulé et la
+    fonction renvoie False sans rien avoir modifié.
+    """
+    list(
+        model.objects
+        .filter(reduce(or_, (Q(**lookup) for lookup, _ in rows)))
+        .select_for_update()
+        .order_by('pk')
+        .values_list('pk', flat=True)
+    )
+    match = reduce(or_, (Q(stock__gte=quantity, **lookup) for lookup, quantity in rows))
+    new_stock = Case(
+        *(When(Q(**lookup), then=F('stock') - quantity) for lookup, quantity in rows),
+        output_field=IntegerField(),
+    )
+    try:
+        with transaction.atomic():
+            if model.objects.filter(match).update(stock=new_stock, updated_at=now) != len(rows):
+                raise _Shortage
+    except _Shortage:
+        return False
+    return True
+
+
+def reserve_stock(lines):
+    """
+    Décrémente le stock des lignes `(produit, taille, quantité)` issues de
+    `merge_lines` : un UPDATE pour les produits, un pour les tailles, chacun
+    conditionné par `stock >= n`. La base refuse de descendre sous zéro, même
+    entre commandes concurrentes.
+
+    À appeler dans `transaction.atomic()` : si une ligne échoue, une
+    ValidationError est levée et la commande entière est annulée.
+    """
+    now = timezone.now()
+    product_totals = defaultdict(int)
+    for product_id, _, quantity in lines:
+        product_totals[product_id] += quantity
+
+    product_rows = [({'pk': pk, 'is_available': True}, quantity) for pk, quantity in product_totals.items()]
+    if not _decrement_all(Product, product_rows, now):
+        stocks = dict(
+            Product.objects
+            .filter(pk__in=product_totals, is_available=True)
+            .values_list('pk', 'stock')
+        )
+        failed = next((pk for pk, quantity in product_totals.items() if stocks.get(pk, -1) < quantity), None)
+        if failed is None:
+            raise _stock_conflict()
+        raise _insufficient_stock(failed)
+
+    # Produit sans tailles déclarées : seul le stock global est suivi
+    sized = set(
+        ProductSize.objects
+        .filter(product_id__in=product_totals)
+        .values_list('product_id', flat=True)
+    )
+    size_rows = [
+        ({'product_id': product_id, 'size': size}, quantity)
+        for product_id, size, quantity in lines
+        if size and product_id in sized
+    ]
+    if size_rows and not _decrement_all(ProductSize, size_rows, now):
+        stocks = {
+            (product_id, size): stock
+            for product_id, size, stock in ProductSize.objects
+            .filter(product_id__in=sized)
+            .values_list('product_id', 'size', 'stock')
+        }
+        failed = next((
+            lookup for lookup, quantity in size_rows
+            if stocks.get((lookup['product_id'], lookup['size']), -1) < quantity
+        ), None)
+        if failed is None:
+            raise _stock_conflict()
+        raise _insufficient_stock(failed['product_id'], failed['size'])
+
+    # UPDATE ne déclenche pas les signaux : invalider le cache catalogue après commit
+    product_ids = list(product_totals)
+    transaction.on_commit(lambda: invalidate_products(product_ids))
@@ -1,45 +1,35 @@
+from django.db import transaction
 from django.utils.dateparse import parse_date
 from rest_framework import generics, permissions
 from rest_framework.exceptions import PermissionDenied, NotFound
 from .models import Order, OrderStatusHistory
 from vendor.models import Vendor
 from .serializers import OrderCreateSerializer, OrderDetailSerializer, VendorOrderDetailSerializer, OrderStatusUpdateSerializer, ExportOrderPDFAPIView
-from cart.models import CartItem
-from notifications.utils import notify_user
+from notifications.utils import dispatch_event
+from leMaillotApi.pagination import CreatedAtCursorPagination
+from leMaillotApi.rows import RowListMixin
+from leMaillotApi.serializers import parse_fields
 
 class OrderCreateAPIView(generics.CreateAPIView):
     serializer_class = OrderCreateSerializer
     permission_classes = [permissions.IsAuthenticated]
 
     def perform_create(self, serializer):
-        order = serializer.save()
-        user = self.request.user
+        # Avec DatabaseQueue, l'événement est écrit dans la même transaction que la commande
+        with transaction.atomic():
+            order = serializer.save()
 
-        # Notification client
-        order = serializer.instance
-        notify_user(
-            user=user,
-            title="Commande confirmée",
-            message=f"Votre commande #{order.order_number} a été confirmée ✅",
-            type="ORDER"
-        )
-
-        # Notification vendeur(s)
-        vendors = set(item.product.vendor for item in CartItem.objects.filter(cart__user=user))
-        for vendor in vendors:
-            notify_user(
-                user=vendor.user,
-                title="Nouvelle commande",
-                message="Vous avez une nouvelle commande à traiter 📦",
-                type="ORDER"
-            )
+            # Notifications client et vendeur(s), traitées hors de la requête
+            dispatch_event('order.created', order_id=order.pk)
 
-class OrderListAPIView(generics.ListAPIView):
+class OrderListAPIView(RowListMixin, generics.ListAPIView):
     serializer_class = OrderDetailSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = CreatedAtCursorPagination
 
     def get_queryset(self):
-        return Order.objects.filter(customer=self.request.user).order_by('-created_at')
+        queryset = Order.objects.filter(customer=self.request.user).order_by('-created_at')
+        return OrderDetailSerializer.optimize_queryset(queryset, parse_fields(self.request))
 
 class OrderStatusUpdateAPIView(generics.UpdateAPIView):
     queryset = Order.objects.all()
@@ -65,45 +55,24 @@ class OrderStatusUpdateAPIView(generics.UpdateAPIView):
         old_status = order.status
         new_status = serializer.validated_data['status']
 
-        # Sauvegarde de l'historique
-        OrderStatusHistory.objects.create(
-            order=order,
-            previous_status=old_status,
-            new_status=new_status,
-            changed_by=self.request.user
-        )
-
-        serializer.save()
-
-        # Notification en fonction du nouveau statut
-        if new_status == "shipped":
-            notify_user(
-                user=order.customer,
-                title="Commande expédiée",
-                message=f"Bonne nouvelle ! Votre commande #{order.order_number} est en route 🚚",
-                type="ORDER"
-            )
-        elif new_status == "delivered":
-            notify_user(
-                user=order.customer,
-                title="Commande livrée",
-                message=f"Votre commande #{order.order_number} a été livrée 🎉",
-                type="ORDER"
+        with transaction.atomic():
+            # Sauvegarde de l'historique
+            OrderStatusHistory.objects.create(
+                order=order,
+                previous_status=old_status,
+                new_status=new_status,
+                changed_by=self.request.user
             )
-        elif new_status == "paid":
-            # Pour le vendeur (optionnel, selon qui paie)
-            for item in order.items.all():
-                vendor = item.product.vendor
-                notify_user(
-                    user=vendor.user,
-                    title="Paiement confirmé",
-                    message=f"Le paiement de la commande #{order.order_number} est validé 💰",
-                    type="ORDER"
-                )
+
+            serializer.save()
+
+            # Notification en fonction du nouveau statut
+            dispatch_event('order.status_changed', order_id=order.pk, status=new_status)
 
 class VendorOrderListAPIView(generics.ListAPIView):
     serializer_class = OrderDetailSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = CreatedAtCursorPagination
 
     def get_queryset(self):
         user = self.request.user
@@ -111,6 +80,7 @@ class VendorOrderListAPIView(generics.ListAPIView):
             raise PermissionDenied("Accès réservé aux vendeurs.")
 
         queryset = Order.objects.filter(items__product__vendor=user.vendor).distinct()
+        queryset = OrderDetailSerializer.optimize_queryset(queryset, parse_fields(self.request))
 
         # 🔍 Filtres GET
         status = self.request.query_params.get('status')
@@ -144,7 +114,8 @@ class VendorOrderDetailAPIView(generics.RetrieveAPIView):
         user = self.request.user
         if not hasattr(user, 'vendor'):
             raise PermissionDenied("Accès réservé aux vendeurs.")
-        return Order.objects.filter(items__product__vendor=user.vendor).distinct()
+        queryset = Order.objects.filter(items__product__vendor=user.vendor).distinct()
+        return VendorOrderDetailSerializer.optimize_queryset(queryset, parse_fields(self.request))
 
     def get_object(self):
         obj = super().get_object()
@@ -162,13 +133,14 @@ class VendorOrderDetailAPIView(generics.RetrieveAPIView):
 class AdminOrderListAPIView(generics.ListAPIView):
     serializer_class = OrderDetailSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = CreatedAtCursorPagination
 
     def get_queryset(self):
         user = self.request.user
         if not user.is_staff:
             raise PermissionDenied("Accès réservé aux administrateurs.")
 
-        queryset = Order.objects.all()
+        queryset = OrderDetailSerializer.optimize_queryset(Order.objects.all(), parse_fields(self.request))
 
         # Filtres GET
         status = self.request.query_params.get('status')
@@ -199,7 +171,8 @@ class CustomerOrderDetailAPIView(generics.RetrieveAPIView):
     lookup_field = 'pk'
 
     def get_queryset(self):
-        return Order.objects.filter(customer=self.request.user)
+        queryset = Order.objects.filter(customer=self.request.user)
+        return OrderDetailSerializer.optimize_queryset(queryset, parse_fields(self.request))
 
     def get_object(self):
         queryset = self.get_queryset()
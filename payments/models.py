@@ -27,6 +27,11 @@ class Payment(models.Model):
     paid_at = models.DateTimeField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', '-created_at', '-id'], name='payment_user_recent_idx'),
+        ]
+
     def mark_as_paid(self, intent_id=None):
         self.status = "succeeded"
         self.paid_at = timezone.now()
@@ -7,7 +7,9 @@ from rest_framework import generics
 from order.models import Order
 from django.views.decorators.csrf import csrf_exempt
 from django.http import HttpResponse
+from payments.models import Payment
 from payments.serializers import PaymentSerializer
+from leMaillotApi.pagination import CreatedAtCursorPagination
 from django.utils.timezone import now
 
 
@@ -109,6 +111,7 @@ def stripe_webhook(request):
 class PaymentListAPIView(generics.ListAPIView):
     serializer_class = PaymentSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = CreatedAtCursorPagination
 
     def get_queryset(self):
         return Payment.objects.filter(user=self.request.user).order_by("-created_at")
\ No newline at end of file
@@ -1,3 +1,4 @@
+from django.db.models import Prefetch
 from django.shortcuts import render
 
 from rest_framework import viewsets, permissions, status
@@ -11,7 +12,9 @@ class WishlistViewSet(viewsets.ViewSet):
     permission_classes = [permissions.IsAuthenticated]
 
     def list(self, request):
-        items = WishlistItem.objects.filter(user=request.user)
+        items = WishlistItem.objects.filter(user=request.user).prefetch_related(
+            Prefetch('product', queryset=Product.objects.for_listing())
+        )
         serializer = WishlistItemSerializer(items, many=True, context={'request': request})
         return Response(serializer.data)
 